@@ -1,6 +1,7 @@
 import sys
 from PyQt6.QtWidgets import QApplication
 from src.frontend import base, login
+from src.modules.contextmanager import close_vault, close_all
 import setup
 
 
@@ -8,6 +9,7 @@ class Application:
     def __init__(self):
         self.app = QApplication(sys.argv)
         self.app.setDesktopFileName("krypt")
+        self.app.aboutToQuit.connect(self.shutdown)
 
         setup.dirs()
 
@@ -18,19 +20,34 @@ class Application:
     def show_login(self):
         if self.main_window:
             self.main_window.hide()
+            close_vault(self.main_window.db_path)
         self.login.clear_fields()
         self.login.show()
 
-    def show_main_window(self):
+    def show_main_window(self, first_page):
+        # The unlock worker has already opened the vault and fetched the first page
+        db_path = self.login.user_auth.db
+
+        if self.main_window and self.main_window.db_path != db_path:
+            self.main_window.shutdown()
+            self.main_window.deleteLater()
+            self.main_window = None
+
         if not self.main_window:
-            db_path = self.login.user_auth.db
-            username = self.login.current_user
+            username = self.login.user_auth.uname
             self.main_window = base.MainWindow(db_path, username)
             self.main_window.logout.connect(self.show_login)
 
         self.login.hide()
-        self.main_window.refresh_credentials()
+        self.main_window.refresh_credentials(first_page)
         self.main_window.show()
+        self.main_window.resume()
+
+    def shutdown(self):
+        self.login.stop_unlock()
+        if self.main_window:
+            self.main_window.shutdown()
+        close_all()
 
     def run(self):
         self.show_login()
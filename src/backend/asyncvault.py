@@ -0,0 +1,135 @@
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from .auth import User
+from .rekey import Rekey
+from .user import Credentials, Groups, Policies, Audit
+from src.modules.contextmanager import open_vault, close_vault
+
+# Methods that only read, every other public method is treated as a write
+READ_METHODS = {
+    Credentials: {"get_cred", "get_row", "get_details", "get_secret", "decrypt_many", "list_page", "search"},
+    Groups: {"get_groups", "get_group", "get_gid", "verify_counts"},
+    Policies: {"get", "list", "policy_of"},
+    Audit: {"page", "history"},
+}
+
+
+class AsyncProxy:
+    def __init__(self, vault, target):
+        """
+        Awaitable versions of the methods of a backend object.
+
+        Args:
+        vault (AsyncVault): Vault whose executors run the calls.
+        target (object): Credentials, Groups, Policies or Audit instance.
+        """
+        self._vault = vault
+        self._target = target
+        self._reads = READ_METHODS[type(target)]
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        method = getattr(self._target, name)
+        run = self._vault.read if name in self._reads else self._vault.write
+
+        @functools.wraps(method)
+        async def call(*args, **kwargs):
+            return await run(method, *args, **kwargs)
+
+        return call
+
+
+class AsyncVault:
+    def __init__(self, db, username, password, readers=4):
+        """
+        asyncio interface to a vault, for use without Qt.
+
+        Reads run concurrently on a pool of threads backed by the vault's
+        reader connections. Writes run one at a time, in the order they were
+        started, on a single thread holding the writer connection. Cancelling
+        a call that has not started yet keeps it from running; a call that
+        has started runs to completion in the background, committing as it
+        would have, and only its result is dropped.
+
+        Use as ``async with AsyncVault(db, username, password) as vault`` or
+        with open() and close().
+
+        Args:
+        db (str): Database path.
+        username (str): Vault user.
+        password (str): Master password.
+        readers (int): Maximum number of reads running at once.
+        """
+        self.db = db
+        self.user = User(db, username, password)
+        self.readers = readers
+        self._read_executor = None
+        self._write_executor = None
+        self.credentials = AsyncProxy(self, Credentials(db))
+        self.groups = AsyncProxy(self, Groups(db))
+        self.policies = AsyncProxy(self, Policies(db))
+        self.audit = AsyncProxy(self, Audit(db))
+
+    async def _run(self, executor, func, args, kwargs):
+        if executor is None:
+            raise RuntimeError("Vault is not open")
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(executor, functools.partial(func, *args, **kwargs))
+
+    async def read(self, func, *args, **kwargs):
+        """Run a read-only call on a reader thread"""
+        return await self._run(self._read_executor, func, args, kwargs)
+
+    async def write(self, func, *args, **kwargs):
+        """Run a call on the writer thread, after every write started before it"""
+        return await self._run(self._write_executor, func, args, kwargs)
+
+    async def open(self):
+        """
+        Open the session pool and unlock the vault.
+
+        Raises:
+        PermissionError: If the password is wrong.
+        """
+        open_vault(self.db, self.readers)
+        self._read_executor = ThreadPoolExecutor(self.readers, thread_name_prefix="vault-read")
+        self._write_executor = ThreadPoolExecutor(1, thread_name_prefix="vault-write")
+        try:
+            unlocked = await self.write(self.user.login)
+        except BaseException:
+            await self.close()
+            raise
+        if not unlocked:
+            await self.close()
+            raise PermissionError(f"Invalid credentials for {self.user.uname}")
+        return self
+
+    async def close(self):
+        """Wait for submitted calls, then lock the vault and close its pool"""
+        executors = [e for e in (self._write_executor, self._read_executor) if e]
+        self._read_executor = None
+        self._write_executor = None
+        loop = asyncio.get_running_loop()
+        for executor in executors:
+            await loop.run_in_executor(None, executor.shutdown)
+        close_vault(self.db)
+
+    async def __aenter__(self):
+        return await self.open()
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def change_password(self, current_pw, new_pw):
+        """Change the master password, see User.change_password, then re-encrypt with rekey()"""
+        return await self.write(self.user.change_password, current_pw, new_pw)
+
+    async def rekey(self, progress=None):
+        """Re-encrypt the vault under its newest key, holding back other writes until done"""
+        return await self.write(Rekey(self.db).run, progress)
+
+
+if __name__ == "__main__":
+    exit("Invalid entry point")
@@ -1,6 +1,15 @@
 import os
-from .init import InitUser, DatabaseTriggers
-from src.modules.contextmanager import db_connect
+import shutil
+from .init import InitUser, DatabaseTriggers, Migrations
+from .retention import Retention, segment_dir
+from .keys import VaultKeys
+from .user import Credentials
+from src.modules import crypto
+from src.modules.contextmanager import db_connect, db_read
+from src.modules.storage import DEFAULT_PROFILE
+
+# Stages reported by User.login: derive keys, migrate, encrypt pending secrets, archive audit log
+LOGIN_STAGES = 4
 
 
 class User:
@@ -16,33 +25,99 @@ class User:
         self.uname = username
         self.pw = password
 
-    def create(self, pw):
-        """Creates a new user database."""
+    def create(self, pw, profile=DEFAULT_PROFILE):
+        """Creates a new user database with the given storage profile."""
         try:
             user = InitUser(self.db)
             trigger = DatabaseTriggers(self.db)
-            user.init_user(pw)
+            user.init_storage(profile)
+            # The master password itself is never stored, only keys wrapped by it
+            user.init_user("")
             user.init_cred()
             user.init_group()
             user.init_audit()
+            user.init_search()
+            user.init_keys()
             trigger.create_triggers()
+            Migrations(self.db).migrate()
+            VaultKeys(self.db).setup(pw)
             return True
         except Exception as e:
             print(f"Error creating user database: {e}")
             return False
 
-    def login(self):
-        """Verifies user login details."""
-        with db_connect(self.db) as cur:
-            query = "SELECT pwd FROM user"
-            cur.execute(query)
+    def _legacy_check(self):
+        """Check a plaintext password from before encryption"""
+        with db_read(self.db) as cur:
+            cur.execute("SELECT pwd FROM user")
             result = cur.fetchone()
-            return result and result[0] == self.pw
+        return bool(result and result[0] and result[0] == self.pw)
+
+    def _legacy_setup(self):
+        """Set up keys for a vault from before encryption and drop its plaintext password"""
+        keys = VaultKeys(self.db).setup(self.pw)
+        with db_connect(self.db) as cur:
+            cur.execute("UPDATE user SET pwd = ''")
+        return keys
+
+    def login(self, progress=None, cancelled=None):
+        """
+        Verifies user login details and unlocks the vault keys.
+
+        The password is checked before any migration runs, so a wrong
+        password leaves the vault untouched.
+
+        Args:
+            progress (callable): Called with (stage, LOGIN_STAGES) before each stage
+            cancelled (callable): Polled between stages, the vault is locked
+                again and False returned when it returns True
+
+        Returns:
+            bool: True if the vault was unlocked
+        """
+        def stage(number):
+            if progress:
+                progress(number, LOGIN_STAGES)
+            return bool(cancelled and cancelled())
+
+        if stage(0):
+            return False
+        vault_keys = VaultKeys(self.db)
+        if vault_keys.exists():
+            keys = vault_keys.unlock(self.pw)
+            if keys is None:
+                return False
+        elif self._legacy_check():
+            keys = None
+        else:
+            return False
+        if stage(1):
+            return False
+        Migrations(self.db).migrate()
+        if keys is None:
+            keys = self._legacy_setup()
+        crypto.remember(self.db, keys)
+        if stage(2):
+            crypto.forget(self.db)
+            return False
+        Credentials(self.db).encrypt_pending()
+        if stage(3):
+            crypto.forget(self.db)
+            return False
+        try:
+            Retention(self.db).run()
+        except Exception as e:
+            print(f"Error archiving audit log: {e}")
+        return True
 
     def change_password(self, current_pw, new_pw):
         """
         Change user's password after verifying current password.
-        
+
+        The data keys are rewrapped under the new password with a freshly
+        calibrated key derivation cost, and a new data key is added. The
+        secrets are moved to it afterwards by Rekey.
+
         Args:
             current_pw (str): Current password for verification
             new_pw (str): New password to set
@@ -50,26 +125,23 @@ class User:
         Returns:
             bool: True if password was changed successfully
         """
-        with db_connect(self.db) as cur:
-            verify = "SELECT pwd FROM user"
-            cur.execute(verify)
-            result = cur.fetchone()
-            if not result or result[0] != current_pw:
-                return False
-                
-            update = "UPDATE user SET pwd = ?"
-            cur.execute(update, (new_pw,))
-            return True
+        keys = VaultKeys(self.db).rotate(current_pw, new_pw)
+        if keys is None:
+            return False
+        crypto.remember(self.db, keys)
+        return True
 
     def logout(self):
         """Handles user logout"""
+        crypto.forget(self.db)
         print(f"{self.uname} logged out")
 
     def delete(self):
-        """Deletes the user database"""
-        db_path = "db/users/" + self.db
-        if os.path.exists(db_path):
-            os.remove(self.db)
+        """Deletes the user database and its archived audit log"""
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(self.db + suffix):
+                os.remove(self.db + suffix)
+        shutil.rmtree(segment_dir(self.db), ignore_errors=True)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,214 @@
+import io
+import os
+import csv
+import json
+import zlib
+import struct
+from .user import Credentials
+from src.modules import crypto
+from src.modules.contextmanager import db_read
+
+FORMATS = ("csv", "ndjson", "archive")
+COLUMNS = ("title", "username", "password", "url", "notes", "group")
+
+ARCHIVE_MAGIC = b"KRYPTX1\n"
+ARCHIVE_EXT = ".krypt"
+FRAME_MORE = 0
+FRAME_LAST = 1
+
+
+def detect_format(path):
+    """Guess the export or import format from a file extension"""
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ARCHIVE_EXT:
+        return "archive"
+    if ext in (".json", ".jsonl", ".ndjson"):
+        return "ndjson"
+    return "csv"
+
+
+class ArchiveWriter:
+    def __init__(self, fileobj, passphrase):
+        """
+        Write a zlib-compressed, passphrase-encrypted NDJSON archive.
+
+        The stream is split into AES-GCM frames; each frame is bound to its
+        position and the header so frames cannot be reordered or dropped.
+
+        Args:
+        fileobj: Binary file object to write to.
+        passphrase (str): Passphrase the archive key is derived from.
+        """
+        salt = crypto.new_salt()
+        params = crypto.DEFAULT_SCRYPT
+        self.fileobj = fileobj
+        self.header = ARCHIVE_MAGIC + salt + struct.pack(
+            ">BBB", params["n"].bit_length() - 1, params["r"], params["p"]
+        )
+        self.key = crypto.derive_key(passphrase, salt, **params)
+        self.compressor = zlib.compressobj(6)
+        self.counter = 0
+        fileobj.write(self.header)
+
+    def _frame(self, data, flag):
+        aad = self.header + struct.pack(">QB", self.counter, flag)
+        blob = crypto.encrypt(self.key, data, aad)
+        self.fileobj.write(struct.pack(">BI", flag, len(blob)) + blob)
+        self.counter += 1
+
+    def write(self, data):
+        """Compress and encrypt a block of data as one frame"""
+        chunk = self.compressor.compress(data) + self.compressor.flush(zlib.Z_SYNC_FLUSH)
+        self._frame(chunk, FRAME_MORE)
+
+    def close(self):
+        """Write the final frame that marks the archive as complete"""
+        self._frame(self.compressor.flush(), FRAME_LAST)
+
+
+def iter_archive(f, passphrase):
+    """
+    Stream credential dicts back out of an encrypted archive.
+
+    Args:
+    f: Binary file object positioned at the start of the archive.
+    passphrase (str): Passphrase used at export.
+
+    Raises:
+    ValueError: If the file is not an archive, is truncated, or the passphrase is wrong.
+    """
+    if f.read(len(ARCHIVE_MAGIC)) != ARCHIVE_MAGIC:
+        raise ValueError("Not a Krypt archive")
+    salt = f.read(crypto.SALT_SIZE)
+    log_n, r, p = struct.unpack(">BBB", f.read(3))
+    header = ARCHIVE_MAGIC + salt + struct.pack(">BBB", log_n, r, p)
+    key = crypto.derive_key(passphrase, salt, n=2**log_n, r=r, p=p)
+    decompressor = zlib.decompressobj()
+    pending = b""
+    counter = 0
+
+    while True:
+        prefix = f.read(5)
+        if len(prefix) < 5:
+            raise ValueError("Archive is truncated")
+        flag, length = struct.unpack(">BI", prefix)
+        blob = f.read(length)
+        aad = header + struct.pack(">QB", counter, flag)
+        try:
+            data = crypto.decrypt(key, blob, aad)
+        except Exception:
+            raise ValueError("Wrong passphrase or corrupted archive")
+        counter += 1
+
+        pending += decompressor.decompress(data)
+        *lines, pending = pending.split(b"\n")
+        for line in lines:
+            if line:
+                yield json.loads(line)
+        if flag == FRAME_LAST:
+            break
+
+    if pending.strip():
+        yield json.loads(pending)
+
+
+class Exporter:
+    def __init__(self, db, path, fmt=None, passphrase=None, chunk_size=1000):
+        """
+        Stream a vault out to CSV, NDJSON or an encrypted archive.
+
+        Args:
+        db (str): Database path.
+        path (str): Destination file path.
+        fmt (str): "csv", "ndjson" or "archive", guessed from the extension if omitted.
+        passphrase (str): Required for the archive format.
+        chunk_size (int): Rows fetched from the cursor per round trip.
+        """
+        self.db = db
+        self.path = path
+        self.fmt = fmt or detect_format(path)
+        self.passphrase = passphrase
+        self.chunk_size = chunk_size
+        if self.fmt not in FORMATS:
+            raise ValueError(f"Unknown export format: {self.fmt}")
+        if self.fmt == "archive" and not passphrase:
+            raise ValueError("A passphrase is required for encrypted archives")
+
+    def run(self, progress=None, cancelled=None):
+        """
+        Export the vault chunk by chunk.
+
+        Args:
+        progress (callable): Called as progress(rows_written, total_rows) after each chunk.
+        cancelled (callable): Polled before each chunk; a cancelled export removes its file.
+
+        Returns:
+        dict: Number of "rows" written and whether the export was "cancelled".
+        """
+        query = """
+        SELECT c.cred_id, c.title, c.username, c.password, c.url, c.notes, g.title
+        FROM credentials c
+        LEFT JOIN groups g ON g.group_id = c.group_id
+        ORDER BY c.cred_id;
+        """
+        totals = {"rows": 0, "cancelled": False}
+        creds = Credentials(self.db)
+
+        with db_read(self.db) as cur, open(self.path, "wb") as out:
+            cur.execute("SELECT COUNT(*) FROM credentials;")
+            total = cur.fetchone()[0]
+            write_rows, finish = self._writer(out)
+
+            cur.execute(query)
+            while True:
+                if cancelled and cancelled():
+                    totals["cancelled"] = True
+                    break
+                rows = cur.fetchmany(self.chunk_size)
+                if not rows:
+                    break
+                # Secrets of the whole chunk are decrypted in one batch
+                secrets = creds.decrypt_many([(row[0], row[3], row[5]) for row in rows])
+                write_rows(
+                    [
+                        (row[1], row[2], password, row[4], notes, row[6])
+                        for row, (_, password, notes) in zip(rows, secrets)
+                    ]
+                )
+                totals["rows"] += len(rows)
+                if progress:
+                    progress(totals["rows"], total)
+            if not totals["cancelled"]:
+                finish()
+
+        if totals["cancelled"]:
+            os.remove(self.path)
+        return totals
+
+    def _writer(self, out):
+        """Return (write_rows, finish) callables for the chosen format"""
+        if self.fmt == "csv":
+            text = io.TextIOWrapper(out, encoding="utf-8", newline="", write_through=True)
+            writer = csv.writer(text)
+            writer.writerow(COLUMNS)
+            return writer.writerows, text.flush
+
+        def encode(rows):
+            return b"".join(
+                json.dumps(dict(zip(COLUMNS, row))).encode("utf-8") + b"\n" for row in rows
+            )
+
+        if self.fmt == "ndjson":
+            return lambda rows: out.write(encode(rows)), out.flush
+
+        archive = ArchiveWriter(out, self.passphrase)
+        return lambda rows: archive.write(encode(rows)), archive.close
+
+
+def export_vault(db, path, fmt=None, passphrase=None, chunk_size=1000):
+    """Export an unlocked vault from a script, see Exporter for the arguments"""
+    return Exporter(db, path, fmt, passphrase, chunk_size).run()
+
+
+if __name__ == "__main__":
+    exit("Invalid entry point")
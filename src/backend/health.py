@@ -0,0 +1,296 @@
+import hmac
+import json
+import hashlib
+from src.modules import crypto
+from src.modules.contextmanager import db_connect, db_read
+from .init import CHANGE_FLAGS
+from .user import _chunked, open_fields
+
+# Kinds of password_index rows
+EXACT = 0
+SIMILAR = 1
+# Shorter passwords are only checked for exact reuse
+SIMILAR_MIN_LENGTH = 6
+# Longer passwords, usually generated, get no one-deletion variants, only their letters
+SIMILAR_MAX_LENGTH = 16
+# Letters a password needs for its letters alone to mark it similar
+SKELETON_MIN_LENGTH = 5
+INDEX_CONTEXT = b"krypt password index"
+
+
+def _digest(keyed, prefix, text):
+    """Keyed 64-bit digest, stored as a signed SQLite integer"""
+    h = keyed.copy()
+    h.update(prefix + text.encode("utf-8"))
+    return int.from_bytes(h.digest(), "big", signed=True)
+
+
+def password_digests(keyed, password):
+    """
+    Index entries of one password.
+
+    keyed is a BLAKE2b hash keyed with the index key, with an 8 byte
+    digest. The exact digest is shared by identical passwords. Passwords one edit
+    apart share the digest of the password or of one of its one-deletion
+    variants, and passwords differing only in digits and symbols share
+    the digest of their lowercase letters.
+
+    Returns:
+    set: (kind, digest) pairs.
+    """
+    if not password:
+        return set()
+    digests = {(EXACT, _digest(keyed, b"=", password))}
+    if len(password) < SIMILAR_MIN_LENGTH:
+        return digests
+    if len(password) <= SIMILAR_MAX_LENGTH:
+        variants = {password} | {password[:i] + password[i + 1 :] for i in range(len(password))}
+        digests |= {(SIMILAR, _digest(keyed, b"~", variant)) for variant in variants}
+    skeleton = "".join(c for c in password.lower() if c.isalpha())
+    if len(skeleton) >= SKELETON_MIN_LENGTH:
+        digests.add((SIMILAR, _digest(keyed, b"#", skeleton)))
+    return digests
+
+
+class _Groups:
+    """Union-find over cred_ids"""
+
+    def __init__(self):
+        self.parent = {}
+
+    def find(self, x):
+        root = self.parent.setdefault(x, x)
+        while root != self.parent[root]:
+            root = self.parent[root]
+        while x != root:
+            self.parent[x], x = root, self.parent[x]
+        return root
+
+    def union(self, members):
+        first = self.find(members[0])
+        for other in members[1:]:
+            self.parent[self.find(other)] = first
+
+    def groups(self):
+        result = {}
+        for x in self.parent:
+            result.setdefault(self.find(x), []).append(x)
+        return [sorted(members) for members in result.values()]
+
+
+class Health:
+    def __init__(self, db, chunk_size=5000):
+        """
+        Find reused and nearly identical passwords across a vault.
+
+        Every password is indexed by keyed digests in password_index, so
+        matches come from equal digests instead of comparing every pair.
+        Buckets holding more than one credential are cached in the settings
+        table with the audit log_id they are current to. A later run only
+        re-indexes the credentials whose password changed in the audit log
+        since, and re-reads the buckets they touch. The whole index is
+        rebuilt when the data key changes or the audit entries it would
+        need have been archived.
+
+        Args:
+        db (str): Database path.
+        chunk_size (int): Credentials indexed per transaction.
+        """
+        self.db = db
+        self.chunk_size = chunk_size
+
+    def _index_key(self):
+        keys = crypto.get_keys(self.db)
+        version = max(keys)
+        index_key = hmac.digest(keys[version], INDEX_CONTEXT, "sha256")
+        return version, hashlib.blake2b(key=index_key, digest_size=8)
+
+    def _state(self, cur):
+        query = """SELECT key, value FROM settings WHERE key IN ('health_log_id', 'health_key_version', 'health_buckets');"""
+        cur.execute(query)
+        return dict(cur.fetchall())
+
+    def _changed(self, cur, after):
+        """cred_ids whose password changed after log_id after, None if entries since then were archived"""
+        cur.execute("SELECT MIN(log_id) FROM auditlog;")
+        first = cur.fetchone()[0]
+        if (first if first is not None else self._last_log_id(cur) + 1) > after + 1:
+            return None
+        query = """
+        SELECT DISTINCT entity_id FROM auditlog
+        WHERE log_id > ? AND entity_type = 'credential' AND entity_id IS NOT NULL
+          AND (action_type != 'UPDATE' OR changed & ?);
+        """
+        cur.execute(query, (after, CHANGE_FLAGS["password"]))
+        return [row[0] for row in cur.fetchall()]
+
+    def _last_log_id(self, cur):
+        cur.execute("SELECT seq FROM sqlite_sequence WHERE name = 'auditlog';")
+        row = cur.fetchone()
+        return row[0] if row else 0
+
+    def _index(self, cur, keyed, cred_ids, rows):
+        """
+        Replace the index entries of cred_ids with those of their (cred_id, sealed password) rows.
+
+        Returns:
+        set: Every (kind, digest) removed or added.
+        """
+        touched = set()
+        if cred_ids:
+            ids = json.dumps(cred_ids)
+            cur.execute(
+                "SELECT kind, digest FROM password_index WHERE cred_id IN (SELECT value FROM json_each(?));", (ids,)
+            )
+            touched.update(cur.fetchall())
+            cur.execute("DELETE FROM password_index WHERE cred_id IN (SELECT value FROM json_each(?));", (ids,))
+        passwords = open_fields(self.db, [(cred_id, "password", value) for cred_id, value in rows])
+        entries = []
+        for (cred_id, _), password in zip(rows, passwords):
+            digests = password_digests(keyed, password)
+            touched |= digests
+            entries.extend((kind, digest, cred_id) for kind, digest in digests)
+        cur.executemany("INSERT OR IGNORE INTO password_index (kind, digest, cred_id) VALUES (?, ?, ?);", entries)
+        return touched
+
+    def _read_buckets(self, cur, digests=None):
+        """Buckets with more than one credential, among digests or over the whole index"""
+        if digests is None:
+            query = """
+            SELECT kind, digest, json_group_array(cred_id) FROM password_index
+            GROUP BY kind, digest HAVING COUNT(*) > 1;
+            """
+            cur.execute(query)
+        else:
+            query = """
+            SELECT p.kind, p.digest, json_group_array(p.cred_id)
+            FROM json_each(?) j
+            JOIN password_index p ON p.kind = json_extract(j.value, '$[0]') AND p.digest = json_extract(j.value, '$[1]')
+            GROUP BY p.kind, p.digest HAVING COUNT(*) > 1;
+            """
+            cur.execute(query, (json.dumps(sorted(digests)),))
+        return {f"{kind}:{digest}": json.loads(members) for kind, digest, members in cur.fetchall()}
+
+    def run(self, progress=None, cancelled=None):
+        """
+        Bring the index up to date and return the report.
+
+        Args:
+        progress (callable): Called with (done, total) credentials after every chunk.
+        cancelled (callable): Polled between chunks, stops the run when it returns True.
+
+        Returns:
+        dict: See report(), None if cancelled.
+        """
+        version, keyed = self._index_key()
+        with db_read(self.db) as cur:
+            state = self._state(cur)
+            last = self._last_log_id(cur)
+            full = state.get("health_key_version") != str(version) or "health_buckets" not in state
+            changed = None if full else self._changed(cur, int(state.get("health_log_id") or 0))
+            if changed is None:
+                cur.execute("SELECT COUNT(*) FROM credentials;")
+                total = cur.fetchone()[0]
+            else:
+                total = len(changed)
+
+        done = 0
+        if changed is None:
+            with db_connect(self.db) as cur:
+                # Without cached buckets an interrupted rebuild starts over
+                cur.execute("DELETE FROM settings WHERE key = 'health_buckets';")
+                cur.execute("DELETE FROM password_index;")
+                # Filled in cred_id order, the index is cheaper to build afterwards
+                cur.execute("DROP INDEX IF EXISTS idx_password_index_cred;")
+            after = 0
+            while True:
+                if cancelled and cancelled():
+                    return None
+                with db_connect(self.db) as cur:
+                    query = """SELECT cred_id, password FROM credentials WHERE cred_id > ? ORDER BY cred_id LIMIT ?;"""
+                    cur.execute(query, (after, self.chunk_size))
+                    rows = cur.fetchall()
+                    if not rows:
+                        cur.execute("CREATE INDEX IF NOT EXISTS idx_password_index_cred ON password_index (cred_id);")
+                        cur.execute(
+                            "INSERT OR REPLACE INTO settings (key, value) VALUES ('health_buckets', ?);",
+                            (json.dumps(self._read_buckets(cur)),),
+                        )
+                        break
+                    self._index(cur, keyed, [], rows)
+                after = rows[-1][0]
+                done += len(rows)
+                if progress:
+                    progress(done, total)
+        else:
+            buckets = json.loads(state["health_buckets"])
+            for chunk in _chunked(changed, self.chunk_size):
+                if cancelled and cancelled():
+                    return None
+                with db_connect(self.db) as cur:
+                    # Deleted credentials have no row and only lose their entries
+                    query = """SELECT cred_id, password FROM credentials WHERE cred_id IN (SELECT value FROM json_each(?));"""
+                    cur.execute(query, (json.dumps(chunk),))
+                    touched = self._index(cur, keyed, chunk, cur.fetchall())
+                    # Cached buckets change with the index, so a cancelled run can be repeated
+                    for name in [name for name in buckets if tuple(map(int, name.split(":"))) in touched]:
+                        del buckets[name]
+                    buckets.update(self._read_buckets(cur, touched))
+                    cur.execute(
+                        "INSERT OR REPLACE INTO settings (key, value) VALUES ('health_buckets', ?);",
+                        (json.dumps(buckets),),
+                    )
+                done += len(chunk)
+                if progress:
+                    progress(done, total)
+
+        with db_connect(self.db) as cur:
+            query = """INSERT OR REPLACE INTO settings (key, value) VALUES ('health_log_id', ?), ('health_key_version', ?);"""
+            cur.execute(query, (str(last), str(version)))
+        return self.report()
+
+    def report(self):
+        """
+        Groups of credentials from the last run, with current titles.
+
+        Returns:
+        dict: "reused" and "similar", lists of groups of (cred_id, title),
+        None if the vault has not been checked yet.
+        """
+        with db_read(self.db) as cur:
+            state = self._state(cur)
+            if "health_buckets" not in state:
+                return None
+            buckets = json.loads(state["health_buckets"])
+
+            exact_of = {}
+            reused = []
+            similar = _Groups()
+            for name, members in buckets.items():
+                if name.startswith(f"{EXACT}:"):
+                    reused.append(members)
+                    exact_of.update((cred_id, name) for cred_id in members)
+                else:
+                    similar.union(members)
+            # Groups that only repeat one password are already reported as reused
+            near = [
+                members for members in similar.groups()
+                if len({exact_of.get(cred_id, cred_id) for cred_id in members}) > 1
+            ]
+
+            ids = {cred_id for group in reused + near for cred_id in group}
+            cur.execute(
+                "SELECT cred_id, title FROM credentials WHERE cred_id IN (SELECT value FROM json_each(?));",
+                (json.dumps(sorted(ids)),),
+            )
+            titles = dict(cur.fetchall())
+
+        def named(groups):
+            groups = [[(cred_id, titles[cred_id]) for cred_id in sorted(g) if cred_id in titles] for g in groups]
+            return sorted((g for g in groups if len(g) > 1), key=lambda g: (-len(g), g[0][0]))
+
+        return {"reused": named(reused), "similar": named(near)}
+
+
+if __name__ == "__main__":
+    exit("Invalid entry point")
@@ -0,0 +1,190 @@
+import io
+import os
+import csv
+import json
+from itertools import islice
+from .user import Credentials, Groups
+from .exporter import FORMATS, detect_format, iter_archive
+from src.modules.contextmanager import db_connect
+from src.modules.pw_gen import generate_many
+
+# Accepted source column names for each credentials field
+COLUMN_ALIASES = {
+    "title": ("title", "name", "site", "account", "service"),
+    "username": ("username", "user", "login", "user_name", "email"),
+    "password": ("password", "pass", "passwd", "secret"),
+    "url": ("url", "website", "uri", "link", "login_uri"),
+    "notes": ("notes", "note", "comment", "comments", "extra"),
+    "group": ("group", "folder", "category", "grouping"),
+}
+
+
+def map_columns(columns):
+    """
+    Map source column names onto credentials fields.
+
+    Args:
+    columns (iterable): Column names from the source file.
+
+    Returns:
+    dict: credentials field to source column name.
+    """
+    normalized = {str(col).strip().lower().replace(" ", "_"): col for col in columns}
+    mapping = {}
+    for field, aliases in COLUMN_ALIASES.items():
+        for alias in aliases:
+            if alias in normalized:
+                mapping[field] = normalized[alias]
+                break
+    return mapping
+
+
+def iter_csv(text):
+    """Yield credential dicts from a CSV stream with a header row"""
+    reader = csv.DictReader(text)
+    mapping = map_columns(reader.fieldnames or [])
+    for row in reader:
+        yield {field: row.get(col) for field, col in mapping.items()}
+
+
+def iter_records(records):
+    """Yield credential dicts from decoded JSON records"""
+    mapping = None
+    for record in records:
+        if not isinstance(record, dict):
+            yield {}
+            continue
+        if mapping is None or any(col not in record for col in mapping.values()):
+            mapping = map_columns(record)
+        yield {field: record.get(col) for field, col in mapping.items()}
+
+
+def iter_ndjson(text):
+    """Yield credential dicts from a line-delimited JSON stream"""
+
+    def records():
+        for line in text:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError:
+                yield None
+
+    return iter_records(records())
+
+
+class Importer:
+    def __init__(self, db, path, fmt=None, mode="add", chunk_size=1000, passphrase=None, generate_length=None):
+        """
+        Stream credentials from a CSV, NDJSON or exported archive file into a vault.
+
+        Args:
+        db (str): Database path.
+        path (str): Source file path.
+        fmt (str): "csv", "ndjson" or "archive", guessed from the extension if omitted.
+        mode (str): "add" keeps existing titles, "upsert" overwrites them.
+        chunk_size (int): Rows written per transaction.
+        passphrase (str): Required for the archive format.
+        generate_length (int): Give entries without a password a generated one of this length.
+        """
+        self.db = db
+        self.path = path
+        self.fmt = fmt or detect_format(path)
+        self.passphrase = passphrase
+        self.mode = mode
+        self.chunk_size = chunk_size
+        self.generate_length = generate_length
+        self.creds = Credentials(db)
+        self.groups = Groups(db)
+        self.group_ids = {}
+        # Groups this import created, removed again if no imported row ends up in them
+        self.created_groups = []
+
+    def _group_id(self, title):
+        """Resolve a group title to its id, creating the group if needed"""
+        if not title:
+            return None
+        title = str(title).strip()
+        if title not in self.group_ids:
+            group_id = self.groups.get_gid(title)
+            if group_id is None:
+                group_id = self.groups.add_group(title)
+                self.created_groups.append(group_id)
+            self.group_ids[title] = group_id
+        return self.group_ids[title]
+
+    def _rows(self, raw):
+        if self.fmt == "archive":
+            parsed = iter_records(iter_archive(raw, self.passphrase))
+        else:
+            text = io.TextIOWrapper(raw, encoding="utf-8-sig", newline="")
+            parsed = iter_ndjson(text) if self.fmt == "ndjson" else iter_csv(text)
+        for row in parsed:
+            row["group_id"] = self._group_id(row.pop("group", None))
+            yield row
+
+    def _drop_empty_groups(self):
+        """Delete the groups created by this import that no credential uses"""
+        if not self.created_groups:
+            return
+        with db_connect(self.db) as cur:
+            query = """
+            DELETE FROM groups WHERE group_id IN (SELECT value FROM json_each(?))
+              AND NOT EXISTS (SELECT 1 FROM credentials WHERE credentials.group_id = groups.group_id);
+            """
+            cur.execute(query, (json.dumps(self.created_groups),))
+        self.created_groups = []
+        self.group_ids = {}
+
+    def _fill_passwords(self, chunk):
+        """Generate passwords for the rows of a chunk that have none, in one batch"""
+        missing = [row for row in chunk if row.get("title") and not row.get("password")]
+        for row, password in zip(missing, generate_many(len(missing), self.generate_length)):
+            row["password"] = password
+        return len(missing)
+
+    def run(self, progress=None, cancelled=None):
+        """
+        Import the file chunk by chunk.
+
+        Args:
+        progress (callable): Called as progress(bytes_read, total_bytes, rows) after each chunk.
+        cancelled (callable): Polled before each chunk, stops the import when it returns True.
+
+        Returns:
+        dict: Counts per outcome, plus "rows" processed, passwords "generated"
+        and whether it was "cancelled".
+        """
+        write = self.creds.upsert_creds if self.mode == "upsert" else self.creds.add_creds
+        totals = {"inserted": 0, "updated": 0, "skipped": 0, "conflicts": 0, "rows": 0, "generated": 0, "cancelled": False}
+        total_bytes = os.path.getsize(self.path)
+
+        with open(self.path, "rb") as raw:
+            rows = self._rows(raw)
+            try:
+                while True:
+                    if cancelled and cancelled():
+                        totals["cancelled"] = True
+                        break
+                    chunk = list(islice(rows, self.chunk_size))
+                    if not chunk:
+                        break
+                    if self.generate_length:
+                        totals["generated"] += self._fill_passwords(chunk)
+                    result = write(chunk, chunk_size=len(chunk))
+                    for outcome, titles in result.items():
+                        totals[outcome] += len(titles)
+                    totals["rows"] += len(chunk)
+                    if progress:
+                        progress(min(raw.tell(), total_bytes), total_bytes, totals["rows"])
+            finally:
+                # Skipped rows and cancelled or failed imports leave no empty groups behind
+                self._drop_empty_groups()
+
+        return totals
+
+
+if __name__ == "__main__":
+    exit("Invalid entry point")
@@ -1,10 +1,75 @@
 from src.modules.contextmanager import db_connect
+from src.modules import storage
+
+# Bits of auditlog.changed, one per credential column
+CHANGE_FLAGS = {
+    "title": 1,
+    "username": 2,
+    "password": 4,
+    "url": 8,
+    "notes": 16,
+    "group_id": 32,
+}
+
+
+# Recount groups.cred_count from the credentials table
+REPAIR_GROUP_COUNTS = """
+UPDATE groups SET cred_count = (
+    SELECT COUNT(*) FROM credentials c WHERE c.group_id = groups.group_id
+)
+WHERE cred_count IS NOT (
+    SELECT COUNT(*) FROM credentials c WHERE c.group_id = groups.group_id
+);
+"""
 
 
 class InitUser:
     def __init__(self, user_db):
         self.user_db = user_db
 
+    def init_settings(self):
+        """Initialize key/value settings table"""
+        with db_connect(self.user_db) as cur:
+            init_settings = """
+            CREATE TABLE IF NOT EXISTS settings (
+                key TEXT PRIMARY KEY,
+                value TEXT
+            );
+            """
+            cur.execute(init_settings)
+
+    def init_storage(self, profile=storage.DEFAULT_PROFILE):
+        """Apply and store the storage profile of a new, empty database"""
+        with db_connect(self.user_db) as cur:
+            storage.init_profile(cur.connection, profile)
+        self.init_settings()
+        with db_connect(self.user_db) as cur:
+            store_profile = """
+            INSERT OR REPLACE INTO settings (key, value) VALUES ('storage_profile', ?);
+            """
+            cur.execute(store_profile, (profile,))
+
+    def init_keys(self):
+        """Initialize key derivation parameters and wrapped data keys"""
+        with db_connect(self.user_db) as cur:
+            init_kdf = """
+            CREATE TABLE IF NOT EXISTS vault_kdf (
+                id INTEGER PRIMARY KEY CHECK (id = 1),
+                salt BLOB NOT NULL,
+                n INTEGER NOT NULL,
+                r INTEGER NOT NULL,
+                p INTEGER NOT NULL
+            );
+            """
+            init_keys = """
+            CREATE TABLE IF NOT EXISTS vault_keys (
+                version INTEGER PRIMARY KEY,
+                wrapped BLOB NOT NULL
+            );
+            """
+            cur.execute(init_kdf)
+            cur.execute(init_keys)
+
     def init_user(self, pw):
         """Initialize user table with password"""
         with db_connect(self.user_db) as cur:
@@ -23,7 +88,8 @@ class InitUser:
             init_group = """
             CREATE TABLE IF NOT EXISTS groups (
                 group_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                title TEXT UNIQUE
+                title TEXT UNIQUE,
+                cred_count INTEGER NOT NULL DEFAULT 0
             );
             """
             cur.execute(init_group)
@@ -53,64 +119,183 @@ class InitUser:
                 log_id INTEGER PRIMARY KEY AUTOINCREMENT,
                 action_type TEXT DEFAULT 'None',
                 action_time TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                details TEXT DEFAULT 'None'
+                details TEXT DEFAULT 'None',
+                entity_type TEXT,
+                entity_id INTEGER,
+                changed INTEGER NOT NULL DEFAULT 0
             );
             """
             cur.execute(init_auditlog)
 
+    def init_rollup(self):
+        """Initialize per-day counts of archived audit entries"""
+        with db_connect(self.user_db) as cur:
+            init_rollup = """
+            CREATE TABLE IF NOT EXISTS audit_rollup (
+                day TEXT NOT NULL,
+                action_type TEXT NOT NULL,
+                count INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (day, action_type)
+            ) WITHOUT ROWID;
+            """
+            cur.execute(init_rollup)
+
+    def init_search(self):
+        """Initialize full-text search index over the unencrypted credential columns"""
+        with db_connect(self.user_db) as cur:
+            init_search = """
+            CREATE VIRTUAL TABLE IF NOT EXISTS credentials_fts USING fts5 (
+                title,
+                username,
+                url,
+                content = 'credentials',
+                content_rowid = 'cred_id',
+                tokenize = 'unicode61 remove_diacritics 2',
+                prefix = '2 3'
+            );
+            """
+            cur.execute(init_search)
+
+    def init_policies(self):
+        """Initialize saved generator policies and the policy column of credentials"""
+        with db_connect(self.user_db) as cur:
+            init_policies = """
+            CREATE TABLE IF NOT EXISTS password_policies (
+                policy_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                name TEXT UNIQUE NOT NULL,
+                rules TEXT NOT NULL
+            );
+            """
+            cur.execute(init_policies)
+            cur.execute("PRAGMA table_info(credentials)")
+            if "policy_id" not in {row[1] for row in cur.fetchall()}:
+                cur.execute("ALTER TABLE credentials ADD COLUMN policy_id INTEGER REFERENCES password_policies(policy_id);")
+
+    def init_health(self):
+        """Initialize keyed password digests used to find reused passwords"""
+        with db_connect(self.user_db) as cur:
+            init_health = """
+            CREATE TABLE IF NOT EXISTS password_index (
+                kind INTEGER NOT NULL,
+                digest INTEGER NOT NULL,
+                cred_id INTEGER NOT NULL,
+                PRIMARY KEY (kind, digest, cred_id)
+            ) WITHOUT ROWID;
+            """
+            cur.execute(init_health)
+            cur.execute("CREATE INDEX IF NOT EXISTS idx_password_index_cred ON password_index (cred_id);")
+
+    def rebuild_search(self):
+        """Re-index every credential in the full-text search table"""
+        with db_connect(self.user_db) as cur:
+            cur.execute("INSERT INTO credentials_fts (credentials_fts) VALUES ('rebuild');")
+
 
 class DatabaseTriggers:
     def __init__(self, user_db):
         self.user_db = user_db
 
+    # Triggers replaced by migrations when their definition changes
+    REPLACEABLE_TRIGGERS = (
+        "after_cred_insert",
+        "after_cred_delete",
+        "after_cred_update",
+        "after_group_insert",
+        "after_group_delete",
+        "after_group_update",
+        "cred_fts_insert",
+        "cred_fts_delete",
+        "cred_fts_update",
+    )
+
     def create_triggers(self):
+        changed_mask = " + ".join(
+            f"(OLD.{column} IS NOT NEW.{column}) * {flag}" for column, flag in CHANGE_FLAGS.items()
+        )
+        # Updates that leave every value as it was are not audited, nor are
+        # re-encryption passes, which set the audit_suspended setting
+        cred_changed = " OR ".join(f"OLD.{column} IS NOT NEW.{column}" for column in CHANGE_FLAGS)
+        cred_changed = f"({cred_changed}) AND NOT EXISTS (SELECT 1 FROM settings WHERE key = 'audit_suspended')"
+        search_changed = " OR ".join(
+            f"OLD.{column} IS NOT NEW.{column}" for column in ("title", "username", "url")
+        )
         triggers = [
             """
             CREATE TRIGGER IF NOT EXISTS after_cred_insert
             AFTER INSERT ON credentials
             BEGIN
-                INSERT INTO auditlog (action_type, action_time, details)
-                VALUES ('INSERT', DATETIME('now'), 'Inserted credential: ' || NEW.title);
+                INSERT INTO auditlog (action_type, action_time, details, entity_type, entity_id)
+                VALUES ('INSERT', DATETIME('now'), 'Inserted credential: ' || NEW.title, 'credential', NEW.cred_id);
             END;
             """,
             """
             CREATE TRIGGER IF NOT EXISTS after_cred_delete 
             AFTER DELETE ON credentials
             BEGIN
-                INSERT INTO auditlog (action_type, action_time, details)
-                VALUES ('DELETE', DATETIME('now'), 'Deleted credential: ' || OLD.title);
+                INSERT INTO auditlog (action_type, action_time, details, entity_type, entity_id)
+                VALUES ('DELETE', DATETIME('now'), 'Deleted credential: ' || OLD.title, 'credential', OLD.cred_id);
             END;
             """,
-            """
+            f"""
             CREATE TRIGGER IF NOT EXISTS after_cred_update
             AFTER UPDATE ON credentials
+            WHEN {cred_changed}
             BEGIN
-                INSERT INTO auditlog (action_type, action_time, details)
-                VALUES ('UPDATE', DATETIME('now'), 'Updated credential: ' || OLD.title);
+                INSERT INTO auditlog (action_type, action_time, details, entity_type, entity_id, changed)
+                VALUES ('UPDATE', DATETIME('now'), 'Updated credential: ' || OLD.title, 'credential', OLD.cred_id, {changed_mask});
             END;
             """,
             """
             CREATE TRIGGER IF NOT EXISTS after_group_insert
             AFTER INSERT ON groups
             BEGIN
-                INSERT INTO auditlog (action_type, action_time, details)
-                VALUES ('INSERT', DATETIME('now'), 'Inserted group: ' || NEW.title);
+                INSERT INTO auditlog (action_type, action_time, details, entity_type, entity_id)
+                VALUES ('INSERT', DATETIME('now'), 'Inserted group: ' || NEW.title, 'group', NEW.group_id);
             END;
             """,
             """
             CREATE TRIGGER IF NOT EXISTS after_group_delete 
             AFTER DELETE ON groups
             BEGIN
-                INSERT INTO auditlog (action_type, action_time, details)
-                VALUES ('DELETE', DATETIME('now'), 'Deleted group: ' || OLD.title);
+                INSERT INTO auditlog (action_type, action_time, details, entity_type, entity_id)
+                VALUES ('DELETE', DATETIME('now'), 'Deleted group: ' || OLD.title, 'group', OLD.group_id);
             END;
             """,
-            """
+            f"""
             CREATE TRIGGER IF NOT EXISTS after_group_update
             AFTER UPDATE ON groups
+            WHEN OLD.title IS NOT NEW.title
+            BEGIN
+                INSERT INTO auditlog (action_type, action_time, details, entity_type, entity_id, changed)
+                VALUES ('UPDATE', DATETIME('now'), 'Updated group: ' || OLD.title, 'group', OLD.group_id,
+                        (OLD.title IS NOT NEW.title) * {CHANGE_FLAGS["title"]});
+            END;
+            """,
+            """
+            CREATE TRIGGER IF NOT EXISTS cred_fts_insert
+            AFTER INSERT ON credentials
+            BEGIN
+                INSERT INTO credentials_fts (rowid, title, username, url)
+                VALUES (NEW.cred_id, NEW.title, NEW.username, NEW.url);
+            END;
+            """,
+            """
+            CREATE TRIGGER IF NOT EXISTS cred_fts_delete
+            AFTER DELETE ON credentials
+            BEGIN
+                INSERT INTO credentials_fts (credentials_fts, rowid, title, username, url)
+                VALUES ('delete', OLD.cred_id, OLD.title, OLD.username, OLD.url);
+            END;
+            """,
+            f"""
+            CREATE TRIGGER IF NOT EXISTS cred_fts_update
+            AFTER UPDATE OF title, username, url ON credentials
+            WHEN {search_changed}
             BEGIN
-                INSERT INTO auditlog (action_type, action_time, details)
-                VALUES ('UPDATE', DATETIME('now'), 'Updated group: ' || OLD.title);
+                INSERT INTO credentials_fts (credentials_fts, rowid, title, username, url)
+                VALUES ('delete', OLD.cred_id, OLD.title, OLD.username, OLD.url);
+                INSERT INTO credentials_fts (rowid, title, username, url)
+                VALUES (NEW.cred_id, NEW.title, NEW.username, NEW.url);
             END;
             """,
         ]
@@ -118,6 +303,197 @@ class DatabaseTriggers:
             for trigger_sql in triggers:
                 cursor.execute(trigger_sql)
 
+    def create_count_triggers(self):
+        """Keep groups.cred_count equal to the number of credentials in each group"""
+        triggers = [
+            """
+            CREATE TRIGGER IF NOT EXISTS group_count_insert
+            AFTER INSERT ON credentials
+            WHEN NEW.group_id IS NOT NULL
+            BEGIN
+                UPDATE groups SET cred_count = cred_count + 1 WHERE group_id = NEW.group_id;
+            END;
+            """,
+            """
+            CREATE TRIGGER IF NOT EXISTS group_count_delete
+            AFTER DELETE ON credentials
+            WHEN OLD.group_id IS NOT NULL
+            BEGIN
+                UPDATE groups SET cred_count = cred_count - 1 WHERE group_id = OLD.group_id;
+            END;
+            """,
+            """
+            CREATE TRIGGER IF NOT EXISTS group_count_update
+            AFTER UPDATE OF group_id ON credentials
+            WHEN OLD.group_id IS NOT NEW.group_id
+            BEGIN
+                UPDATE groups SET cred_count = cred_count - 1 WHERE group_id = OLD.group_id;
+                UPDATE groups SET cred_count = cred_count + 1 WHERE group_id = NEW.group_id;
+            END;
+            """,
+        ]
+        with db_connect(self.user_db) as cursor:
+            for trigger_sql in triggers:
+                cursor.execute(trigger_sql)
+
+    def drop_triggers(self):
+        with db_connect(self.user_db) as cursor:
+            for name in self.REPLACEABLE_TRIGGERS:
+                cursor.execute(f"DROP TRIGGER IF EXISTS {name};")
+
+
+class DatabaseIndexes:
+    def __init__(self, user_db):
+        self.user_db = user_db
+
+    def create_indexes(self):
+        indexes = [
+            # Covering index for the unfiltered credential list (keyset on cred_id)
+            """
+            CREATE INDEX IF NOT EXISTS idx_cred_list
+            ON credentials (cred_id, title, username, group_id);
+            """,
+            # Covering index for the per-group credential list
+            """
+            CREATE INDEX IF NOT EXISTS idx_cred_group_list
+            ON credentials (group_id, cred_id, title, username);
+            """,
+            # Newest-first audit log pages (keyset on action_time, log_id)
+            """
+            CREATE INDEX IF NOT EXISTS idx_audit_time
+            ON auditlog (action_time, log_id);
+            """,
+        ]
+        with db_connect(self.user_db) as cursor:
+            for index_sql in indexes:
+                cursor.execute(index_sql)
+
+    def create_entity_index(self):
+        """Per credential or group history, needs the auditlog entity columns"""
+        with db_connect(self.user_db) as cursor:
+            cursor.execute(
+                """
+                CREATE INDEX IF NOT EXISTS idx_audit_entity
+                ON auditlog (entity_type, entity_id, action_time);
+                """
+            )
+
+
+class Migrations:
+    def __init__(self, user_db):
+        self.user_db = user_db
+        # Applied in order, PRAGMA user_version records how many have run
+        self.steps = [
+            self.add_settings,
+            self.add_list_indexes,
+            self.add_search,
+            self.add_audit_index,
+            self.add_audit_rollup,
+            self.add_audit_entities,
+            self.add_trigger_guards,
+            self.add_group_counts,
+            self.add_keys,
+            self.add_field_encryption,
+            self.add_policies,
+            self.add_health_index,
+        ]
+
+    def version(self):
+        with db_connect(self.user_db) as cur:
+            cur.execute("PRAGMA user_version")
+            return cur.fetchone()[0]
+
+    def migrate(self):
+        """Bring a vault up to the current schema"""
+        version = self.version()
+        for number, step in enumerate(self.steps[version:], version + 1):
+            step()
+            with db_connect(self.user_db) as cur:
+                cur.execute(f"PRAGMA user_version = {number}")
+
+    def add_settings(self):
+        InitUser(self.user_db).init_settings()
+
+    def add_list_indexes(self):
+        DatabaseIndexes(self.user_db).create_indexes()
+
+    def add_search(self):
+        user = InitUser(self.user_db)
+        user.init_search()
+        DatabaseTriggers(self.user_db).create_triggers()
+        user.rebuild_search()
+
+    def add_audit_index(self):
+        DatabaseIndexes(self.user_db).create_indexes()
+
+    def add_audit_rollup(self):
+        InitUser(self.user_db).init_rollup()
+
+    def add_audit_entities(self):
+        with db_connect(self.user_db) as cur:
+            cur.execute("PRAGMA table_info(auditlog)")
+            columns = {row[1] for row in cur.fetchall()}
+            if "entity_type" not in columns:
+                cur.execute("ALTER TABLE auditlog ADD COLUMN entity_type TEXT;")
+                cur.execute("ALTER TABLE auditlog ADD COLUMN entity_id INTEGER;")
+                cur.execute("ALTER TABLE auditlog ADD COLUMN changed INTEGER NOT NULL DEFAULT 0;")
+            # Best effort for older entries: match the title in the details text
+            backfill = """
+            UPDATE auditlog SET
+                entity_type = 'credential',
+                entity_id = (SELECT cred_id FROM credentials WHERE title = substr(details, instr(details, ': ') + 2))
+            WHERE entity_type IS NULL AND details LIKE '% credential: %';
+            """
+            cur.execute(backfill)
+            backfill = """
+            UPDATE auditlog SET
+                entity_type = 'group',
+                entity_id = (SELECT group_id FROM groups WHERE title = substr(details, instr(details, ': ') + 2))
+            WHERE entity_type IS NULL AND details LIKE '% group: %';
+            """
+            cur.execute(backfill)
+        triggers = DatabaseTriggers(self.user_db)
+        triggers.drop_triggers()
+        triggers.create_triggers()
+        DatabaseIndexes(self.user_db).create_entity_index()
+
+    def add_trigger_guards(self):
+        triggers = DatabaseTriggers(self.user_db)
+        triggers.drop_triggers()
+        triggers.create_triggers()
+
+    def add_group_counts(self):
+        with db_connect(self.user_db) as cur:
+            cur.execute("PRAGMA table_info(groups)")
+            if "cred_count" not in {row[1] for row in cur.fetchall()}:
+                cur.execute("ALTER TABLE groups ADD COLUMN cred_count INTEGER NOT NULL DEFAULT 0;")
+            DatabaseTriggers(self.user_db).create_count_triggers()
+            cur.execute(REPAIR_GROUP_COUNTS)
+
+    def add_keys(self):
+        # Keys are set up at the next login, which has the master password
+        InitUser(self.user_db).init_keys()
+
+    def add_field_encryption(self):
+        # Notes are encrypted from now on, so they leave the search index
+        triggers = DatabaseTriggers(self.user_db)
+        triggers.drop_triggers()
+        with db_connect(self.user_db) as cur:
+            cur.execute("DROP TABLE IF EXISTS credentials_fts;")
+        user = InitUser(self.user_db)
+        user.init_search()
+        triggers.create_triggers()
+        user.rebuild_search()
+        # Existing secrets are encrypted at the next login
+        with db_connect(self.user_db) as cur:
+            cur.execute("INSERT OR REPLACE INTO settings (key, value) VALUES ('seal_pending', '1');")
+
+    def add_policies(self):
+        InitUser(self.user_db).init_policies()
+
+    def add_health_index(self):
+        InitUser(self.user_db).init_health()
+
 
 if __name__ == "__main__":
     exit("Invalid entry point")
@@ -0,0 +1,143 @@
+from cryptography.exceptions import InvalidTag
+from src.modules import crypto
+from src.modules.contextmanager import db_connect, db_read
+
+
+def _wrap_aad(version):
+    return f"krypt-key:{version}".encode()
+
+
+class VaultKeys:
+    def __init__(self, db):
+        """
+        Manage the keys of a vault.
+
+        The master password derives a key-encryption key with scrypt, at a cost
+        calibrated per vault. It wraps random data keys, one per key version,
+        which encrypt the vault contents and never leave memory unwrapped.
+
+        Args:
+        db (str): Database path.
+        """
+        self.db = db
+
+    def exists(self):
+        """Whether the vault has keys, False for vaults from before encryption"""
+        with db_read(self.db) as cur:
+            # Vaults not migrated yet have no vault_keys table
+            cur.execute("SELECT COUNT(*) FROM sqlite_master WHERE type = 'table' AND name = 'vault_keys';")
+            if not cur.fetchone()[0]:
+                return False
+            cur.execute("SELECT COUNT(*) FROM vault_keys;")
+            return cur.fetchone()[0] > 0
+
+    def _kek(self, password):
+        with db_read(self.db) as cur:
+            cur.execute("SELECT salt, n, r, p FROM vault_kdf WHERE id = 1;")
+            row = cur.fetchone()
+        if not row:
+            return None
+        salt, n, r, p = row
+        return crypto.derive_key(password, salt, n, r, p)
+
+    def unlock(self, password):
+        """
+        Unwrap every data key with the master password.
+
+        Returns:
+        dict: Key version to data key, None if the password is wrong.
+        """
+        kek = self._kek(password)
+        if kek is None:
+            return None
+        with db_read(self.db) as cur:
+            cur.execute("SELECT version, wrapped FROM vault_keys;")
+            rows = cur.fetchall()
+        try:
+            return {version: crypto.decrypt(kek, wrapped, _wrap_aad(version)) for version, wrapped in rows}
+        except InvalidTag:
+            return None
+
+    def wrap(self, password, keys):
+        """
+        Wrap data keys under a freshly calibrated key derived from password.
+
+        Calibration and derivation take a second or more, so this runs
+        before the write transaction that stores the result.
+
+        Args:
+        password (str): Master password.
+        keys (dict): Key version to data key.
+
+        Returns:
+        tuple: vault_kdf row (salt, n, r, p) and (version, wrapped key) rows.
+        """
+        params = crypto.calibrate()
+        salt = crypto.new_salt()
+        kek = crypto.derive_key(password, salt, **params)
+        wrapped = [(version, crypto.encrypt(kek, key, _wrap_aad(version))) for version, key in keys.items()]
+        return (salt, params["n"], params["r"], params["p"]), wrapped
+
+    def store(self, wrapped, cur):
+        """
+        Replace the stored salt, scrypt cost and every wrapped key, inside the caller's transaction.
+
+        Args:
+        wrapped (tuple): Result of wrap().
+        cur (sqlite3.Cursor): Cursor of an open write transaction.
+        """
+        kdf, rows = wrapped
+        cur.execute("INSERT OR REPLACE INTO vault_kdf (id, salt, n, r, p) VALUES (1, ?, ?, ?, ?);", kdf)
+        cur.execute("DELETE FROM vault_keys;")
+        cur.executemany("INSERT INTO vault_keys (version, wrapped) VALUES (?, ?);", rows)
+
+    def setup(self, password):
+        """Create the first data key of a vault, returning {1: key}"""
+        keys = {1: crypto.new_key()}
+        wrapped = self.wrap(password, keys)
+        with db_connect(self.db) as cur:
+            self.store(wrapped, cur)
+        return keys
+
+    def rewrap(self, current_password, new_password):
+        """
+        Wrap the data keys under a new master password, recalibrating the scrypt cost.
+
+        Returns:
+        dict: Key version to data key, None if current_password is wrong.
+        """
+        keys = self.unlock(current_password)
+        if keys is None:
+            return None
+        wrapped = self.wrap(new_password, keys)
+        with db_connect(self.db) as cur:
+            self.store(wrapped, cur)
+        return keys
+
+    def rotate(self, current_password, new_password):
+        """
+        Change the master password and start using a new data key.
+
+        The new key is stored next to the old ones, which stay wrapped until
+        the re-key pass recorded in the settings table has re-encrypted every
+        row, see Rekey.
+
+        Returns:
+        dict: Key version to data key, None if current_password is wrong.
+        """
+        keys = self.unlock(current_password)
+        if keys is None:
+            return None
+        version = max(keys) + 1
+        keys[version] = crypto.new_key()
+        wrapped = self.wrap(new_password, keys)
+        with db_connect(self.db) as cur:
+            self.store(wrapped, cur)
+            query = "INSERT OR REPLACE INTO settings (key, value) VALUES (?, ?);"
+            cur.execute(query, ("rekey_version", str(version)))
+            cur.execute(query, ("rekey_after", "0"))
+        return keys
+
+
+if __name__ == "__main__":
+    exit("Invalid entry point")
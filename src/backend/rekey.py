@@ -0,0 +1,121 @@
+from src.modules import crypto
+from src.modules.contextmanager import db_connect, db_read
+from .user import SECRET_FIELDS, audit_suspended, open_fields, seal_fields
+
+
+class Rekey:
+    def __init__(self, db, chunk_size=500):
+        """
+        Re-encrypt the secrets of a vault under its newest data key.
+
+        The pass walks the credentials in cred_id order, one short write
+        transaction per chunk, and stores its position in the settings table
+        in the same transaction, so an interrupted pass resumes where it
+        stopped. Older keys stay available until the pass is done, so the
+        vault remains readable while rows use mixed key versions.
+
+        Args:
+        db (str): Database path.
+        chunk_size (int): Credentials re-encrypted per transaction.
+        """
+        self.db = db
+        self.chunk_size = chunk_size
+
+    def pending(self):
+        """Return (target version, last finished cred_id) of an unfinished pass, or None"""
+        with db_read(self.db) as cur:
+            cur.execute("SELECT key, value FROM settings WHERE key IN ('rekey_version', 'rekey_after');")
+            values = dict(cur.fetchall())
+        if not values.get("rekey_version"):
+            return None
+        return int(values["rekey_version"]), int(values.get("rekey_after") or 0)
+
+    def _stale(self, cur, version):
+        """Number of credentials with a secret not yet sealed under version"""
+        marker = crypto.FIELD_HEADER.pack(crypto.FIELD_FORMAT, version)
+        condition = " OR ".join(
+            f"({column} IS NOT NULL AND (typeof({column}) != 'blob' OR substr({column}, 1, ?) < ?))"
+            for column in SECRET_FIELDS
+        )
+        cur.execute(
+            f"SELECT COUNT(*) FROM credentials WHERE {condition};",
+            (len(marker), marker) * len(SECRET_FIELDS),
+        )
+        return cur.fetchone()[0]
+
+    def _finish(self, cur, version):
+        """Drop the keys older than version once no row needs them"""
+        cur.execute("DELETE FROM vault_keys WHERE version < ?;", (version,))
+        cur.execute("DELETE FROM settings WHERE key IN ('rekey_version', 'rekey_after');")
+        keys = crypto.get_keys(self.db)
+        crypto.remember(self.db, {v: key for v, key in keys.items() if v >= version})
+
+    def _rewrite(self, cur, rows, version):
+        """Seal every secret of rows that is not under version yet, returning the count"""
+        items = [
+            (row[0], column, value)
+            for row in rows
+            for column, value in zip(SECRET_FIELDS, row[1:])
+            if value is not None and crypto.sealed_version(value) != version
+        ]
+        if not items:
+            return 0
+        plain = open_fields(self.db, items)
+        sealed = seal_fields(self.db, [(cred_id, column, text) for (cred_id, column, _), text in zip(items, plain)])
+        for column in SECRET_FIELDS:
+            cur.executemany(
+                f"UPDATE credentials SET {column} = ? WHERE cred_id = ?;",
+                [(value, cred_id) for (cred_id, col, _), value in zip(items, sealed) if col == column],
+            )
+        return len(items)
+
+    def run(self, progress=None, cancelled=None):
+        """
+        Continue the pending pass until every row is re-encrypted.
+
+        Args:
+        progress (callable): Called with (done, total) credentials after every chunk.
+        cancelled (callable): Polled between chunks, stops the pass when it returns True.
+
+        Returns:
+        dict: "fields" re-encrypted, and whether the pass was "done".
+        """
+        state = self.pending()
+        if state is None:
+            return {"fields": 0, "done": True}
+        version, after = state
+        if version not in crypto.key_versions(self.db):
+            raise KeyError(f"Key version {version} is not unlocked")
+
+        with db_read(self.db) as cur:
+            cur.execute("SELECT COUNT(*), COALESCE(SUM(cred_id <= ?), 0) FROM credentials;", (after,))
+            total, done = cur.fetchone()
+
+        fields = 0
+        while True:
+            if cancelled and cancelled():
+                return {"fields": fields, "done": False}
+            with db_connect(self.db) as cur:
+                query = """SELECT cred_id, password, notes FROM credentials WHERE cred_id > ? ORDER BY cred_id LIMIT ?;"""
+                cur.execute(query, (after, self.chunk_size))
+                rows = cur.fetchall()
+                if not rows:
+                    # Rows written with an old key behind the checkpoint restart the pass
+                    if self._stale(cur, version):
+                        after = done = 0
+                        cur.execute("UPDATE settings SET value = '0' WHERE key = 'rekey_after';")
+                        continue
+                    self._finish(cur, version)
+                    return {"fields": fields, "done": True}
+
+                after = rows[-1][0]
+                with audit_suspended(cur):
+                    fields += self._rewrite(cur, rows, version)
+                cur.execute("UPDATE settings SET value = ? WHERE key = 'rekey_after';", (str(after),))
+            done += len(rows)
+            if progress:
+                progress(min(done, total), total)
+
+
+if __name__ == "__main__":
+    exit("Invalid entry point")
@@ -0,0 +1,271 @@
+import os
+import json
+import zlib
+import struct
+from src.modules.contextmanager import db_connect, db_read
+
+SEGMENT_MAGIC = b"KRYPTAUD1\n"
+SEGMENT_SUFFIX = ".seg"
+
+# Frame header: compressed length, row count, first and last action_time
+FRAME = struct.Struct(">II19s19s")
+
+COLUMNS = ("log_id", "action_type", "action_time", "details", "entity_type", "entity_id", "changed")
+
+# Preset policies offered in the UI, (days, rows)
+POLICIES = {
+    "forever": (None, None),
+    "30_days": (30, None),
+    "90_days": (90, None),
+    "1_year": (365, None),
+    "1000_rows": (None, 1000),
+    "10000_rows": (None, 10000),
+}
+
+
+def segment_dir(db):
+    """Directory holding the archived audit segments of a vault"""
+    return os.path.splitext(db)[0] + ".audit"
+
+
+def _time_field(value):
+    return str(value or "")[:19].ljust(19).encode()
+
+
+def iter_frames(path):
+    """
+    Yield (first_time, last_time, count, payload) for every complete frame of a segment.
+
+    A partially written frame at the end of the file is ignored.
+    """
+    with open(path, "rb") as f:
+        if f.read(len(SEGMENT_MAGIC)) != SEGMENT_MAGIC:
+            raise ValueError(f"Not an audit segment: {path}")
+        while True:
+            header = f.read(FRAME.size)
+            if len(header) < FRAME.size:
+                return
+            length, count, first, last = FRAME.unpack(header)
+            payload = f.read(length)
+            if len(payload) < length:
+                return
+            yield first.decode().strip(), last.decode().strip(), count, payload
+
+
+def decode_frame(payload):
+    """Decompress a frame into audit records"""
+    return [json.loads(line) for line in zlib.decompress(payload).splitlines()]
+
+
+class Retention:
+    def __init__(self, db, batch_size=5000, segment_size=4 * 1024 * 1024):
+        """
+        Move expired audit entries out of the vault into compressed segment files.
+
+        Every batch is appended to the newest segment as one zlib frame and
+        synced before the rows are deleted, so entries are never lost. Counts
+        per day and action type are kept in the audit_rollup table.
+
+        Args:
+        db (str): Database path.
+        batch_size (int): Entries archived per frame and transaction.
+        segment_size (int): Size in bytes after which a new segment is started.
+        """
+        self.db = db
+        self.batch_size = batch_size
+        self.segment_size = segment_size
+        self.directory = segment_dir(db)
+
+    def get_policy(self):
+        """Return the (days, rows) limits, None meaning unlimited"""
+        with db_read(self.db) as cur:
+            cur.execute(
+                "SELECT key, value FROM settings WHERE key IN ('audit_keep_days', 'audit_keep_rows');"
+            )
+            values = dict(cur.fetchall())
+        days = values.get("audit_keep_days")
+        rows = values.get("audit_keep_rows")
+        return (int(days) if days else None, int(rows) if rows else None)
+
+    def set_policy(self, days=None, rows=None):
+        """
+        Store the retention policy of the vault.
+
+        Args:
+        days (int): Keep entries of the last N days, unlimited if None.
+        rows (int): Keep the newest N entries, unlimited if None.
+        """
+        for value in (days, rows):
+            if value is not None and (not isinstance(value, int) or value < 1):
+                raise ValueError(f"Invalid retention limit: {value}")
+        with db_connect(self.db) as cur:
+            query = "INSERT OR REPLACE INTO settings (key, value) VALUES (?, ?);"
+            cur.execute(query, ("audit_keep_days", str(days) if days else ""))
+            cur.execute(query, ("audit_keep_rows", str(rows) if rows else ""))
+
+    def segments(self):
+        """Segment file paths, oldest first"""
+        if not os.path.isdir(self.directory):
+            return []
+        names = sorted(n for n in os.listdir(self.directory) if n.endswith(SEGMENT_SUFFIX))
+        return [os.path.join(self.directory, name) for name in names]
+
+    def _boundary(self, days, rows):
+        """(action_time, log_id) below which entries expire, None if nothing does"""
+        bounds = []
+        with db_read(self.db) as cur:
+            if days:
+                cur.execute("SELECT datetime('now', ?);", (f"-{days} days",))
+                bounds.append((cur.fetchone()[0], 0))
+            if rows:
+                query = """
+                SELECT action_time, log_id FROM auditlog
+                ORDER BY action_time DESC, log_id DESC
+                LIMIT 1 OFFSET ?;
+                """
+                cur.execute(query, (rows - 1,))
+                row = cur.fetchone()
+                if row:
+                    bounds.append(tuple(row))
+        return max(bounds) if bounds else None
+
+    def _open_segment(self):
+        """Open the newest segment for appending, starting a new one when full"""
+        os.makedirs(self.directory, exist_ok=True)
+        paths = self.segments()
+        if paths and os.path.getsize(paths[-1]) < self.segment_size:
+            return open(paths[-1], "ab")
+        number = int(os.path.basename(paths[-1])[: -len(SEGMENT_SUFFIX)]) + 1 if paths else 1
+        f = open(os.path.join(self.directory, f"{number:06d}{SEGMENT_SUFFIX}"), "xb")
+        f.write(SEGMENT_MAGIC)
+        return f
+
+    def _append(self, rows):
+        payload = zlib.compress(
+            b"\n".join(json.dumps(dict(zip(COLUMNS, row))).encode() for row in rows), 6
+        )
+        with self._open_segment() as f:
+            f.write(FRAME.pack(len(payload), len(rows), _time_field(rows[0][2]), _time_field(rows[-1][2])))
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _commit(self, log_ids):
+        """Roll up and delete archived entries that are still in the live table"""
+        ids = json.dumps(log_ids)
+        with db_connect(self.db) as cur:
+            rollup = """
+            INSERT INTO audit_rollup (day, action_type, count)
+            SELECT date(action_time), action_type, COUNT(*) FROM auditlog
+            WHERE log_id IN (SELECT value FROM json_each(?))
+            GROUP BY date(action_time), action_type
+            ON CONFLICT (day, action_type) DO UPDATE SET count = count + excluded.count;
+            """
+            cur.execute(rollup, (ids,))
+            cur.execute("DELETE FROM auditlog WHERE log_id IN (SELECT value FROM json_each(?));", (ids,))
+
+    def _recover(self):
+        """Finish a run interrupted between appending a frame and deleting its rows"""
+        paths = self.segments()
+        if not paths:
+            return
+        if os.path.getsize(paths[-1]) < len(SEGMENT_MAGIC):
+            with open(paths[-1], "wb") as f:
+                f.write(SEGMENT_MAGIC)
+        end = len(SEGMENT_MAGIC)
+        last = None
+        for _, _, _, payload in iter_frames(paths[-1]):
+            end += FRAME.size + len(payload)
+            last = payload
+        # Drop a frame that was only partly written
+        if os.path.getsize(paths[-1]) > end:
+            with open(paths[-1], "r+b") as f:
+                f.truncate(end)
+        if last is not None:
+            self._commit([record["log_id"] for record in decode_frame(last)])
+
+    def run(self):
+        """
+        Archive every entry outside the retention policy.
+
+        Returns:
+        int: Number of entries archived.
+        """
+        days, rows = self.get_policy()
+        self._recover()
+        boundary = self._boundary(days, rows)
+        if boundary is None:
+            return 0
+
+        archived = 0
+        while True:
+            with db_read(self.db) as cur:
+                query = """
+                SELECT log_id, action_type, action_time, details, entity_type, entity_id, changed
+                FROM auditlog
+                WHERE (action_time, log_id) < (?, ?)
+                ORDER BY action_time, log_id
+                LIMIT ?;
+                """
+                cur.execute(query, (*boundary, self.batch_size))
+                batch = cur.fetchall()
+            if not batch:
+                return archived
+            self._append(batch)
+            self._commit([row[0] for row in batch])
+            archived += len(batch)
+
+    def search(self, text=None, action_type=None, since=None, until=None, entity_type=None, entity_id=None):
+        """
+        Stream archived entries, oldest first.
+
+        Args:
+        text (str): Case-insensitive substring of the details.
+        action_type (str): Only entries of this action type.
+        since (str): Only entries at or after this time, "YYYY-MM-DD[ HH:MM:SS]".
+        until (str): Only entries before this time.
+        entity_type (str): Only entries of "credential" or "group" records.
+        entity_id (int): Only entries of this cred_id or group_id.
+
+        Yields:
+        dict: Archived audit entry.
+        """
+        needle = text.lower() if text else None
+        for path in self.segments():
+            for first, last, _, payload in iter_frames(path):
+                # Skip frames outside the time range without decompressing them
+                if since and last < since:
+                    continue
+                if until and first >= until:
+                    continue
+                for record in decode_frame(payload):
+                    time = record["action_time"] or ""
+                    if since and time < since:
+                        continue
+                    if until and time >= until:
+                        continue
+                    if action_type and record["action_type"] != action_type:
+                        continue
+                    if entity_type and record.get("entity_type") != entity_type:
+                        continue
+                    if entity_id is not None and record.get("entity_id") != entity_id:
+                        continue
+                    if needle and needle not in str(record["details"]).lower():
+                        continue
+                    yield record
+
+    def rollups(self, since=None, until=None):
+        """
+        Archived entry counts per day.
+
+        Returns:
+        list: (day, action_type, count) rows, oldest first.
+        """
+        with db_read(self.db) as cur:
+            query = "SELECT day, action_type, count FROM audit_rollup WHERE day >= ? AND day < ? ORDER BY day, action_type;"
+            cur.execute(query, (since or "", until or "9999"))
+            return cur.fetchall()
+
+
+if __name__ == "__main__":
+    exit("Invalid entry point")
@@ -1,5 +1,185 @@
-from .init import InitUser as iu
-from src.modules.contextmanager import db_connect
+import re
+import json
+from contextlib import contextmanager
+from itertools import islice
+from .init import InitUser as iu, CHANGE_FLAGS, REPAIR_GROUP_COUNTS
+from src.modules.contextmanager import db_connect, db_read, connect, get_pool
+from src.modules import storage, crypto
+from src.modules.pw_gen import Policy
+
+CRED_FIELDS = ("title", "username", "password", "url", "notes", "group_id")
+# Columns stored encrypted, bound to their cred_id
+SECRET_FIELDS = ("password", "notes")
+
+
+def _chunked(iterable, size):
+    """Yield lists of at most size items from an iterable"""
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _cred_row(row):
+    """Normalize a credential dict or tuple into an insert tuple, or None if invalid"""
+    if isinstance(row, dict):
+        row = tuple(row.get(field) for field in CRED_FIELDS)
+    else:
+        row = tuple(row) + (None,) * (len(CRED_FIELDS) - len(row))
+    title, username, password, url, notes, group_id = row[: len(CRED_FIELDS)]
+    # Imported numbers become text, nested values make the row invalid
+    texts = []
+    for value in (title, username, password, url, notes):
+        if isinstance(value, (int, float)):
+            value = str(value)
+        elif value is not None and not isinstance(value, str):
+            return None
+        texts.append(value)
+    title, username, password, url, notes = texts
+    if not title or username is None or password is None:
+        return None
+    return (
+        title,
+        username,
+        password,
+        "None" if url is None else url,
+        "None" if notes is None else notes,
+        group_id,
+    )
+
+
+def _row_title(row):
+    """Best-effort title of a raw credential row, for reporting"""
+    if isinstance(row, dict):
+        return row.get("title")
+    return row[0] if row else None
+
+
+def _existing_titles(cur, titles):
+    """Return the subset of titles already present in the credentials table"""
+    query = """SELECT title FROM credentials WHERE title IN (SELECT value FROM json_each(?));"""
+    cur.execute(query, (json.dumps(titles),))
+    return {row[0] for row in cur.fetchall()}
+
+
+def _field_aad(cred_id, column):
+    return f"credentials:{cred_id}:{column}".encode()
+
+
+def _begin_immediate(cur):
+    """Take the database write lock now, so reads in the transaction stay valid for its writes"""
+    if not cur.connection.in_transaction:
+        cur.execute("BEGIN IMMEDIATE")
+
+
+def _next_cred_ids(cur, count):
+    """Reserve count consecutive cred_ids, inside a transaction opened by _begin_immediate"""
+    query = """
+    SELECT MAX(
+        COALESCE((SELECT seq FROM sqlite_sequence WHERE name = 'credentials'), 0),
+        COALESCE((SELECT MAX(cred_id) FROM credentials), 0)
+    );
+    """
+    cur.execute(query)
+    start = cur.fetchone()[0] + 1
+    return range(start, start + count)
+
+
+@contextmanager
+def audit_suspended(cur):
+    """
+    Keep the audit triggers quiet for rewrites of existing values inside the block.
+
+    If the block raises, its transaction is rolled back before the error
+    propagates, so the flag is never committed and auditing stays on.
+    """
+    cur.execute("INSERT OR REPLACE INTO settings (key, value) VALUES ('audit_suspended', '1');")
+    try:
+        yield
+    except BaseException:
+        cur.connection.rollback()
+        raise
+    finally:
+        cur.execute("DELETE FROM settings WHERE key = 'audit_suspended';")
+
+
+def seal_fields(db, items):
+    """
+    Encrypt (cred_id, column, text) items with the newest key of an unlocked vault.
+
+    Returns:
+    list: Sealed values in the order of items.
+    """
+    keys = crypto.get_keys(db)
+    version = max(keys)
+    key = keys[version]
+
+    def work(batch):
+        return [
+            None if text is None else crypto.seal(key, version, text, _field_aad(cred_id, column))
+            for cred_id, column, text in batch
+        ]
+
+    return crypto.map_batch(work, list(items))
+
+
+def open_fields(db, items):
+    """
+    Decrypt (cred_id, column, value) items of an unlocked vault.
+
+    Values that are not encrypted yet are returned as they are.
+
+    Returns:
+    list: Plaintext values in the order of items.
+    """
+    keys = crypto.get_keys(db)
+
+    def work(batch):
+        values = []
+        for cred_id, column, value in batch:
+            version = crypto.sealed_version(value)
+            if version is None:
+                values.append(value)
+            else:
+                values.append(crypto.unseal(keys[version], value, _field_aad(cred_id, column)))
+        return values
+
+    return crypto.map_batch(work, list(items))
+
+
+def _match_query(text):
+    """Turn free text into an FTS5 query that prefix-matches every word"""
+    words = re.findall(r"\w+", text)
+    return " ".join(f'"{word}"*' for word in words)
+
+
+def search_credentials(cur, query, group_id=None, limit=50):
+    """Run a credentials search on an open cursor, see Credentials.search"""
+    match = _match_query(query)
+    if not match:
+        return []
+    sql = """
+    SELECT c.cred_id, c.title, c.username, c.group_id
+    FROM credentials_fts
+    JOIN credentials c ON c.cred_id = credentials_fts.rowid
+    WHERE credentials_fts MATCH ?
+    """
+    params = [match]
+    if group_id is not None and group_id != -1:
+        sql += " AND c.group_id = ?"
+        params.append(group_id)
+    # Title hits weigh most, then username and url
+    sql += " ORDER BY bm25(credentials_fts, 10.0, 5.0, 2.0) LIMIT ?;"
+    params.append(limit)
+    cur.execute(sql, params)
+    return cur.fetchall()
+
+
+def changed_columns(mask):
+    """Names of the credential columns set in an auditlog.changed mask"""
+    return [column for column, flag in CHANGE_FLAGS.items() if mask & flag]
 
 
 class Credentials:
@@ -14,25 +194,353 @@ class Credentials:
 
     def add_cred(self, title, username, password, url, notes, group_id):
         with db_connect(self.db) as cur:
-            query = """INSERT INTO credentials (title, username, password, url, notes, group_id) VALUES (?, ?, ?, ?, ?, ?);"""
-            params = (title, username, password, url, notes, group_id)
+            # Another process may add credentials between the id and the insert otherwise
+            _begin_immediate(cur)
+            cred_id = _next_cred_ids(cur, 1)[0]
+            password, notes = seal_fields(self.db, [(cred_id, "password", password), (cred_id, "notes", notes)])
+            query = """INSERT INTO credentials (cred_id, title, username, password, url, notes, group_id) VALUES (?, ?, ?, ?, ?, ?, ?);"""
+            params = (cred_id, title, username, password, url, notes, group_id)
             cur.execute(query, params)
+            return cred_id
 
     def get_cred(self, title):
-        with db_connect(self.db) as cur:
-            query = """SELECT * FROM credentials WHERE title = ?;"""
+        with db_read(self.db) as cur:
+            query = """SELECT cred_id, title, username, password, url, notes, group_id FROM credentials WHERE title = ?;"""
             cur.execute(query, (title,))
+            row = cur.fetchone()
+        if not row:
+            return None
+        password, notes = open_fields(self.db, [(row[0], "password", row[3]), (row[0], "notes", row[5])])
+        return (row[0], row[1], row[2], password, row[4], notes, row[6])
+
+    def get_row(self, cred_id):
+        """Get a credential in the same shape as list_page rows"""
+        with db_read(self.db) as cur:
+            query = """SELECT cred_id, title, username, group_id FROM credentials WHERE cred_id = ?;"""
+            cur.execute(query, (cred_id,))
+            return cur.fetchone()
+
+    def get_details(self, cred_id, password=True):
+        """
+        Fetch the full record of one credential, including its decrypted secrets.
+
+        Args:
+        cred_id (int): Credential ID.
+        password (bool): Decrypt the password, otherwise it is returned as None.
+
+        Returns:
+        tuple: (title, username, password, url, notes, group_id), or None.
+        """
+        with db_read(self.db) as cur:
+            query = """SELECT title, username, password, url, notes, group_id FROM credentials WHERE cred_id = ?;"""
+            cur.execute(query, (cred_id,))
+            row = cur.fetchone()
+        if not row:
+            return None
+        if not password:
+            (notes,) = open_fields(self.db, [(cred_id, "notes", row[4])])
+            return (row[0], row[1], None, row[3], notes, row[5])
+        password, notes = open_fields(self.db, [(cred_id, "password", row[2]), (cred_id, "notes", row[4])])
+        return (row[0], row[1], password, row[3], notes, row[5])
+
+    def get_secret(self, cred_id, column):
+        """Decrypt a single secret column of one credential, None if it does not exist"""
+        if column not in SECRET_FIELDS:
+            raise ValueError(f"Not a secret column: {column}")
+        with db_read(self.db) as cur:
+            cur.execute(f"SELECT {column} FROM credentials WHERE cred_id = ?;", (cred_id,))
+            row = cur.fetchone()
+        return open_fields(self.db, [(cred_id, column, row[0])])[0] if row else None
+
+    def decrypt_many(self, rows, columns=SECRET_FIELDS):
+        """
+        Decrypt a page of rows at once, spread over a thread pool for large pages.
+
+        Args:
+        rows (list): Rows of cred_id followed by one encrypted value per column.
+        columns (tuple): Secret column of each value.
+
+        Returns:
+        list: The rows with their values decrypted.
+        """
+        width = len(columns)
+        items = [(row[0], column, value) for row in rows for column, value in zip(columns, row[1:])]
+        values = open_fields(self.db, items)
+        return [(row[0], *values[i * width : (i + 1) * width]) for i, row in enumerate(rows)]
+
+    def list_page(self, group_id=None, after=0, limit=200):
+        """
+        Fetch one page of credentials in insertion order, without secrets.
+
+        Args:
+        group_id (int): Only list this group, all credentials if None or -1.
+        after (int): cred_id of the last row of the previous page.
+        limit (int): Maximum number of rows.
+
+        Returns:
+        list: (cred_id, title, username, group_id) rows, served from the covering list indexes.
+        """
+        with db_read(self.db) as cur:
+            if group_id is None or group_id == -1:
+                query = """SELECT cred_id, title, username, group_id FROM credentials WHERE cred_id > ? ORDER BY cred_id LIMIT ?;"""
+                params = (after, limit)
+            else:
+                query = """SELECT cred_id, title, username, group_id FROM credentials WHERE group_id = ? AND cred_id > ? ORDER BY cred_id LIMIT ?;"""
+                params = (group_id, after, limit)
+            cur.execute(query, params)
+            return cur.fetchall()
+
+    def search(self, query, group_id=None, limit=50):
+        """
+        Full-text search over title, username and url, secrets are not indexed.
+
+        Args:
+        query (str): Free text, every word is matched as a prefix.
+        group_id (int): Only search this group, all credentials if None or -1.
+        limit (int): Maximum number of rows.
+
+        Returns:
+        list: (cred_id, title, username, group_id) rows, best match first.
+        """
+        with db_read(self.db) as cur:
+            return search_credentials(cur, query, group_id, limit)
 
     def modify_cred(self, new_title, username, password, url, notes, group_id, title):
+        """Update a credential by title, returning its cred_id or None if it does not exist"""
         with db_connect(self.db) as cur:
-            query = """UPDATE credentials SET title = ?, username = ?, password = ?, url = ?, notes = ?, group_id = ? WHERE title = ?;"""
-            params = (new_title, username, password, url, notes, group_id, title)
-            cur.execute(query, params)
+            query = """SELECT cred_id, password, notes FROM credentials WHERE title = ?;"""
+            cur.execute(query, (title,))
+            row = cur.fetchone()
+            if not row:
+                return None
+            cred_id = row[0]
+            password, notes = self._reseal(cred_id, row[1:], (password, notes))
+            # Leave the row untouched when nothing differs
+            query = """
+            UPDATE credentials SET title = ?, username = ?, password = ?, url = ?, notes = ?, group_id = ?
+            WHERE cred_id = ? AND (title, username, password, url, notes, group_id) IS NOT (?, ?, ?, ?, ?, ?);
+            """
+            values = (new_title, username, password, url, notes, group_id)
+            cur.execute(query, (*values, cred_id, *values))
+            return cred_id
+
+    def _reseal(self, cred_id, stored, texts):
+        """Encrypt new secret values, keeping the stored ciphertext of unchanged ones"""
+        current = open_fields(self.db, [(cred_id, column, value) for column, value in zip(SECRET_FIELDS, stored)])
+        changed = [(cred_id, column, text) for column, text, old in zip(SECRET_FIELDS, texts, current) if text != old]
+        sealed = iter(seal_fields(self.db, changed))
+        return tuple(
+            next(sealed) if text != old else value
+            for text, old, value in zip(texts, current, stored)
+        )
 
     def remove_cred(self, title):
+        """Delete a credential by title, returning its cred_id or None if it does not exist"""
         with db_connect(self.db) as cur:
-            query = """DELETE FROM credentials WHERE title = ?;"""
-            cur.execute(query, (title,))
+            cur.execute("""SELECT cred_id FROM credentials WHERE title = ?;""", (title,))
+            row = cur.fetchone()
+            if not row:
+                return None
+            query = """DELETE FROM credentials WHERE cred_id = ?;"""
+            cur.execute(query, (row[0],))
+            return row[0]
+
+    def _write_chunks(self, rows, chunk_size, write):
+        """Run write(cur, chunk) for each chunk of rows in its own write-locked transaction"""
+        with db_connect(self.db) as cur:
+            for chunk in _chunked(rows, chunk_size):
+                try:
+                    _begin_immediate(cur)
+                    write(cur, chunk)
+                    cur.connection.commit()
+                except Exception:
+                    cur.connection.rollback()
+                    raise
+
+    def add_creds(self, rows, chunk_size=500):
+        """
+        Insert many credentials, committing once per chunk.
+
+        Args:
+        rows (iterable): Credential dicts or (title, username, password, url, notes, group_id) tuples.
+        chunk_size (int): Rows written per transaction.
+
+        Returns:
+        dict: Titles that were "inserted", "skipped" (invalid or repeated in the input)
+        or in "conflicts" with an existing title.
+        """
+        result = {"inserted": [], "skipped": [], "conflicts": []}
+        seen = set()
+        query = """INSERT INTO credentials (cred_id, title, username, password, url, notes, group_id) VALUES (?, ?, ?, ?, ?, ?, ?);"""
+
+        def write(cur, chunk):
+            batch = []
+            for row in chunk:
+                params = _cred_row(row)
+                if params is None or params[0] in seen:
+                    result["skipped"].append(_row_title(row))
+                    continue
+                seen.add(params[0])
+                batch.append(params)
+
+            existing = _existing_titles(cur, [params[0] for params in batch])
+            new = [params for params in batch if params[0] not in existing]
+            cur.executemany(query, self._sealed_inserts(cur, new))
+            result["conflicts"].extend(params[0] for params in batch if params[0] in existing)
+            result["inserted"].extend(params[0] for params in new)
+
+        self._write_chunks(rows, chunk_size, write)
+        return result
+
+    def _sealed_inserts(self, cur, rows):
+        """Assign cred_ids to new rows and encrypt their secrets, in one batch"""
+        ids = _next_cred_ids(cur, len(rows))
+        items = []
+        for cred_id, (_, _, password, _, notes, _) in zip(ids, rows):
+            items.append((cred_id, "password", password))
+            items.append((cred_id, "notes", notes))
+        sealed = seal_fields(self.db, items)
+        return [
+            (cred_id, title, username, sealed[2 * i], url, sealed[2 * i + 1], group_id)
+            for i, (cred_id, (title, username, _, url, _, group_id)) in enumerate(zip(ids, rows))
+        ]
+
+    def upsert_creds(self, rows, chunk_size=500):
+        """
+        Insert new credentials and overwrite existing ones matched by title.
+
+        Args:
+        rows (iterable): Credential dicts or (title, username, password, url, notes, group_id) tuples.
+        chunk_size (int): Rows written per transaction.
+
+        Returns:
+        dict: Titles that were "inserted", "updated" or "skipped" as invalid.
+        """
+        result = {"inserted": [], "updated": [], "skipped": []}
+        insert = """INSERT INTO credentials (cred_id, title, username, password, url, notes, group_id) VALUES (?, ?, ?, ?, ?, ?, ?);"""
+        update = """
+        UPDATE credentials SET username = ?, password = ?, url = ?, notes = ?, group_id = ?
+        WHERE cred_id = ? AND (username, password, url, notes, group_id) IS NOT (?, ?, ?, ?, ?);
+        """
+
+        def write(cur, chunk):
+            batch = {}
+            for row in chunk:
+                params = _cred_row(row)
+                if params is None:
+                    result["skipped"].append(_row_title(row))
+                    continue
+                batch[params[0]] = params
+
+            query = """
+            SELECT cred_id, title, password, notes FROM credentials
+            WHERE title IN (SELECT value FROM json_each(?));
+            """
+            cur.execute(query, (json.dumps(list(batch)),))
+            existing = {row[1]: row for row in cur.fetchall()}
+
+            # Compare with the decrypted secrets so unchanged rows stay untouched
+            stored = self.decrypt_many([(row[0], row[2], row[3]) for row in existing.values()])
+            current = {row[0]: row[1:] for row in stored}
+            changed = []
+            for title, row in existing.items():
+                texts = (batch[title][2], batch[title][4])
+                changed.extend(
+                    (row[0], column, text)
+                    for column, text, old in zip(SECRET_FIELDS, texts, current[row[0]])
+                    if text != old
+                )
+            sealed = dict(zip(((cred_id, column) for cred_id, column, _ in changed), seal_fields(self.db, changed)))
+
+            updates = []
+            for title, row in existing.items():
+                _, username, password, url, notes, group_id = batch[title]
+                values = (
+                    username,
+                    sealed.get((row[0], "password"), row[2]),
+                    url,
+                    sealed.get((row[0], "notes"), row[3]),
+                    group_id,
+                )
+                updates.append((*values, row[0], *values))
+            cur.executemany(update, updates)
+
+            new = [params for title, params in batch.items() if title not in existing]
+            cur.executemany(insert, self._sealed_inserts(cur, new))
+            for title in batch:
+                result["updated" if title in existing else "inserted"].append(title)
+
+        self._write_chunks(rows, chunk_size, write)
+        return result
+
+    def encrypt_pending(self, chunk_size=500):
+        """
+        Encrypt secrets stored before encryption was introduced, one chunk per transaction.
+
+        Runs only while the seal_pending setting is present and removes it
+        when done. These rewrites are not audited.
+
+        Returns:
+        int: Number of fields encrypted.
+        """
+        with db_connect(self.db) as cur:
+            # Left behind by passes that failed before audit_suspended rolled them back
+            cur.execute("DELETE FROM settings WHERE key = 'audit_suspended';")
+            cur.execute("SELECT 1 FROM settings WHERE key = 'seal_pending';")
+            if not cur.fetchone():
+                return 0
+
+        done = 0
+        after = 0
+        while True:
+            with db_connect(self.db) as cur:
+                query = """SELECT cred_id, password, notes FROM credentials WHERE cred_id > ? ORDER BY cred_id LIMIT ?;"""
+                cur.execute(query, (after, chunk_size))
+                rows = cur.fetchall()
+                if not rows:
+                    cur.execute("DELETE FROM settings WHERE key = 'seal_pending';")
+                    return done
+                after = rows[-1][0]
+
+                plain = [
+                    (row[0], column, value)
+                    for row in rows
+                    for column, value in zip(SECRET_FIELDS, row[1:])
+                    if value is not None and crypto.sealed_version(value) is None
+                ]
+                if not plain:
+                    continue
+                with audit_suspended(cur):
+                    sealed = seal_fields(self.db, plain)
+                    for column in SECRET_FIELDS:
+                        cur.executemany(
+                            f"UPDATE credentials SET {column} = ? WHERE cred_id = ?;",
+                            [(value, cred_id) for (cred_id, col, _), value in zip(plain, sealed) if col == column],
+                        )
+                done += len(plain)
+
+    def remove_creds(self, titles, chunk_size=500):
+        """
+        Delete many credentials by title, committing once per chunk.
+
+        Args:
+        titles (iterable): Titles of the credentials to delete.
+        chunk_size (int): Rows deleted per transaction.
+
+        Returns:
+        dict: Titles that were "removed" or "missing" from the vault.
+        """
+        result = {"removed": [], "missing": []}
+        query = """DELETE FROM credentials WHERE title = ?;"""
+
+        def write(cur, chunk):
+            existing = _existing_titles(cur, chunk)
+            cur.executemany(query, ((title,) for title in existing))
+            for title in chunk:
+                result["removed" if title in existing else "missing"].append(title)
+
+        self._write_chunks(titles, chunk_size, write)
+        return result
 
 
 class Groups:
@@ -58,26 +566,25 @@ class Groups:
 
     def get_groups(self):
         """Get all groups with credential counts"""
-        with db_connect(self.db) as cur:
+        with db_read(self.db) as cur:
+            # cred_count is kept up to date by triggers on credentials
             query = """
-            SELECT g.group_id, g.title, COUNT(c.cred_id) as cred_count
-            FROM groups g
-            LEFT JOIN credentials c ON g.group_id = c.group_id
-            GROUP BY g.group_id, g.title
-            ORDER BY g.title;
+            SELECT group_id, title, cred_count
+            FROM groups
+            ORDER BY title;
             """
             cur.execute(query)
             return cur.fetchall()
         
     def get_group(self, group_id):
         """Get group by ID"""
-        with db_connect(self.db) as cur:
+        with db_read(self.db) as cur:
             query = """SELECT * FROM groups WHERE group_id = ?;"""
             cur.execute(query, (group_id,))
             return cur.fetchone()
 
     def get_gid(self, title):
-        with db_connect(self.db) as cur:
+        with db_read(self.db) as cur:
             query = """SELECT group_id FROM groups WHERE title = ?;"""
             cur.execute(query, (title,))
             result = cur.fetchone()
@@ -96,6 +603,84 @@ class Groups:
             cur.execute(query1, (group_id,))
             cur.execute(query2, (group_id,))
 
+    def verify_counts(self):
+        """
+        Compare the stored credential count of every group with a recount.
+
+        Returns:
+        list: (group_id, stored, actual) for each group whose count is wrong.
+        """
+        with db_read(self.db) as cur:
+            query = """
+            SELECT g.group_id, g.cred_count,
+                   (SELECT COUNT(*) FROM credentials c WHERE c.group_id = g.group_id) AS actual
+            FROM groups g
+            WHERE g.cred_count IS NOT actual;
+            """
+            cur.execute(query)
+            return cur.fetchall()
+
+    def repair_counts(self):
+        """Recount the credentials of every group, returning the number of groups fixed"""
+        with db_connect(self.db) as cur:
+            cur.execute(REPAIR_GROUP_COUNTS)
+            return cur.rowcount
+
+
+class Policies:
+    def __init__(self, db):
+        """
+        Handle saved generator policies and the policy of each credential.
+
+        Args:
+        db (str): Database path.
+        """
+        self.db = db
+
+    def save(self, name, policy):
+        """Store a policy under a name, replacing the rules of an existing one, and return its policy_id"""
+        with db_connect(self.db) as cur:
+            query = """
+            INSERT INTO password_policies (name, rules) VALUES (?, ?)
+            ON CONFLICT (name) DO UPDATE SET rules = excluded.rules;
+            """
+            cur.execute(query, (name, json.dumps(policy.to_dict())))
+            cur.execute("SELECT policy_id FROM password_policies WHERE name = ?;", (name,))
+            return cur.fetchone()[0]
+
+    def get(self, policy_id):
+        """Get a saved policy, None if it does not exist"""
+        with db_read(self.db) as cur:
+            cur.execute("SELECT rules FROM password_policies WHERE policy_id = ?;", (policy_id,))
+            row = cur.fetchone()
+        return Policy.from_dict(json.loads(row[0])) if row else None
+
+    def list(self):
+        """Get (policy_id, name) of every saved policy, by name"""
+        with db_read(self.db) as cur:
+            cur.execute("SELECT policy_id, name FROM password_policies ORDER BY name;")
+            return cur.fetchall()
+
+    def delete(self, policy_id):
+        with db_connect(self.db) as cur:
+            query1 = """UPDATE credentials SET policy_id = NULL WHERE policy_id = ?;"""
+            query2 = """DELETE FROM password_policies WHERE policy_id = ?;"""
+            cur.execute(query1, (policy_id,))
+            cur.execute(query2, (policy_id,))
+
+    def assign(self, cred_id, policy_id):
+        """Set the policy a credential's password is generated with, None for the default"""
+        with db_connect(self.db) as cur:
+            query = """UPDATE credentials SET policy_id = ? WHERE cred_id = ?;"""
+            cur.execute(query, (policy_id, cred_id))
+
+    def policy_of(self, cred_id):
+        """Get the policy_id assigned to a credential, None if it has none"""
+        with db_read(self.db) as cur:
+            cur.execute("SELECT policy_id FROM credentials WHERE cred_id = ?;", (cred_id,))
+            row = cur.fetchone()
+        return row[0] if row else None
+
 
 class Audit:
     def __init__(self, db):
@@ -120,6 +705,96 @@ class Audit:
             """
             cur.execute(insert_auditlog, (action_type, details))
 
+    def page(self, before=None, limit=50):
+        """
+        Fetch audit entries newest first, one page at a time.
+
+        Args:
+        before (tuple): (action_time, log_id) of the last entry of the previous page, None for the newest page.
+        limit (int): Maximum number of entries.
+
+        Returns:
+        list: (log_id, action_type, action_time, details) rows.
+        """
+        with db_read(self.db) as cur:
+            query = """
+            SELECT log_id, action_type, action_time, details
+            FROM auditlog
+            """
+            params = []
+            if before is not None:
+                query += " WHERE (action_time, log_id) < (?, ?)"
+                params.extend(before)
+            query += " ORDER BY action_time DESC, log_id DESC LIMIT ?;"
+            params.append(limit)
+            cur.execute(query, params)
+            return cur.fetchall()
+
+    def history(self, entity_type, entity_id, limit=50):
+        """
+        Fetch the audit entries of one credential or group, newest first.
+
+        Args:
+        entity_type (str): "credential" or "group".
+        entity_id (int): cred_id or group_id.
+        limit (int): Maximum number of entries.
+
+        Returns:
+        list: (log_id, action_type, action_time, details, changed) rows.
+        """
+        with db_read(self.db) as cur:
+            query = """
+            SELECT log_id, action_type, action_time, details, changed
+            FROM auditlog
+            WHERE entity_type = ? AND entity_id = ?
+            ORDER BY action_time DESC, log_id DESC
+            LIMIT ?;
+            """
+            cur.execute(query, (entity_type, entity_id, limit))
+            return cur.fetchall()
+
+
+class Storage:
+    def __init__(self, db):
+        """
+        Handle the storage profile of a user database.
+
+        Args:
+        db (str): Database path.
+        """
+        self.db = db
+
+    def get_profile(self):
+        """Get the name of the vault's storage profile"""
+        with db_read(self.db) as cur:
+            return storage.read_profile(cur.connection)
+
+    def set_profile(self, name):
+        """
+        Apply a storage profile to the vault and store it.
+
+        The profile is stored only once the vault has been switched to it, so
+        a failed switch leaves the previous profile in place. Runs a VACUUM
+        when the page size changes, so call it off the UI thread.
+
+        Raises:
+        ValueError: If the profile is unknown.
+        TimeoutError: If readers of the vault stay busy or another process keeps it locked.
+        """
+        if name not in storage.PROFILES:
+            raise ValueError(f"Unknown storage profile: {name}")
+
+        iu(self.db).init_settings()
+        pool = get_pool(self.db)
+        if pool:
+            pool.reconfigure(name)
+        else:
+            connection = connect(self.db)
+            try:
+                storage.rebuild(connection, name)
+            finally:
+                connection.close()
+
 
 if __name__ == "__main__":  # Dummy code, to be replaced
     database = "user.db"
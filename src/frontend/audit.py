@@ -1,14 +1,47 @@
 from PyQt6.QtWidgets import (
     QGridLayout, 
     QVBoxLayout,
+    QHBoxLayout,
     QLabel,
     QWidget,
     QFrame,
     QScrollArea
 )
-from qfluentwidgets import TitleLabel, CardWidget, PushButton, TransparentPushButton
-from PyQt6.QtCore import Qt, QPoint
-from src.modules.contextmanager import db_connect
+from qfluentwidgets import TitleLabel, CardWidget, PushButton, TransparentPushButton, ComboBox
+from PyQt6.QtCore import Qt, QPoint, QObject, QThread, pyqtSignal
+from src.backend.user import Audit
+from src.backend.retention import Retention, POLICIES
+
+# Entries fetched per scroll page
+PAGE_SIZE = 50
+
+POLICY_LABELS = {
+    "forever": "Keep forever",
+    "30_days": "Keep 30 days",
+    "90_days": "Keep 90 days",
+    "1_year": "Keep 1 year",
+    "1000_rows": "Keep last 1,000",
+    "10000_rows": "Keep last 10,000",
+}
+
+
+class RetentionWorker(QObject):
+    finished = pyqtSignal(int)
+    failed = pyqtSignal(str)
+
+    def __init__(self, db_path, days, rows):
+        super().__init__()
+        self.db_path = db_path
+        self.days = days
+        self.rows = rows
+
+    def run(self):
+        try:
+            retention = Retention(self.db_path)
+            retention.set_policy(self.days, self.rows)
+            self.finished.emit(retention.run())
+        except Exception as e:
+            self.failed.emit(str(e))
 
 class LogDetailPopup(QFrame):
     def __init__(self, details, parent=None):
@@ -70,9 +103,19 @@ class AuditLogButton(TransparentPushButton):
             self.popup_visible = True
 
 class AuditLogCard(CardWidget):
-    def __init__(self, db_path, parent=None):
+    def __init__(self, db_path, jobs, parent=None):
         super().__init__(parent)
         self.db_path = db_path
+        self.jobs = jobs
+        self.audit = Audit(db_path)
+        self.retention = Retention(db_path)
+        self.thread = None
+        self.worker = None
+        self.last_entry = None
+        self.exhausted = False
+        # A page is being fetched, and the refresh it belongs to
+        self.loading = False
+        self.generation = 0
         self.setFixedWidth(600)
         self.setup_ui()
         
@@ -89,8 +132,19 @@ class AuditLogCard(CardWidget):
         layout.setContentsMargins(20, 20, 20, 20)
         layout.setSpacing(12)
 
+        header = QHBoxLayout()
         title = TitleLabel("Audit Log")
-        layout.addWidget(title)
+        header.addWidget(title)
+        header.addStretch()
+
+        # Entries outside the policy are moved to the archive
+        self.policy_combo = ComboBox()
+        for name, label in POLICY_LABELS.items():
+            self.policy_combo.addItem(label, userData=name)
+        self.load_policy()
+        self.policy_combo.currentIndexChanged.connect(self.apply_policy)
+        header.addWidget(self.policy_combo)
+        layout.addLayout(header)
 
         scroll = QScrollArea()
         scroll.setWidgetResizable(True)
@@ -111,37 +165,112 @@ class AuditLogCard(CardWidget):
         self.container_layout.setAlignment(Qt.AlignmentFlag.AlignTop)
         self.container_layout.setContentsMargins(0, 0, 0, 0)
 
-        self.refresh_logs()
         scroll.setWidget(self.container)
         layout.addWidget(scroll)
 
-    def load_audit_logs(self):
+        # Load older entries as the list is scrolled towards its end
+        self.scrollbar = scroll.verticalScrollBar()
+        self.scrollbar.valueChanged.connect(self.load_more)
+        self.scrollbar.rangeChanged.connect(self.load_more)
+        self.refresh_logs()
+
+    def load_policy(self):
         try:
-            with db_connect(self.db_path) as cur:
-                query = """
-                SELECT log_id, action_type, action_time, details 
-                FROM auditlog 
-                ORDER BY action_time DESC 
-                LIMIT 50
-                """
-                cur.execute(query)
-                return cur.fetchall()
+            current = self.retention.get_policy()
         except Exception as e:
-            print(f"Error loading audit logs: {e}")
-            return []
+            print(f"Error loading audit retention: {e}")
+            return
+        for name, limits in POLICIES.items():
+            if limits == current:
+                self.policy_combo.setCurrentIndex(self.policy_combo.findData(name))
 
-    def refresh_logs(self):
-        """Refresh the audit log display"""
-        while self.container_layout.count():
-            item = self.container_layout.takeAt(0)
-            if item.widget():
-                item.widget().deleteLater()
-            
-        for log in self.load_audit_logs():
+    def apply_policy(self):
+        """Store the chosen policy and archive expired entries in the background"""
+        if self.thread:
+            return
+        days, rows = POLICIES[self.policy_combo.currentData()]
+        self.policy_combo.setEnabled(False)
+
+        self.thread = QThread(self)
+        self.worker = RetentionWorker(self.db_path, days, rows)
+        self.worker.moveToThread(self.thread)
+        self.thread.started.connect(self.worker.run)
+        self.worker.failed.connect(lambda message: print(f"Error archiving audit log: {message}"))
+        self.worker.finished.connect(self.thread.quit)
+        self.worker.failed.connect(self.thread.quit)
+        self.thread.finished.connect(self.cleanup)
+        self.thread.start()
+
+    def cleanup(self, refresh=True):
+        self.worker.deleteLater()
+        self.thread.deleteLater()
+        self.worker = None
+        self.thread = None
+        self.policy_combo.setEnabled(True)
+        if refresh:
+            self.refresh_logs()
+
+    def stop_retention(self):
+        """Wait for a running archive pass, before the vault is closed"""
+        if not self.thread:
+            return
+        # The vault closes next, so the log is not read again
+        self.thread.finished.disconnect(self.cleanup)
+        self.thread.quit()
+        self.thread.wait()
+        self.cleanup(refresh=False)
+
+    def load_more(self):
+        """Fetch the next page in the background once the scrollbar nears the bottom"""
+        if self.exhausted or self.loading:
+            return
+        if self.scrollbar.maximum() - self.scrollbar.value() > self.scrollbar.pageStep():
+            return
+
+        self.loading = True
+        generation = self.generation
+        self.jobs.read(
+            self.audit.page,
+            self.last_entry,
+            PAGE_SIZE,
+            on_result=lambda logs: self.show_page(generation, logs),
+            on_error=lambda message: self.page_failed(generation, message),
+        )
+
+    def show_page(self, generation, logs):
+        """Append a fetched page, unless the list was refreshed since it was requested"""
+        if generation != self.generation:
+            return
+        self.loading = False
+        if len(logs) < PAGE_SIZE:
+            self.exhausted = True
+        for log in logs:
             log_btn = AuditLogButton(
                 log[0],  # log_id
                 log[2],  # action_time
                 log[1],  # action_type
                 log[3]   # details
             )
-            self.container_layout.addWidget(log_btn)
\ No newline at end of file
+            self.container_layout.addWidget(log_btn)
+        if logs:
+            self.last_entry = (logs[-1][2], logs[-1][0])
+
+    def page_failed(self, generation, message):
+        if generation != self.generation:
+            return
+        self.loading = False
+        print(f"Error loading audit logs: {message}")
+
+    def refresh_logs(self):
+        """Refresh the audit log display"""
+        while self.container_layout.count():
+            item = self.container_layout.takeAt(0)
+            if item.widget():
+                item.widget().deleteLater()
+
+        self.last_entry = None
+        self.exhausted = False
+        self.loading = False
+        self.generation += 1
+        self.scrollbar.setValue(0)
+        self.load_more()
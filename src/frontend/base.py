@@ -82,7 +82,7 @@ class MainWindow(QMainWindow):
         self.stack.addWidget(self.credentials_view)
         
         # Settings page (index 1) 
-        self.settings_view = SettingsView(self.db_path, self.username)
+        self.settings_view = SettingsView(self.db_path, self.username, self.credentials_view.jobs)
         self.stack.addWidget(self.settings_view)
 
     def handle_page_change(self, index):
@@ -100,22 +100,43 @@ class MainWindow(QMainWindow):
 
     def show_generator_dialog(self):
         """Show password generator dialog"""
-        dialog = PasswordGeneratorDialog(self)
+        dialog = PasswordGeneratorDialog(self, self.db_path, self.credentials_view.jobs)
         dialog.exec()
 
     def handle_logout(self):
         """Clean up and return to login screen"""
         # Reset UI state
+        self.settings_view.pw_change_card.stop_password_change()
+        self.settings_view.pw_change_card.stop_rekey()
+        self.settings_view.health_card.stop_health()
+        self.settings_view.storage_card.stop_storage()
+        self.settings_view.audit_log_card.stop_retention()
+        self.credentials_view.reset_search()
+        self.credentials_view.stop_jobs()
         self.credentials_view.clear_credentials()
         self.stack.setCurrentIndex(0)
         
         # Emit logout signal
         self.logout.emit()
 
-    def refresh_credentials(self):
+    def shutdown(self):
+        """Stop background workers before the window is discarded"""
+        self.credentials_view.stop_search()
+        self.credentials_view.stop_jobs()
+        self.settings_view.pw_change_card.stop_password_change()
+        self.settings_view.pw_change_card.stop_rekey()
+        self.settings_view.health_card.stop_health()
+        self.settings_view.storage_card.stop_storage()
+        self.settings_view.audit_log_card.stop_retention()
+
+    def resume(self):
+        """Restart background work left unfinished by an earlier session"""
+        self.settings_view.pw_change_card.resume_rekey()
+
+    def refresh_credentials(self, first_page=None):
         """Refresh credentials list"""
         if hasattr(self, 'credentials_view'):
-            self.credentials_view.load_credentials()
+            self.credentials_view.load_credentials(first_page=first_page)
 
 
 if __name__ == "__main__":
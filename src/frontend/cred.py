@@ -1,39 +1,26 @@
+import re
 from PyQt6.QtWidgets import QWidget, QVBoxLayout, QDialog, QHBoxLayout, QLabel, QGridLayout, QFrame, QStackedWidget, QToolButton, QScrollArea, QMessageBox, QComboBox
-from qfluentwidgets import PushButton, LineEdit, SubtitleLabel, TransparentPushButton
-from PyQt6.QtCore import Qt, QSize
+from qfluentwidgets import PushButton, LineEdit, SubtitleLabel, TransparentPushButton, SearchLineEdit
+from PyQt6.QtCore import Qt, QSize, QPersistentModelIndex, QThread, QTimer, pyqtSignal
 from PyQt6.QtGui import QIcon
 
 from .sidebar import GroupSidebar
-from src.backend.user import Credentials
-from src.modules.contextmanager import db_connect
+from .credlist import CredentialListModel, CredentialListView
+from .importer import ImportDialog
+from .exporter import ExportDialog
+from .search import SearchWorker
+from .jobs import DatabaseJobs
+from .strength import StrengthMeter
+from src.backend.user import Credentials, Groups, Policies, Audit, changed_columns
+from src.modules import pw_gen
 
+# Milliseconds of typing pause before a search runs
+SEARCH_DELAY = 200
 
-class CredentialButton(PushButton):
-    def __init__(self, title, parent=None):
-        super().__init__(parent)
-        self.setText(title)
-        self.setCheckable(True)
-        self.setStyleSheet(
-            """
-            PushButton {
-                text-align: left;
-                padding: 8px 20px;
-                border: none;
-                border-radius: 4px;
-                margin: 2px 8px;
-                background-color: transparent;
-                font-size: 14px;
-                color: #000000;
-            }
-            PushButton:checked {
-                background-color: #e6e6e6;
-                color: #0078d4;
-            }
-            PushButton:hover {
-                background-color: #f0f0f0;
-            }
-        """
-        )
+# Shown instead of the password until it is revealed, independent of its length
+MASKED_PASSWORD = "•" * 10
+
+HISTORY_ACTIONS = {"INSERT": "Created", "UPDATE": "Changed", "DELETE": "Deleted"}
 
 
 class DetailSidebar(QFrame):
@@ -164,6 +151,15 @@ class DetailSidebar(QFrame):
         self.content_layout.addWidget(self.notes_label)
         self.content_layout.addWidget(self.notes_value)
 
+        # History section
+        self.history_label = QLabel("History")
+        self.history_value = QLabel()
+        self.history_value.setWordWrap(True)
+        self.history_value.setProperty("class", "field-value")
+        self.history_value.setStyleSheet("font-size: 12px;")
+        self.content_layout.addWidget(self.history_label)
+        self.content_layout.addWidget(self.history_value)
+
         # Add stretch to push content up
         self.content_layout.addStretch()
 
@@ -180,39 +176,71 @@ class DetailSidebar(QFrame):
 
         # Initialize password toggle state
         self._password = ""
+        self._reveal = None
         self._password_hidden = True
 
-    def update_details(self, title, username, password, url="", notes=""):
-        """Update sidebar with credential details"""
+    def update_details(self, title, username, url="", notes="", reveal=None):
+        """Update sidebar with credential details, reveal(callback) decrypts the password when shown"""
         self.detail_title.setText(title)
         self.username_value.setText(username)
-        self._password = password
-        self.password_value.setText("•" * len(password))
+        self._password = ""
+        self._reveal = reveal
+        self.password_value.setText(MASKED_PASSWORD)
         self.url_value.setText(url)
         self.notes_value.setText(notes)
         self.stack.setCurrentIndex(1)
         self._password_hidden = True
         self.toggle_password_btn.setText("Show")
 
+    def update_history(self, entries):
+        """Show (action_type, action_time, changed) audit entries, newest first"""
+        lines = []
+        for action_type, action_time, changed in entries:
+            line = f"{action_time}  {HISTORY_ACTIONS.get(action_type, action_type)}"
+            columns = changed_columns(changed)
+            if columns:
+                line += ": " + ", ".join(columns).replace("group_id", "group")
+            lines.append(line)
+        self.history_value.setText("\n".join(lines) or "No history")
+
     def toggle_password_visibility(self):
         """Toggle password visibility"""
         if self._password_hidden:
-            self.password_value.setText(self._password)
-            self.toggle_password_btn.setText("Hide")
-        else:
-            self.password_value.setText("•" * len(self._password))
-            self.toggle_password_btn.setText("Show")
-        self._password_hidden = not self._password_hidden
+            if self._reveal:
+                self._reveal(self.show_password)
+            else:
+                self.show_password(self._password)
+            return
+        self._password = ""
+        self.password_value.setText(MASKED_PASSWORD)
+        self.toggle_password_btn.setText("Show")
+        self._password_hidden = True
+
+    def show_password(self, password):
+        """Show a revealed password in place of the mask"""
+        self._password = password or ""
+        self.password_value.setText(self._password)
+        self.toggle_password_btn.setText("Hide")
+        self._password_hidden = False
 
     def show_placeholder(self):
         """Show placeholder when no credential selected"""
         self.stack.setCurrentIndex(0)
+        # Do not keep secrets of a credential that is no longer shown
+        self._password = ""
+        self._reveal = None
+        self.password_value.clear()
+        self.notes_value.clear()
+        self.history_value.clear()
 
 
 class CredentialDialog(QDialog):
-    def __init__(self, parent=None, title="", username="", url="", db_path=None):
+    def __init__(self, parent=None, title="", username="", url="", db_path=None, jobs=None, group_id=None, policy_id=None):
         super().__init__(parent)
         self.db_path = db_path
+        self.jobs = jobs
+        self.group_id = group_id
+        self.policy_id = policy_id
         self.setWindowTitle("Edit Credential" if title else "Add Credential")
         self.setFixedWidth(400)
         self.setStyleSheet(
@@ -268,10 +296,26 @@ class CredentialDialog(QDialog):
         self.password_label = QLabel("Password:")
         self.password_input = LineEdit(self)
         self.password_input.setEchoMode(LineEdit.EchoMode.Password)
+        self.generate_button = TransparentPushButton("Generate")
+        self.generate_button.clicked.connect(self.generate_password)
+        password_layout = QHBoxLayout()
+        password_layout.addWidget(self.password_input)
+        password_layout.addWidget(self.generate_button)
+        self.strength = StrengthMeter(self)
+        self.password_input.textChanged.connect(self.strength.show_strength)
+        for field in (self.title_input, self.username_input):
+            field.textChanged.connect(self.update_user_words)
+
+        # Policy the password is generated with, kept with the credential
+        self.policy_label = QLabel("Policy:")
+        self.policy_combo = QComboBox(self)
+        self.load_policies()
 
         self.url_label = QLabel("URL:")
         self.url_input = LineEdit(self)
         self.url_input.setText(url)
+        self.url_input.textChanged.connect(self.update_user_words)
+        self.update_user_words()
 
         self.notes_label = QLabel("Notes:")
         self.notes_input = LineEdit(self)
@@ -290,24 +334,71 @@ class CredentialDialog(QDialog):
         layout.addWidget(self.username_label, 1, 0)
         layout.addWidget(self.username_input, 1, 1)
         layout.addWidget(self.password_label, 2, 0)
-        layout.addWidget(self.password_input, 2, 1)
-        layout.addWidget(self.url_label, 3, 0)
-        layout.addWidget(self.url_input, 3, 1)
-        layout.addWidget(self.notes_label, 4, 0)
-        layout.addWidget(self.notes_input, 4, 1)
-        layout.addWidget(self.group_label, 5, 0)
-        layout.addWidget(self.group_combo, 5, 1)
-        layout.addWidget(self.save_button, 6, 0, 1, 2)
+        layout.addLayout(password_layout, 2, 1)
+        layout.addWidget(self.strength, 3, 1)
+        layout.addWidget(self.url_label, 4, 0)
+        layout.addWidget(self.url_input, 4, 1)
+        layout.addWidget(self.notes_label, 5, 0)
+        layout.addWidget(self.notes_input, 5, 1)
+        layout.addWidget(self.group_label, 6, 0)
+        layout.addWidget(self.group_combo, 6, 1)
+        layout.addWidget(self.policy_label, 7, 0)
+        layout.addWidget(self.policy_combo, 7, 1)
+        layout.addWidget(self.save_button, 8, 0, 1, 2)
 
     def load_groups(self):
         """Load groups into combo box"""
         self.group_combo.addItem("No Group", -1)
-        if self.db_path:
-            with db_connect(self.db_path) as cur:
-                cur.execute("SELECT group_id, title FROM groups")
-                groups = cur.fetchall()
-                for group_id, title in groups:
-                    self.group_combo.addItem(title, group_id)
+        if self.db_path and self.jobs:
+            self.jobs.read(Groups(self.db_path).get_groups, on_result=self._add_groups)
+
+    def _add_groups(self, groups):
+        for group_id, title, _ in groups:
+            self.group_combo.addItem(title, group_id)
+        if self.group_id:
+            index = self.group_combo.findData(self.group_id)
+            if index >= 0:
+                self.group_combo.setCurrentIndex(index)
+
+    def update_user_words(self):
+        """Count the title, username and URL parts as guessable words in the password"""
+        fields = (self.title_input.text(), self.username_input.text(), self.url_input.text())
+        self.strength.set_user_words([w for text in fields for w in [text, *re.split(r"\W+", text)]])
+        self.strength.show_strength(self.password_input.text())
+
+    def load_policies(self):
+        """Load saved generator policies into combo box"""
+        self.policy_combo.addItem("Default", None)
+        if self.db_path and self.jobs:
+            self.jobs.read(Policies(self.db_path).list, on_result=self._add_policies)
+
+    def _add_policies(self, policies):
+        for policy_id, name in policies:
+            self.policy_combo.addItem(name, policy_id)
+        if self.policy_id:
+            index = self.policy_combo.findData(self.policy_id)
+            if index >= 0:
+                self.policy_combo.setCurrentIndex(index)
+
+    def generate_password(self):
+        """Fill in a password generated with the selected policy"""
+        policy_id = self.policy_combo.currentData()
+
+        def generate():
+            policy = Policies(self.db_path).get(policy_id) if policy_id else None
+            return pw_gen.generate(policy or pw_gen.Policy())[0]
+
+        self.jobs.read(
+            generate,
+            on_result=self.password_input.setText,
+            on_error=lambda message: QMessageBox.warning(
+                self, "Generator", f"Could not generate a password: {message}"
+            ),
+        )
+
+    def get_policy(self):
+        """policy_id selected for the credential, None for the default"""
+        return self.policy_combo.currentData()
 
     def get_data(self):
         return (
@@ -323,10 +414,12 @@ class CredentialDialog(QDialog):
 class CredentialsToolBar(QWidget):
     def __init__(self, parent=None):
         super().__init__(parent)
+        self.setObjectName("credentialsToolBar")
+        self.setAttribute(Qt.WidgetAttribute.WA_StyledBackground)
         self.setStyleSheet(
             """
-            QWidget {
-                background-color: #f8f8f8;
+            #credentialsToolBar {
+                background-color: white;
                 border-bottom: 1px solid #e0e0e0;
             }
             QToolButton {
@@ -345,19 +438,30 @@ class CredentialsToolBar(QWidget):
         )
 
         layout = QHBoxLayout(self)
-        layout.setContentsMargins(8, 4, 8, 4)
+        layout.setContentsMargins(10, 10, 10, 10)
         layout.setSpacing(4)
 
         # Create buttons
         self.add_btn = self._create_tool_button("Add Entry", "assets/add.svg")
         self.edit_btn = self._create_tool_button("Edit Entry", "assets/edit.svg")
         self.delete_btn = self._create_tool_button("Delete Entry", "assets/delete.svg")
+        self.import_btn = self._create_tool_button("Import", "assets/import.svg")
+        self.export_btn = self._create_tool_button("Export", "assets/export.svg")
+
+        # Search box
+        self.search_box = SearchLineEdit()
+        self.search_box.setPlaceholderText("Search credentials...")
+        self.search_box.setClearButtonEnabled(True)
 
         # Add buttons to layout
         layout.addWidget(self.add_btn)
         layout.addWidget(self.edit_btn)
         layout.addWidget(self.delete_btn)
-        layout.addStretch()
+        layout.addSpacing(12)
+        layout.addWidget(self.search_box, 1)
+        layout.addSpacing(12)
+        layout.addWidget(self.import_btn)
+        layout.addWidget(self.export_btn)
 
     def _create_tool_button(self, tooltip, icon_path):
         button = QToolButton()
@@ -368,11 +472,16 @@ class CredentialsToolBar(QWidget):
 
 
 class CredentialsView(QWidget):
+    searchRequested = pyqtSignal(int, str, object)
+
     def __init__(self, parent=None, db_path=None):
         super().__init__(parent)
         self.db_path = db_path
         self.cred_manager = Credentials(db_path) if db_path else None
-        self.current_button = None
+        self.audit = Audit(db_path) if db_path else None
+        self.policies = Policies(db_path) if db_path else None
+        self.jobs = DatabaseJobs(parent=self)
+        self.current_index = None
 
         # Main layout
         layout = QVBoxLayout(self)
@@ -387,7 +496,7 @@ class CredentialsView(QWidget):
         self.detail_sidebar = DetailSidebar()
 
         # Group sidebar
-        self.group_sidebar = GroupSidebar(db_path=db_path)
+        self.group_sidebar = GroupSidebar(db_path=db_path, jobs=self.jobs)
         self.group_sidebar.groupSelected.connect(self.filter_credentials)
         content_layout.addWidget(self.group_sidebar)
 
@@ -404,155 +513,210 @@ class CredentialsView(QWidget):
             """
         )
 
-        # Action buttons toolbar
-        buttons_widget = QWidget()
-        buttons_widget.setStyleSheet(
-            """
-            QWidget {
-                border-bottom: 1px solid #e0e0e0;
-            }
-            """
-        )
-        buttons_layout = QHBoxLayout(buttons_widget)
-        buttons_layout.setContentsMargins(10, 10, 10, 10)
-        buttons_layout.setSpacing(4)
+        # Action buttons and search toolbar
+        self.toolbar = CredentialsToolBar()
+        self.toolbar.add_btn.clicked.connect(self.add_credential)
+        self.toolbar.edit_btn.clicked.connect(self.edit_credential)
+        self.toolbar.delete_btn.clicked.connect(self.delete_credential)
+        self.toolbar.import_btn.clicked.connect(self.import_credentials)
+        self.toolbar.export_btn.clicked.connect(self.export_credentials)
+        self.detail_sidebar.edit_btn.clicked.connect(self.edit_credential)
+        cred_layout.addWidget(self.toolbar, 0, Qt.AlignmentFlag.AlignTop)
+
+        # Search-as-you-type, debounced and run off the UI thread
+        self.search_generation = 0
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(SEARCH_DELAY)
+        self.search_timer.timeout.connect(self.run_search)
+        self.toolbar.search_box.textChanged.connect(lambda: self.search_timer.start())
+        self.toolbar.search_box.searchSignal.connect(lambda: self.run_search())
+        self.search_thread = None
+        self.search_worker = None
+        if db_path:
+            self.search_thread = QThread(self)
+            self.search_worker = SearchWorker(db_path)
+            self.search_worker.moveToThread(self.search_thread)
+            self.searchRequested.connect(self.search_worker.run)
+            self.search_worker.results.connect(self._show_results)
+            self.search_worker.failed.connect(self._search_failed)
+            self.search_thread.start()
+
+        # Lazily loaded credentials list
+        self.cred_model = CredentialListModel(db_path, self.jobs, parent=self)
+        self.cred_view = CredentialListView()
+        self.cred_view.setModel(self.cred_model)
+        self.cred_view.clicked.connect(self._handle_credential_click)
+        cred_layout.addWidget(self.cred_view)
 
-        # Create buttons
-        self.add_btn = self._create_tool_button("Add Entry", "assets/add.svg")
-        self.delete_btn = self._create_tool_button("Delete Entry", "assets/delete.svg")
+        content_layout.addWidget(cred_area)
+        content_layout.addWidget(self.detail_sidebar)
 
-        # Add buttons to layout
-        buttons_layout.addWidget(self.add_btn)
-        buttons_layout.addWidget(self.delete_btn)
-        buttons_layout.addStretch()
+        layout.addWidget(content)
+        # Rows are loaded by the caller, from the page prefetched on login
 
-        # Connect button signals
-        self.add_btn.clicked.connect(self.add_credential)
-        self.delete_btn.clicked.connect(self.delete_credential)
-        self.detail_sidebar.edit_btn.clicked.connect(self.edit_credential)
+    def load_credentials(self, group_id=None, first_page=None):
+        """Load and display credentials from database, starting from a prefetched page if given"""
+        self.clear_credentials()
 
-        cred_layout.addWidget(buttons_widget, 0, Qt.AlignmentFlag.AlignTop)
+        if not self.cred_manager:
+            return
 
-        # Scrollable credentials list
-        scroll = QScrollArea()
-        scroll.setWidgetResizable(True)
-        scroll.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
-        scroll.setStyleSheet(
-            """
-            QScrollArea {
-                border: none;
-                background-color: transparent;
-            }
-            QWidget {
-                background-color: white;
-            }
-        """
-        )
+        self.cred_model.set_filter(group_id, first_page)
 
-        # Container for credentials
-        self.list_container = QWidget()
-        self.cred_list = QVBoxLayout(self.list_container)
-        self.cred_list.setSpacing(2)
-        self.cred_list.setAlignment(Qt.AlignmentFlag.AlignTop)
+    def reload_credentials(self):
+        """Reload the list, keeping the current group filter and search"""
+        if self.search_text():
+            self.run_search()
+            return
+        self.load_credentials(self.cred_model.group_id)
 
-        scroll.setWidget(self.list_container)
-        cred_layout.addWidget(scroll)
+    def search_text(self):
+        return self.toolbar.search_box.text().strip()
 
-        content_layout.addWidget(cred_area)
-        content_layout.addWidget(self.detail_sidebar)
+    def run_search(self):
+        """Start a search for the current text, superseding any search in flight"""
+        self.search_timer.stop()
+        if not self.search_worker:
+            return
+        self.search_generation += 1
+        self.search_worker.supersede(self.search_generation)
 
-        layout.addWidget(content)
-        self.load_credentials()
+        query = self.search_text()
+        if not query:
+            if self.cred_model.query:
+                self.load_credentials(self.cred_model.group_id)
+            return
+        self.searchRequested.emit(self.search_generation, query, self.cred_model.group_id)
 
-    def _create_tool_button(self, tooltip, icon_path):
-        button = QToolButton()
-        button.setIcon(QIcon(icon_path))
-        button.setToolTip(tooltip)
-        button.setIconSize(QSize(20, 20))
-        button.setStyleSheet(
-            """
-            QToolButton {
-                border: none;
-                border-radius: 4px;
-                padding: 6px;
-                background-color: transparent;
-            }
-            QToolButton:hover {
-                background-color: #e8e8e8;
-            }
-            QToolButton:pressed {
-                background-color: #e0e0e0;
-            }
-        """
-        )
-        return button
+    def _show_results(self, generation, rows):
+        """Show results of the newest search, dropping late ones"""
+        if generation != self.search_generation or not self.search_text():
+            return
+        cred = self.current_credential()
+        self.cred_model.set_results(rows, self.search_text(), self.cred_model.group_id)
+        # Keep the selection if the credential is still in the results
+        pos = self.cred_model.position(cred[0]) if cred else -1
+        if pos >= 0:
+            index = self.cred_model.index(pos)
+            self.cred_view.setCurrentIndex(index)
+            self.current_index = QPersistentModelIndex(index)
+        else:
+            self.current_index = None
+            self.detail_sidebar.show_placeholder()
 
-    def load_credentials(self, group_id=None):
-        """Load and display credentials from database"""
-        self.clear_credentials()
+    def _search_failed(self, generation, message):
+        if generation == self.search_generation:
+            self.cred_model.set_results([], self.search_text(), self.cred_model.group_id)
+            self.current_index = None
+            self.detail_sidebar.show_placeholder()
 
-        if not self.cred_manager:
+    def reset_search(self):
+        """Clear the search box and stop a running search"""
+        self.search_timer.stop()
+        self.toolbar.search_box.blockSignals(True)
+        self.toolbar.search_box.clear()
+        self.toolbar.search_box.blockSignals(False)
+        if self.search_worker:
+            self.search_generation += 1
+            self.search_worker.supersede(self.search_generation)
+
+    def stop_jobs(self):
+        """Drop pending database results and wait for running jobs"""
+        self.jobs.shutdown()
+
+    def stop_search(self):
+        """Stop the search thread, the view cannot search afterwards"""
+        if not self.search_thread:
+            return
+        self.search_worker.supersede(self.search_generation + 1)
+        self.search_thread.quit()
+        self.search_thread.wait()
+        self.search_thread = None
+        self.search_worker = None
+
+    def current_credential(self):
+        """Return the selected (cred_id, title, username, group_id) row"""
+        if self.current_index is None or not self.current_index.isValid():
+            return None
+        return self.current_index.data(CredentialListModel.RowRole)
+
+    def _handle_credential_click(self, index):
+        """Handle credential row click"""
+        if self.current_index == index:
+            self.cred_view.clearSelection()
+            self.current_index = None
+            self.detail_sidebar.show_placeholder()
             return
 
-        with db_connect(self.db_path) as cur:
-            if group_id is None or group_id == -1:
-                query = """SELECT title, username, password, url, notes 
-                          FROM credentials"""
-                params = ()
-            else:
-                query = """SELECT title, username, password, url, notes 
-                          FROM credentials WHERE group_id = ?"""
-                params = (group_id,)
-                
-            cur.execute(query, params)
-            credentials = cur.fetchall()
-
-        for cred in credentials:
-            title, username, password, url, notes = cred
-            cred_btn = CredentialButton(title)
-            cred_btn.clicked.connect(
-                lambda checked, btn=cred_btn, t=title, u=username, p=password, l=url, n=notes: 
-                self._handle_credential_click(btn, t, u, p, l, n)
-            )
-            self.cred_list.addWidget(cred_btn)
+        self.current_index = QPersistentModelIndex(index)
+        self._show_current()
 
-    def _handle_credential_click(self, button, title, username, password, url, notes):
-        """Handle credential button click"""
-        if self.current_button == button and button.isChecked():
-            button.setChecked(False)
-            self.current_button = None
+    def _show_current(self):
+        """Show the selected credential in the detail sidebar, or the placeholder"""
+        cred = self.current_credential()
+        if not cred:
+            self.current_index = None
             self.detail_sidebar.show_placeholder()
             return
+        cred_id = cred[0]
 
-        if self.current_button:
-            self.current_button.setChecked(False)
+        # Secrets are only read for the credential being shown, the password only when revealed
+        def load():
+            details = self.cred_manager.get_details(cred_id, password=False)
+            return details, self.audit.history("credential", cred_id)
 
-        self.current_button = button
-        button.setChecked(True)
-        self.detail_sidebar.update_details(title, username, password, url, notes)
+        self.jobs.read(load, on_result=lambda result: self._show_details(cred_id, *result))
+
+    def _current_id(self):
+        cred = self.current_credential()
+        return cred[0] if cred else None
+
+    def _show_details(self, cred_id, details, history):
+        # The selection may have moved on while the details were loading
+        if self._current_id() != cred_id:
+            return
+        if not details:
+            self.detail_sidebar.show_placeholder()
+            return
+        title, username, _, url, notes, _ = details
+        self.detail_sidebar.update_details(
+            title, username, url, notes,
+            reveal=lambda show: self._reveal_password(cred_id, show),
+        )
+        self.detail_sidebar.update_history([(row[1], row[2], row[4]) for row in history])
+
+    def _reveal_password(self, cred_id, show):
+        """Decrypt a password on a job and pass it to show, if its credential is still selected"""
+        def shown(password):
+            if self._current_id() == cred_id:
+                show(password)
+
+        self.jobs.read(self.cred_manager.get_secret, cred_id, "password", on_result=shown)
 
     def clear_credentials(self):
         """Clear all credentials from view"""
-        while self.cred_list.count():
-            item = self.cred_list.takeAt(0)
-            if item.widget():
-                item.widget().deleteLater()
-
-        self.current_button = None
+        self.cred_model.clear()
+        self.current_index = None
         self.detail_sidebar.show_placeholder()
 
     def filter_credentials(self, group_id):
         """Filter credentials by group"""
+        if self.search_text():
+            self.cred_model.group_id = group_id
+            self.run_search()
+            return
         self.load_credentials(group_id)
 
     def add_credential(self):
         """Add new credential"""
-        dialog = CredentialDialog(self, db_path=self.db_path)
+        dialog = CredentialDialog(self, db_path=self.db_path, jobs=self.jobs)
         if dialog.exec():
             title, username, password, url, notes, group_id = dialog.get_data()
+            policy_id = dialog.get_policy()
 
-            try:
-                self.cred_manager.add_cred(
+            def add():
+                cred_id = self.cred_manager.add_cred(
                     title=title,
                     username=username,
                     password=password,
@@ -560,18 +724,43 @@ class CredentialsView(QWidget):
                     notes=notes,
                     group_id=group_id if group_id != -1 else None
                 )
-                self.load_credentials()
-            except Exception as e:
-                QMessageBox.critical(
-                    self, "Error", f"Failed to add credential: {str(e)}"
-                )
+                if policy_id is not None:
+                    self.policies.assign(cred_id, policy_id)
+                return self.cred_manager.get_row(cred_id)
+
+            self.jobs.write(
+                add,
+                on_result=self._credential_added,
+                on_error=lambda message: QMessageBox.critical(
+                    self, "Error", f"Failed to add credential: {message}"
+                ),
+            )
+
+    def _credential_added(self, row):
+        self.cred_model.insert_row(row)
+        self.group_sidebar.adjust_count(row[3], 1)
+
+    def import_credentials(self):
+        """Open the import dialog without blocking the view"""
+        dialog = ImportDialog(self.db_path, self)
+        dialog.setAttribute(Qt.WidgetAttribute.WA_DeleteOnClose)
+        dialog.imported.connect(self.group_sidebar.load_groups)
+        dialog.imported.connect(self.reload_credentials)
+        dialog.show()
+
+    def export_credentials(self):
+        """Open the export dialog without blocking the view"""
+        dialog = ExportDialog(self.db_path, self)
+        dialog.setAttribute(Qt.WidgetAttribute.WA_DeleteOnClose)
+        dialog.show()
 
     def delete_credential(self):
         """Delete selected credential"""
-        if not self.current_button:
+        cred = self.current_credential()
+        if not cred:
             return
 
-        title = self.current_button.text()
+        title = cred[1]
         reply = QMessageBox.question(
             self,
             "Confirm Delete",
@@ -580,57 +769,86 @@ class CredentialsView(QWidget):
         )
 
         if reply == QMessageBox.StandardButton.Yes:
-            try:
-                self.cred_manager.remove_cred(title)
-                self.load_credentials()
-            except Exception as e:
-                QMessageBox.critical(
-                    self, "Error", f"Failed to delete credential: {str(e)}"
-                )
+            self.jobs.write(
+                self.cred_manager.remove_cred,
+                title,
+                on_result=lambda cred_id: self._credential_removed(cred_id, cred[3]),
+                on_error=lambda message: QMessageBox.critical(
+                    self, "Error", f"Failed to delete credential: {message}"
+                ),
+            )
+
+    def _credential_removed(self, cred_id, group_id):
+        if cred_id is not None:
+            self.cred_model.remove_row(cred_id)
+            self.group_sidebar.adjust_count(group_id, -1)
+        self._show_current()
 
     def edit_credential(self):
         """Edit selected credential"""
-        if not self.current_button:
+        cred = self.current_credential()
+        if not cred:
             return
 
-        title = self.current_button.text()
-        with db_connect(self.db_path) as cur:
-            cur.execute(
-                """SELECT title, username, password, url, notes, group_id 
-                   FROM credentials WHERE title = ?""",
-                (title,)
-            )
-            cred = cur.fetchone()
+        def load():
+            return self.cred_manager.get_details(cred[0]), self.policies.policy_of(cred[0])
+
+        self.jobs.read(
+            load,
+            on_result=lambda result: self._open_editor(*result),
+            on_error=lambda message: QMessageBox.critical(
+                self, "Error", f"Failed to load credential: {message}"
+            ),
+        )
+
+    def _open_editor(self, cred, policy_id=None):
+        """Show the edit dialog for a loaded (title, username, password, url, notes, group_id) record"""
         if not cred:
             return
 
         title, username, password, url, notes, group_id = cred
-        dialog = CredentialDialog(self, title, username, url, self.db_path)
+        dialog = CredentialDialog(self, title, username, url, self.db_path, self.jobs, group_id, policy_id)
         dialog.password_input.setText(password)
         dialog.notes_input.setText(notes)
-        if group_id:
-            index = dialog.group_combo.findData(group_id)
-            if index >= 0:
-                dialog.group_combo.setCurrentIndex(index)
 
         if dialog.exec():
             new_title, new_username, new_password, new_url, new_notes, new_group_id = (
                 dialog.get_data()
             )
-            try:
-                self.cred_manager.modify_cred(
+            new_password = new_password or password
+            new_group_id = new_group_id if new_group_id != -1 else None
+            new_policy_id = dialog.get_policy()
+            if (new_title, new_username, new_password, new_url, new_notes, new_group_id) == cred and new_policy_id == policy_id:
+                return
+
+            def modify():
+                cred_id = self.cred_manager.modify_cred(
                     new_title=new_title,
                     username=new_username,
-                    password=new_password if new_password else password,
+                    password=new_password,
                     url=new_url,
                     notes=new_notes,
-                    group_id=new_group_id if new_group_id != -1 else None,
+                    group_id=new_group_id,
                     title=title,
                 )
-                if new_title != title:
-                    self.current_button.setText(new_title)
-                self.load_credentials()
-            except Exception as e:
-                QMessageBox.critical(
-                    self, "Error", f"Failed to update credential: {str(e)}"
-                )
\ No newline at end of file
+                if cred_id is None:
+                    return None
+                self.policies.assign(cred_id, new_policy_id)
+                return self.cred_manager.get_row(cred_id)
+
+            self.jobs.write(
+                modify,
+                on_result=lambda row: self._credential_modified(row, group_id),
+                on_error=lambda message: QMessageBox.critical(
+                    self, "Error", f"Failed to update credential: {message}"
+                ),
+            )
+
+    def _credential_modified(self, row, old_group_id):
+        if row is None:
+            return
+        self.cred_model.update_row(row)
+        if row[3] != old_group_id:
+            self.group_sidebar.adjust_count(old_group_id, -1)
+            self.group_sidebar.adjust_count(row[3], 1)
+        self._show_current()
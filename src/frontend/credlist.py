@@ -0,0 +1,205 @@
+from bisect import bisect_left
+from PyQt6.QtWidgets import QStyledItemDelegate, QStyle, QListView, QAbstractItemView
+from PyQt6.QtCore import Qt, QAbstractListModel, QModelIndex, QSize, QRectF
+from PyQt6.QtGui import QColor, QFont, QFontMetrics, QPainter, QPainterPath
+from src.backend.user import Credentials
+
+ROW_HEIGHT = 40
+# Rows fetched per page, also prefetched on login
+PAGE_SIZE = 200
+
+
+class CredentialListModel(QAbstractListModel):
+    RowRole = Qt.ItemDataRole.UserRole + 1
+
+    def __init__(self, db_path=None, jobs=None, page_size=PAGE_SIZE, parent=None):
+        super().__init__(parent)
+        self.cred_manager = Credentials(db_path) if db_path else None
+        self.jobs = jobs
+        self.page_size = page_size
+        self.group_id = None
+        self.query = None
+        self.rows = []
+        self.exhausted = True
+        # Pages are read on a job; a reset makes pages still in flight stale
+        self.loading = False
+        self.generation = 0
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or index.row() >= len(self.rows):
+            return None
+        row = self.rows[index.row()]
+        if role == Qt.ItemDataRole.DisplayRole:
+            return row[1]
+        if role == self.RowRole:
+            return row
+        return None
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and not self.exhausted and not self.loading
+
+    def fetchMore(self, parent=QModelIndex()):
+        """Request the next page of rows after the last loaded cred_id"""
+        if parent.isValid() or self.exhausted or self.loading:
+            return
+        after = self.rows[-1][0] if self.rows else 0
+        self.loading = True
+        generation = self.generation
+        self.jobs.read(
+            self.cred_manager.list_page, self.group_id, after, self.page_size,
+            on_result=lambda page: self._append_page(generation, page),
+            on_error=lambda message: self._page_failed(generation, message),
+        )
+
+    def _append_page(self, generation, page):
+        if generation != self.generation:
+            return
+        self.loading = False
+        if len(page) < self.page_size:
+            self.exhausted = True
+        # Skip rows inserted locally while the page was loading
+        last = self.rows[-1][0] if self.rows else 0
+        page = [row for row in page if row[0] > last]
+        if not page:
+            return
+        start = len(self.rows)
+        self.beginInsertRows(QModelIndex(), start, start + len(page) - 1)
+        self.rows.extend(page)
+        self.endInsertRows()
+
+    def _page_failed(self, generation, message):
+        if generation != self.generation:
+            return
+        self.loading = False
+        self.exhausted = True
+        print(f"Error loading credentials: {message}")
+
+    def _reset(self, group_id, query, rows, exhausted):
+        self.beginResetModel()
+        self.generation += 1
+        self.loading = False
+        self.group_id = group_id
+        self.query = query
+        self.rows = rows
+        self.exhausted = exhausted
+        self.endResetModel()
+
+    def set_filter(self, group_id=None, first_page=None):
+        """Reset the model to the first page of a group, or of all credentials, unless it was already fetched"""
+        exhausted = self.cred_manager is None or (
+            first_page is not None and len(first_page) < self.page_size
+        )
+        self._reset(group_id, None, list(first_page or []), exhausted)
+        if first_page is None:
+            self.fetchMore()
+
+    def set_results(self, rows, query, group_id=None):
+        """Show ranked search results instead of the paged list"""
+        self._reset(group_id, query, list(rows), True)
+
+    def matches(self, row):
+        """Whether a row belongs to the current group filter"""
+        return self.group_id is None or self.group_id == -1 or row[3] == self.group_id
+
+    def position(self, cred_id):
+        """Return the model row of a loaded cred_id, or -1"""
+        if self.query:
+            # Search results are ordered by rank, not by cred_id
+            return next((i for i, row in enumerate(self.rows) if row[0] == cred_id), -1)
+        pos = bisect_left(self.rows, cred_id, key=lambda row: row[0])
+        if pos < len(self.rows) and self.rows[pos][0] == cred_id:
+            return pos
+        return -1
+
+    def insert_row(self, row):
+        """Show a newly created credential if it falls inside the loaded range"""
+        if self.query:
+            return
+        if not self.matches(row) or self.position(row[0]) >= 0:
+            return
+        pos = bisect_left(self.rows, row[0], key=lambda r: r[0])
+        # Rows past the last loaded page arrive through fetchMore instead
+        if pos == len(self.rows) and not self.exhausted:
+            return
+        self.beginInsertRows(QModelIndex(), pos, pos)
+        self.rows.insert(pos, row)
+        self.endInsertRows()
+
+    def update_row(self, row):
+        """Refresh a loaded credential in place, dropping it if it left the filter"""
+        pos = self.position(row[0])
+        if pos < 0:
+            self.insert_row(row)
+            return
+        if not self.matches(row):
+            self.remove_row(row[0])
+            return
+        self.rows[pos] = row
+        index = self.index(pos)
+        self.dataChanged.emit(index, index)
+
+    def remove_row(self, cred_id):
+        """Remove a loaded credential"""
+        pos = self.position(cred_id)
+        if pos < 0:
+            return
+        self.beginRemoveRows(QModelIndex(), pos, pos)
+        del self.rows[pos]
+        self.endRemoveRows()
+
+    def clear(self):
+        """Drop all loaded rows"""
+        self._reset(self.group_id, None, [], True)
+
+
+class CredentialDelegate(QStyledItemDelegate):
+    def paint(self, painter, option, index):
+        painter.save()
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+
+        # Same geometry as the sidebar buttons: 2px/8px margin, 20px padding
+        rect = QRectF(option.rect).adjusted(8, 2, -8, -2)
+        selected = option.state & QStyle.StateFlag.State_Selected
+        hovered = option.state & QStyle.StateFlag.State_MouseOver
+        if selected or hovered:
+            path = QPainterPath()
+            path.addRoundedRect(rect, 4, 4)
+            painter.fillPath(path, QColor("#e6e6e6" if selected else "#f0f0f0"))
+
+        font = QFont(option.font)
+        font.setPixelSize(14)
+        painter.setFont(font)
+        painter.setPen(QColor("#0078d4" if selected else "#000000"))
+        text_rect = rect.adjusted(20, 0, -20, 0)
+        text = QFontMetrics(font).elidedText(
+            index.data(), Qt.TextElideMode.ElideRight, int(text_rect.width())
+        )
+        painter.drawText(text_rect, Qt.AlignmentFlag.AlignVCenter | Qt.AlignmentFlag.AlignLeft, text)
+        painter.restore()
+
+    def sizeHint(self, option, index):
+        return QSize(option.rect.width(), ROW_HEIGHT)
+
+
+class CredentialListView(QListView):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setItemDelegate(CredentialDelegate(self))
+        self.setUniformItemSizes(True)
+        self.setMouseTracking(True)
+        self.setSelectionMode(QAbstractItemView.SelectionMode.SingleSelection)
+        self.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
+        self.setVerticalScrollMode(QAbstractItemView.ScrollMode.ScrollPerPixel)
+        self.setStyleSheet(
+            """
+            QListView {
+                border: none;
+                background-color: white;
+                outline: none;
+            }
+        """
+        )
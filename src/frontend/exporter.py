@@ -0,0 +1,198 @@
+import os
+from PyQt6.QtWidgets import QDialog, QVBoxLayout, QHBoxLayout, QLabel, QFileDialog
+from qfluentwidgets import PrimaryPushButton, PushButton, LineEdit, TitleLabel, ComboBox, ProgressBar
+from PyQt6.QtCore import QObject, QThread, pyqtSignal
+from src.backend.exporter import Exporter, ARCHIVE_EXT
+
+EXTENSIONS = {"csv": ".csv", "ndjson": ".jsonl", "archive": ARCHIVE_EXT}
+
+
+class ExportWorker(QObject):
+    progress = pyqtSignal(int, int)
+    finished = pyqtSignal(dict)
+    failed = pyqtSignal(str)
+
+    def __init__(self, db_path, path, fmt, passphrase=None):
+        super().__init__()
+        self.db_path = db_path
+        self.path = path
+        self.fmt = fmt
+        self.passphrase = passphrase
+        self._cancelled = False
+
+    def run(self):
+        try:
+            exporter = Exporter(self.db_path, self.path, self.fmt, self.passphrase)
+            totals = exporter.run(
+                progress=self.progress.emit, cancelled=lambda: self._cancelled
+            )
+            self.finished.emit(totals)
+        except Exception as e:
+            self.failed.emit(str(e))
+
+    def cancel(self):
+        self._cancelled = True
+
+
+class ExportDialog(QDialog):
+    def __init__(self, db_path, parent=None):
+        super().__init__(parent)
+        self.db_path = db_path
+        self.thread = None
+        self.worker = None
+        self.setWindowTitle("Export Vault")
+        self.setFixedWidth(450)
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(30, 30, 30, 30)
+        layout.setSpacing(16)
+
+        title = TitleLabel("Export Vault")
+        layout.addWidget(title)
+
+        # Format
+        self.format_combo = ComboBox()
+        self.format_combo.addItem("Encrypted archive", userData="archive")
+        self.format_combo.addItem("CSV (unencrypted)", userData="csv")
+        self.format_combo.addItem("JSON lines (unencrypted)", userData="ndjson")
+        self.format_combo.currentIndexChanged.connect(self.update_format)
+        layout.addWidget(self.format_combo)
+
+        # Destination
+        file_layout = QHBoxLayout()
+        self.file_input = LineEdit()
+        self.file_input.setPlaceholderText("Destination file")
+        self.file_input.setReadOnly(True)
+        browse_btn = PushButton("Browse")
+        browse_btn.clicked.connect(self.choose_file)
+        file_layout.addWidget(self.file_input)
+        file_layout.addWidget(browse_btn)
+        layout.addLayout(file_layout)
+
+        # Archive passphrase
+        self.passphrase_input = LineEdit()
+        self.passphrase_input.setPlaceholderText("Archive passphrase")
+        self.passphrase_input.setEchoMode(LineEdit.EchoMode.Password)
+        self.confirm_input = LineEdit()
+        self.confirm_input.setPlaceholderText("Confirm passphrase")
+        self.confirm_input.setEchoMode(LineEdit.EchoMode.Password)
+        layout.addWidget(self.passphrase_input)
+        layout.addWidget(self.confirm_input)
+
+        # Progress
+        self.progress_bar = ProgressBar()
+        self.progress_bar.setRange(0, 1000)
+        self.progress_bar.setValue(0)
+        layout.addWidget(self.progress_bar)
+
+        self.status_label = QLabel("Choose a format and destination")
+        self.status_label.setStyleSheet("color: #666666; font-size: 13px;")
+        layout.addWidget(self.status_label)
+
+        # Buttons
+        bottom_layout = QHBoxLayout()
+        bottom_layout.addStretch()
+        self.cancel_btn = PushButton("Close")
+        self.cancel_btn.clicked.connect(self.reject)
+        self.start_btn = PrimaryPushButton("Export")
+        self.start_btn.clicked.connect(self.start_export)
+        bottom_layout.addWidget(self.cancel_btn)
+        bottom_layout.addWidget(self.start_btn)
+        layout.addLayout(bottom_layout)
+
+        self.setStyleSheet(
+            """
+            QDialog {
+                background-color: white;
+            }
+            QLabel {
+                color: #202020;
+                font-size: 14px;
+            }
+        """
+        )
+
+    def update_format(self):
+        fmt = self.format_combo.currentData()
+        is_archive = fmt == "archive"
+        self.passphrase_input.setEnabled(is_archive)
+        self.confirm_input.setEnabled(is_archive)
+
+        path = self.file_input.text()
+        if path:
+            self.file_input.setText(os.path.splitext(path)[0] + EXTENSIONS[fmt])
+
+    def choose_file(self):
+        ext = EXTENSIONS[self.format_combo.currentData()]
+        path, _ = QFileDialog.getSaveFileName(
+            self, "Export Vault", f"krypt-export{ext}", f"Export (*{ext})"
+        )
+        if path:
+            if not path.endswith(ext):
+                path += ext
+            self.file_input.setText(path)
+
+    def start_export(self):
+        path = self.file_input.text()
+        if not path or self.thread:
+            return
+
+        fmt = self.format_combo.currentData()
+        passphrase = None
+        if fmt == "archive":
+            passphrase = self.passphrase_input.text()
+            if not passphrase:
+                self.status_label.setText("A passphrase is required")
+                return
+            if passphrase != self.confirm_input.text():
+                self.status_label.setText("Passphrases do not match")
+                return
+
+        self.start_btn.setEnabled(False)
+        self.format_combo.setEnabled(False)
+        self.cancel_btn.setText("Cancel")
+        self.status_label.setText("Exporting...")
+
+        self.thread = QThread(self)
+        self.worker = ExportWorker(self.db_path, path, fmt, passphrase)
+        self.worker.moveToThread(self.thread)
+        self.thread.started.connect(self.worker.run)
+        self.worker.progress.connect(self.update_progress)
+        self.worker.finished.connect(self.export_finished)
+        self.worker.failed.connect(self.export_failed)
+        self.worker.finished.connect(self.thread.quit)
+        self.worker.failed.connect(self.thread.quit)
+        self.thread.finished.connect(self.cleanup)
+        self.thread.start()
+
+    def update_progress(self, done, total):
+        if total:
+            self.progress_bar.setValue(int(done * 1000 / total))
+        self.status_label.setText(f"{done} of {total} entries exported")
+
+    def export_finished(self, totals):
+        if totals["cancelled"]:
+            self.status_label.setText("Export cancelled")
+            return
+        self.progress_bar.setValue(1000)
+        self.status_label.setText(f"Exported {totals['rows']} entries")
+
+    def export_failed(self, message):
+        self.status_label.setText(f"Export failed: {message}")
+
+    def cleanup(self):
+        self.worker.deleteLater()
+        self.thread.deleteLater()
+        self.worker = None
+        self.thread = None
+        self.start_btn.setEnabled(True)
+        self.format_combo.setEnabled(True)
+        self.cancel_btn.setText("Close")
+
+    def reject(self):
+        # Keep the dialog open until a running export has stopped
+        if self.worker:
+            self.worker.cancel()
+            self.status_label.setText("Cancelling...")
+            return
+        super().reject()
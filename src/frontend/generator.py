@@ -1,14 +1,20 @@
-from PyQt6.QtWidgets import QDialog, QVBoxLayout, QHBoxLayout, QLabel, QSlider
-from qfluentwidgets import PrimaryPushButton, TransparentPushButton, LineEdit, TitleLabel
+from PyQt6.QtWidgets import QDialog, QVBoxLayout, QHBoxLayout, QLabel, QSlider, QWidget, QFileDialog, QInputDialog, QMessageBox
+from qfluentwidgets import PrimaryPushButton, PushButton, TransparentPushButton, LineEdit, TitleLabel, ComboBox, CheckBox
 from PyQt6.QtCore import Qt
+from src.backend.user import Policies
+from .strength import StrengthMeter
 from src.modules import pw_gen
 
+CLASS_LABELS = {"lower": "a-z", "upper": "A-Z", "digits": "0-9", "symbols": "!@#"}
+
 
 class PasswordGeneratorDialog(QDialog):
-    def __init__(self, parent=None):
+    def __init__(self, parent=None, db_path=None, jobs=None):
         super().__init__(parent)
         self.setWindowTitle("Password Generator")
         self.setFixedWidth(400)
+        self.jobs = jobs
+        self.policies = Policies(db_path) if db_path else None
 
         layout = QVBoxLayout(self)
         layout.setContentsMargins(30, 30, 30, 30)
@@ -32,7 +38,35 @@ class PasswordGeneratorDialog(QDialog):
         password_layout.addWidget(self.toggle_btn)
         layout.addLayout(password_layout)
 
-        # Length slider
+        self.strength = StrengthMeter()
+        layout.addWidget(self.strength)
+
+        # Saved policies
+        policy_layout = QHBoxLayout()
+        self.policy_combo = ComboBox()
+        self.policy_combo.addItem("Custom", userData=None)
+        self.policy_combo.currentIndexChanged.connect(self.select_policy)
+        self.save_btn = PushButton("Save")
+        self.save_btn.clicked.connect(self.save_policy)
+        self.delete_btn = TransparentPushButton("Delete")
+        self.delete_btn.clicked.connect(self.delete_policy)
+        policy_layout.addWidget(QLabel("Policy:"))
+        policy_layout.addWidget(self.policy_combo, 1)
+        policy_layout.addWidget(self.save_btn)
+        policy_layout.addWidget(self.delete_btn)
+        layout.addLayout(policy_layout)
+
+        self.mode_combo = ComboBox()
+        self.mode_combo.addItem("Password", userData="password")
+        self.mode_combo.addItem("Passphrase", userData="passphrase")
+        self.mode_combo.currentIndexChanged.connect(self.show_mode)
+        layout.addWidget(self.mode_combo)
+
+        # Password options
+        self.password_options = QWidget()
+        password_options_layout = QVBoxLayout(self.password_options)
+        password_options_layout.setContentsMargins(0, 0, 0, 0)
+
         length_layout = QHBoxLayout()
         length_label = QLabel("Length:")
         self.length_slider = QSlider(Qt.Orientation.Horizontal)
@@ -47,7 +81,63 @@ class PasswordGeneratorDialog(QDialog):
         length_layout.addWidget(length_label)
         length_layout.addWidget(self.length_slider)
         length_layout.addWidget(self.length_value)
-        layout.addLayout(length_layout)
+        password_options_layout.addLayout(length_layout)
+
+        classes_layout = QHBoxLayout()
+        self.class_checks = {}
+        for name, label in CLASS_LABELS.items():
+            check = CheckBox(label)
+            check.setChecked(True)
+            self.class_checks[name] = check
+            classes_layout.addWidget(check)
+        password_options_layout.addLayout(classes_layout)
+
+        self.ambiguous_check = CheckBox(f"Avoid ambiguous characters ({pw_gen.AMBIGUOUS})")
+        password_options_layout.addWidget(self.ambiguous_check)
+        self.exclude_input = LineEdit()
+        self.exclude_input.setPlaceholderText("Characters to exclude")
+        password_options_layout.addWidget(self.exclude_input)
+        layout.addWidget(self.password_options)
+
+        # Passphrase options
+        self.passphrase_options = QWidget()
+        passphrase_options_layout = QVBoxLayout(self.passphrase_options)
+        passphrase_options_layout.setContentsMargins(0, 0, 0, 0)
+
+        words_layout = QHBoxLayout()
+        self.words_slider = QSlider(Qt.Orientation.Horizontal)
+        self.words_slider.setMinimum(3)
+        self.words_slider.setMaximum(12)
+        self.words_slider.setValue(6)
+        self.words_value = QLabel("6")
+        self.words_slider.valueChanged.connect(
+            lambda v: self.words_value.setText(str(v))
+        )
+        words_layout.addWidget(QLabel("Words:"))
+        words_layout.addWidget(self.words_slider)
+        words_layout.addWidget(self.words_value)
+        passphrase_options_layout.addLayout(words_layout)
+
+        format_layout = QHBoxLayout()
+        self.separator_input = LineEdit()
+        self.separator_input.setText("-")
+        self.separator_input.setPlaceholderText("Separator")
+        self.capitalize_check = CheckBox("Capitalize")
+        format_layout.addWidget(QLabel("Separator:"))
+        format_layout.addWidget(self.separator_input)
+        format_layout.addWidget(self.capitalize_check)
+        passphrase_options_layout.addLayout(format_layout)
+
+        wordlist_layout = QHBoxLayout()
+        self.wordlist_input = LineEdit()
+        self.wordlist_input.setPlaceholderText("Wordlist, one word per line")
+        browse_btn = PushButton("Browse")
+        browse_btn.clicked.connect(self.browse_wordlist)
+        wordlist_layout.addWidget(self.wordlist_input)
+        wordlist_layout.addWidget(browse_btn)
+        passphrase_options_layout.addLayout(wordlist_layout)
+        layout.addWidget(self.passphrase_options)
+        self.show_mode()
 
         # Generate button
         generate_btn = PrimaryPushButton("Generate")
@@ -93,6 +183,108 @@ class PasswordGeneratorDialog(QDialog):
         """
         )
 
+        self.load_policies()
+
+    def load_policies(self, select=None):
+        """Load saved policies into the combo box, selecting the policy_id given"""
+        self.save_btn.setEnabled(self.policies is not None)
+        self.delete_btn.setEnabled(False)
+        if self.policies and self.jobs:
+            self.jobs.read(self.policies.list, on_result=lambda policies: self._show_policies(policies, select))
+
+    def _show_policies(self, policies, select):
+        self.policy_combo.blockSignals(True)
+        self.policy_combo.clear()
+        self.policy_combo.addItem("Custom", userData=None)
+        for policy_id, name in policies:
+            self.policy_combo.addItem(name, userData=policy_id)
+        index = self.policy_combo.findData(select) if select else 0
+        self.policy_combo.setCurrentIndex(max(index, 0))
+        self.policy_combo.blockSignals(False)
+        self.delete_btn.setEnabled(self.policy_combo.currentData() is not None)
+
+    def select_policy(self):
+        policy_id = self.policy_combo.currentData()
+        self.delete_btn.setEnabled(policy_id is not None)
+        if policy_id is not None:
+            self.jobs.read(self.policies.get, policy_id, on_result=self.show_policy)
+
+    def show_policy(self, policy):
+        """Set the controls from a Policy"""
+        if policy is None:
+            return
+        self.mode_combo.setCurrentIndex(max(self.mode_combo.findData(policy.mode), 0))
+        self.length_slider.setValue(policy.length)
+        for name, check in self.class_checks.items():
+            check.setChecked(name in policy.classes)
+        self.ambiguous_check.setChecked(policy.avoid_ambiguous)
+        self.exclude_input.setText(policy.exclude)
+        self.words_slider.setValue(policy.words)
+        self.separator_input.setText(policy.separator)
+        self.capitalize_check.setChecked(policy.capitalize)
+        self.wordlist_input.setText(policy.wordlist or "")
+
+    def current_policy(self):
+        """Build a Policy from the controls"""
+        return pw_gen.Policy(
+            classes=[name for name, check in self.class_checks.items() if check.isChecked()],
+            exclude=self.exclude_input.text(),
+            avoid_ambiguous=self.ambiguous_check.isChecked(),
+            length=self.length_slider.value(),
+            mode=self.mode_combo.currentData(),
+            words=self.words_slider.value(),
+            separator=self.separator_input.text(),
+            capitalize=self.capitalize_check.isChecked(),
+            wordlist=self.wordlist_input.text() or None,
+        )
+
+    def save_policy(self):
+        """Save the current rules under a name, for this dialog and credentials to reuse"""
+        current = self.policy_combo.currentData()
+        name, ok = QInputDialog.getText(
+            self, "Save Policy", "Policy name:",
+            text=self.policy_combo.currentText() if current is not None else "",
+        )
+        if not ok or not name.strip():
+            return
+        self.jobs.write(
+            self.policies.save,
+            name.strip(),
+            self.current_policy(),
+            on_result=lambda policy_id: self.load_policies(policy_id),
+            on_error=lambda message: QMessageBox.critical(self, "Error", f"Failed to save policy: {message}"),
+        )
+
+    def delete_policy(self):
+        policy_id = self.policy_combo.currentData()
+        if policy_id is None:
+            return
+        reply = QMessageBox.question(
+            self,
+            "Confirm Delete",
+            f"Delete policy '{self.policy_combo.currentText()}'? Credentials using it fall back to the default.",
+            QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
+        )
+        if reply == QMessageBox.StandardButton.Yes:
+            self.jobs.write(
+                self.policies.delete,
+                policy_id,
+                on_result=lambda _: self.load_policies(),
+                on_error=lambda message: QMessageBox.critical(self, "Error", f"Failed to delete policy: {message}"),
+            )
+
+    def show_mode(self):
+        passphrase = self.mode_combo.currentData() == "passphrase"
+        self.password_options.setVisible(not passphrase)
+        self.passphrase_options.setVisible(passphrase)
+
+    def browse_wordlist(self):
+        path, _ = QFileDialog.getOpenFileName(
+            self, "Select Wordlist", "", "Text Files (*.txt);;All Files (*)"
+        )
+        if path:
+            self.wordlist_input.setText(path)
+
     def toggle_password_visibility(self):
         if self.password_field.echoMode() == LineEdit.EchoMode.Password:
             self.password_field.setEchoMode(LineEdit.EchoMode.Normal)
@@ -102,6 +294,10 @@ class PasswordGeneratorDialog(QDialog):
             self.toggle_btn.setText("Show")
 
     def generate_password(self):
-        length = self.length_slider.value()
-        password = pw_gen.generate_strong_password(length)
+        try:
+            password = pw_gen.generate(self.current_policy())[0]
+        except (ValueError, OSError) as e:
+            QMessageBox.warning(self, "Generator", str(e))
+            return
         self.password_field.setText(password)
+        self.strength.show_strength(password)
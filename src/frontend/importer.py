@@ -0,0 +1,192 @@
+from PyQt6.QtWidgets import QDialog, QVBoxLayout, QHBoxLayout, QLabel, QFileDialog, QInputDialog, QLineEdit
+from qfluentwidgets import PrimaryPushButton, PushButton, LineEdit, TitleLabel, ComboBox, ProgressBar, CheckBox
+from PyQt6.QtCore import QObject, QThread, pyqtSignal
+from src.backend.importer import Importer, detect_format
+
+# Length of passwords generated for imported entries without one
+GENERATED_LENGTH = 20
+
+
+class ImportWorker(QObject):
+    progress = pyqtSignal(int, int, int)
+    finished = pyqtSignal(dict)
+    failed = pyqtSignal(str)
+
+    def __init__(self, db_path, path, mode, passphrase=None, generate_length=None):
+        super().__init__()
+        self.db_path = db_path
+        self.path = path
+        self.mode = mode
+        self.passphrase = passphrase
+        self.generate_length = generate_length
+        self._cancelled = False
+
+    def run(self):
+        try:
+            importer = Importer(
+                self.db_path,
+                self.path,
+                mode=self.mode,
+                passphrase=self.passphrase,
+                generate_length=self.generate_length,
+            )
+            totals = importer.run(
+                progress=self.progress.emit, cancelled=lambda: self._cancelled
+            )
+            self.finished.emit(totals)
+        except Exception as e:
+            self.failed.emit(str(e))
+
+    def cancel(self):
+        self._cancelled = True
+
+
+class ImportDialog(QDialog):
+    imported = pyqtSignal()
+
+    def __init__(self, db_path, parent=None):
+        super().__init__(parent)
+        self.db_path = db_path
+        self.thread = None
+        self.worker = None
+        self.setWindowTitle("Import Credentials")
+        self.setFixedWidth(450)
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(30, 30, 30, 30)
+        layout.setSpacing(16)
+
+        title = TitleLabel("Import Credentials")
+        layout.addWidget(title)
+
+        # File selection
+        file_layout = QHBoxLayout()
+        self.file_input = LineEdit()
+        self.file_input.setPlaceholderText("CSV, JSON lines or Krypt archive")
+        self.file_input.setReadOnly(True)
+        browse_btn = PushButton("Browse")
+        browse_btn.clicked.connect(self.choose_file)
+        file_layout.addWidget(self.file_input)
+        file_layout.addWidget(browse_btn)
+        layout.addLayout(file_layout)
+
+        # Conflict handling
+        self.mode_combo = ComboBox()
+        self.mode_combo.addItem("Skip existing titles", userData="add")
+        self.mode_combo.addItem("Overwrite existing titles", userData="upsert")
+        layout.addWidget(self.mode_combo)
+
+        self.generate_check = CheckBox("Generate passwords for entries without one")
+        layout.addWidget(self.generate_check)
+
+        # Progress
+        self.progress_bar = ProgressBar()
+        self.progress_bar.setRange(0, 1000)
+        self.progress_bar.setValue(0)
+        layout.addWidget(self.progress_bar)
+
+        self.status_label = QLabel("Select a file to import")
+        self.status_label.setStyleSheet("color: #666666; font-size: 13px;")
+        layout.addWidget(self.status_label)
+
+        # Buttons
+        bottom_layout = QHBoxLayout()
+        bottom_layout.addStretch()
+        self.cancel_btn = PushButton("Close")
+        self.cancel_btn.clicked.connect(self.reject)
+        self.start_btn = PrimaryPushButton("Import")
+        self.start_btn.clicked.connect(self.start_import)
+        bottom_layout.addWidget(self.cancel_btn)
+        bottom_layout.addWidget(self.start_btn)
+        layout.addLayout(bottom_layout)
+
+        self.setStyleSheet(
+            """
+            QDialog {
+                background-color: white;
+            }
+            QLabel {
+                color: #202020;
+                font-size: 14px;
+            }
+        """
+        )
+
+    def choose_file(self):
+        path, _ = QFileDialog.getOpenFileName(
+            self, "Import Credentials", "", "Credentials (*.csv *.json *.jsonl *.ndjson *.krypt)"
+        )
+        if path:
+            self.file_input.setText(path)
+
+    def start_import(self):
+        path = self.file_input.text()
+        if not path or self.thread:
+            return
+
+        passphrase = None
+        if detect_format(path) == "archive":
+            passphrase, ok = QInputDialog.getText(
+                self, "Encrypted Archive", "Enter archive passphrase:", QLineEdit.EchoMode.Password
+            )
+            if not ok or not passphrase:
+                return
+
+        self.start_btn.setEnabled(False)
+        self.mode_combo.setEnabled(False)
+        self.generate_check.setEnabled(False)
+        self.cancel_btn.setText("Cancel")
+        self.status_label.setText("Importing...")
+
+        self.thread = QThread(self)
+        generate_length = GENERATED_LENGTH if self.generate_check.isChecked() else None
+        self.worker = ImportWorker(
+            self.db_path, path, self.mode_combo.currentData(), passphrase, generate_length
+        )
+        self.worker.moveToThread(self.thread)
+        self.thread.started.connect(self.worker.run)
+        self.worker.progress.connect(self.update_progress)
+        self.worker.finished.connect(self.import_finished)
+        self.worker.failed.connect(self.import_failed)
+        self.worker.finished.connect(self.thread.quit)
+        self.worker.failed.connect(self.thread.quit)
+        self.thread.finished.connect(self.cleanup)
+        self.thread.start()
+
+    def update_progress(self, done, total, rows):
+        if total:
+            self.progress_bar.setValue(int(done * 1000 / total))
+        self.status_label.setText(f"{rows} rows processed")
+
+    def import_finished(self, totals):
+        state = "Import cancelled" if totals["cancelled"] else "Import finished"
+        self.status_label.setText(
+            f"{state}: {totals['inserted']} added, {totals['updated']} updated, "
+            f"{totals['conflicts']} already existed, {totals['skipped']} skipped"
+            + (f", {totals['generated']} passwords generated" if totals["generated"] else "")
+        )
+        if not totals["cancelled"]:
+            self.progress_bar.setValue(1000)
+        self.imported.emit()
+
+    def import_failed(self, message):
+        self.status_label.setText(f"Import failed: {message}")
+        self.imported.emit()
+
+    def cleanup(self):
+        self.worker.deleteLater()
+        self.thread.deleteLater()
+        self.worker = None
+        self.thread = None
+        self.start_btn.setEnabled(True)
+        self.mode_combo.setEnabled(True)
+        self.generate_check.setEnabled(True)
+        self.cancel_btn.setText("Close")
+
+    def reject(self):
+        # Keep the dialog open until a running import has stopped
+        if self.worker:
+            self.worker.cancel()
+            self.status_label.setText("Cancelling...")
+            return
+        super().reject()
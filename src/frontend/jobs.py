@@ -0,0 +1,103 @@
+from itertools import count
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+
+
+class Job(QRunnable):
+    def __init__(self, jobs, job_id, func, args):
+        super().__init__()
+        self.jobs = jobs
+        self.job_id = job_id
+        self.func = func
+        self.args = args
+
+    def run(self):
+        try:
+            result = self.func(*self.args)
+        except Exception as e:
+            self.jobs.failed.emit(self.job_id, str(e))
+            return
+        self.jobs.finished.emit(self.job_id, result)
+
+
+class DatabaseJobs(QObject):
+    finished = pyqtSignal(int, object)
+    failed = pyqtSignal(int, str)
+
+    def __init__(self, readers=4, parent=None):
+        """
+        Run database calls off the UI thread.
+
+        Reads run in parallel on a pool of reader threads. Writes go through a
+        single thread, one at a time in submission order. Results and errors
+        arrive through the finished and failed signals on the thread that
+        owns this object, and are passed to the callbacks given on submit.
+
+        Args:
+        readers (int): Maximum number of reads running at once.
+        """
+        super().__init__(parent)
+        self.readers = QThreadPool(self)
+        self.readers.setMaxThreadCount(readers)
+        self.writer = QThreadPool(self)
+        self.writer.setMaxThreadCount(1)
+        self._ids = count(1)
+        self._callbacks = {}
+        self.finished.connect(self._deliver_result)
+        self.failed.connect(self._deliver_error)
+
+    def _submit(self, pool, func, args, on_result, on_error):
+        job_id = next(self._ids)
+        self._callbacks[job_id] = (on_result, on_error)
+        pool.start(Job(self, job_id, func, args))
+        return job_id
+
+    def read(self, func, *args, on_result=None, on_error=None):
+        """
+        Run func(*args) on a reader thread.
+
+        Returns:
+        int: Job id, as passed to the finished and failed signals.
+        """
+        return self._submit(self.readers, func, args, on_result, on_error)
+
+    def write(self, func, *args, on_result=None, on_error=None):
+        """
+        Queue func(*args) behind the writes submitted before it.
+
+        Returns:
+        int: Job id, as passed to the finished and failed signals.
+        """
+        return self._submit(self.writer, func, args, on_result, on_error)
+
+    def _deliver_result(self, job_id, result):
+        on_result, _ = self._callbacks.pop(job_id, (None, None))
+        if on_result:
+            on_result(result)
+
+    def _deliver_error(self, job_id, message):
+        if job_id not in self._callbacks:
+            return
+        _, on_error = self._callbacks.pop(job_id)
+        if on_error:
+            on_error(message)
+        else:
+            print(f"Database job failed: {message}")
+
+    def discard(self):
+        """Drop the callbacks of every submitted job, their results are ignored"""
+        self._callbacks.clear()
+
+    def wait(self):
+        """Block until every submitted job has run"""
+        self.writer.waitForDone()
+        self.readers.waitForDone()
+
+    def shutdown(self):
+        """Discard pending results and wait for running jobs, before the vault is closed"""
+        self.discard()
+        self.readers.clear()
+        self.wait()
+
+
+if __name__ == "__main__":
+    exit("Invalid entry point")
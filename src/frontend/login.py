@@ -1,9 +1,64 @@
 import os
-from PyQt6.QtWidgets import QWidget, QVBoxLayout, QLineEdit, QHBoxLayout, QFrame, QInputDialog, QMessageBox
-from qfluentwidgets import CardWidget, ScrollArea, PushButton, InfoBar, LineEdit, TitleLabel, SubtitleLabel, InfoBarPosition
-from PyQt6.QtCore import pyqtSignal, Qt
+from PyQt6.QtWidgets import QWidget, QVBoxLayout, QLineEdit, QHBoxLayout, QFrame, QInputDialog, QMessageBox, QLabel
+from qfluentwidgets import CardWidget, ScrollArea, PushButton, InfoBar, LineEdit, TitleLabel, SubtitleLabel, InfoBarPosition, ProgressBar
+from PyQt6.QtCore import QObject, QThread, pyqtSignal, Qt
 from PyQt6.QtGui import QIcon
-from src.backend.auth import User
+from src.backend.auth import User, LOGIN_STAGES
+from src.backend.user import Credentials
+from src.modules.contextmanager import open_vault, close_vault
+from .credlist import PAGE_SIZE
+
+# Status shown for each User.login stage, then for the prefetch
+UNLOCK_STAGES = (
+    "Deriving keys...",
+    "Opening vault...",
+    "Encrypting entries...",
+    "Archiving audit log...",
+    "Loading credentials...",
+)
+
+
+class UnlockWorker(QObject):
+    progress = pyqtSignal(int, int)
+    unlocked = pyqtSignal(list)
+    rejected = pyqtSignal()
+    cancelled = pyqtSignal()
+    failed = pyqtSignal(str)
+
+    def __init__(self, user):
+        """
+        Unlock a vault off the UI thread: open its pool, derive the keys and
+        prefetch the first page of credentials.
+
+        Args:
+        user (User): User to log in.
+        """
+        super().__init__()
+        self.user = user
+        self._cancelled = False
+
+    def run(self):
+        db = self.user.db
+        try:
+            open_vault(db)
+            ok = self.user.login(progress=self.progress.emit, cancelled=lambda: self._cancelled)
+            if ok and not self._cancelled:
+                self.progress.emit(LOGIN_STAGES, LOGIN_STAGES)
+                rows = Credentials(db).list_page(None, 0, PAGE_SIZE)
+                if not self._cancelled:
+                    self.unlocked.emit(rows)
+                    return
+            close_vault(db)
+            if self._cancelled:
+                self.cancelled.emit()
+            else:
+                self.rejected.emit()
+        except Exception as e:
+            close_vault(db)
+            self.failed.emit(str(e))
+
+    def cancel(self):
+        self._cancelled = True
 
 
 class UserCard(CardWidget):
@@ -50,7 +105,7 @@ class UserCard(CardWidget):
 
 
 class LoginScreen(QWidget):
-    login_success = pyqtSignal()
+    login_success = pyqtSignal(list)
 
     def __init__(self):
         super().__init__()
@@ -64,6 +119,8 @@ class LoginScreen(QWidget):
         )
         self.current_user = None
         self.user_auth = None
+        self.thread = None
+        self.worker = None
         self.initUI()
         self.load_users()
 
@@ -136,10 +193,20 @@ class LoginScreen(QWidget):
         self.password_input.returnPressed.connect(self.handle_login)
         right_layout.addWidget(self.password_input)
 
-        # Login button
-        login_btn = PushButton("Login")
-        login_btn.clicked.connect(self.handle_login)
-        right_layout.addWidget(login_btn)
+        # Login button, turns into Cancel while the vault unlocks
+        self.login_btn = PushButton("Login")
+        self.login_btn.clicked.connect(self.handle_login)
+        right_layout.addWidget(self.login_btn)
+
+        # Unlock progress
+        self.unlock_progress = ProgressBar()
+        self.unlock_progress.setRange(0, LOGIN_STAGES + 1)
+        self.unlock_progress.hide()
+        right_layout.addWidget(self.unlock_progress)
+        self.unlock_status = QLabel()
+        self.unlock_status.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.unlock_status.setStyleSheet("color: #666666; font-size: 13px;")
+        right_layout.addWidget(self.unlock_status)
         right_layout.addStretch()
 
         # Add panels to main layout
@@ -160,11 +227,17 @@ class LoginScreen(QWidget):
         self.cards_layout.addWidget(card)
 
     def select_user(self, username):
+        if self.thread:
+            return
         self.current_user = username
         self.user_label.setText(f"Welcome back, {username}")
         self.password_input.setFocus()
 
     def handle_login(self):
+        if self.thread:
+            self.cancel_unlock()
+            return
+
         if not self.current_user:
             InfoBar.error(
                 title="Error",
@@ -181,24 +254,82 @@ class LoginScreen(QWidget):
         user_db = f"db/users/{self.current_user}.db"  # Adjust path as needed
         self.user_auth = User(user_db, self.current_user, password)
 
-        # Attempt login
-        if self.user_auth.login():
-            InfoBar.success(
-                title="Success",
-                content="Login successful",
-                position=InfoBarPosition.TOP,
-                duration=1000,
-                parent=self,
-            )
-            self.login_success.emit()
-        else:
-            InfoBar.error(
-                title="Error",
-                content="Invalid credentials",
-                position=InfoBarPosition.TOP,
-                duration=2000,
-                parent=self,
-            )
+        # Unlock on a worker, the form stays responsive and can cancel
+        self.password_input.setEnabled(False)
+        self.login_btn.setText("Cancel")
+        self.unlock_progress.setValue(0)
+        self.unlock_progress.show()
+        self.unlock_status.setText(UNLOCK_STAGES[0])
+
+        self.thread = QThread(self)
+        self.worker = UnlockWorker(self.user_auth)
+        self.worker.moveToThread(self.thread)
+        self.thread.started.connect(self.worker.run)
+        self.worker.progress.connect(self.update_unlock_progress)
+        self.worker.unlocked.connect(self.unlock_finished)
+        self.worker.rejected.connect(self.unlock_rejected)
+        self.worker.failed.connect(self.unlock_failed)
+        for signal in (self.worker.unlocked, self.worker.rejected, self.worker.cancelled, self.worker.failed):
+            signal.connect(self.thread.quit)
+        self.thread.finished.connect(self.cleanup)
+        self.thread.start()
+
+    def update_unlock_progress(self, stage, total):
+        self.unlock_progress.setValue(stage)
+        self.unlock_status.setText(UNLOCK_STAGES[stage])
+
+    def unlock_finished(self, first_page):
+        InfoBar.success(
+            title="Success",
+            content="Login successful",
+            position=InfoBarPosition.TOP,
+            duration=1000,
+            parent=self,
+        )
+        self.login_success.emit(first_page)
+
+    def unlock_rejected(self):
+        InfoBar.error(
+            title="Error",
+            content="Invalid credentials",
+            position=InfoBarPosition.TOP,
+            duration=2000,
+            parent=self,
+        )
+
+    def unlock_failed(self, message):
+        InfoBar.error(
+            title="Error",
+            content=f"Failed to unlock vault: {message}",
+            position=InfoBarPosition.TOP,
+            duration=3000,
+            parent=self,
+        )
+
+    def cancel_unlock(self):
+        """Stop the unlock after its current stage, key derivation itself cannot be interrupted"""
+        self.worker.cancel()
+        self.login_btn.setEnabled(False)
+        self.unlock_status.setText("Cancelling...")
+
+    def cleanup(self):
+        self.worker.deleteLater()
+        self.thread.deleteLater()
+        self.worker = None
+        self.thread = None
+        self.password_input.setEnabled(True)
+        self.login_btn.setEnabled(True)
+        self.login_btn.setText("Login")
+        self.unlock_progress.hide()
+        self.unlock_status.clear()
+
+    def stop_unlock(self):
+        """Cancel a running unlock and wait for it, before the application quits"""
+        if not self.thread:
+            return
+        self.worker.cancel()
+        self.thread.quit()
+        self.thread.wait()
 
     def refresh_users(self):
         """Clear and reload user cards"""
@@ -254,6 +385,8 @@ class LoginScreen(QWidget):
 
     def delete_user(self):
         """Delete selected user"""
+        if self.thread:
+            return
         if not self.current_user:
             InfoBar.error(
                 title="Error",
@@ -276,7 +409,7 @@ class LoginScreen(QWidget):
 
         db_path = f"db/users/{self.current_user}.db"
         if os.path.exists(db_path):
-            os.remove(db_path)
+            User(db_path, self.current_user, None).delete()
             self.clear_fields()
             self.refresh_users()
 
@@ -0,0 +1,66 @@
+import sqlite3 as sql
+from threading import Lock
+from PyQt6.QtCore import QObject, pyqtSignal
+from src.backend.user import search_credentials
+from src.modules.contextmanager import db_read
+
+
+class SearchWorker(QObject):
+    results = pyqtSignal(int, list)
+    failed = pyqtSignal(int, str)
+
+    def __init__(self, db_path, limit=500):
+        """
+        Runs credential searches on its own thread.
+
+        Each search borrows a reader of the vault's pool for its duration, so
+        no connection stays open between searches.
+
+        Every request carries a generation number; only the newest one is
+        executed and reported, older requests are skipped or interrupted.
+
+        Args:
+        db_path (str): Database path.
+        limit (int): Maximum number of rows per search.
+        """
+        super().__init__()
+        self.db_path = db_path
+        self.limit = limit
+        self.latest = 0
+        self.connection = None
+        self._lock = Lock()
+
+    def supersede(self, generation):
+        """Mark a generation as the newest and interrupt a running query, called from the UI thread"""
+        with self._lock:
+            self.latest = generation
+            if self.connection:
+                self.connection.interrupt()
+
+    def run(self, generation, query, group_id):
+        if generation != self.latest:
+            return
+        try:
+            with db_read(self.db_path) as cur:
+                with self._lock:
+                    # Superseded while waiting for a reader
+                    if generation != self.latest:
+                        return
+                    self.connection = cur.connection
+                try:
+                    rows = search_credentials(cur, query, group_id, self.limit)
+                finally:
+                    with self._lock:
+                        self.connection = None
+        except sql.OperationalError as e:
+            # A newer request interrupted this query
+            if generation != self.latest:
+                return
+            self.failed.emit(generation, str(e))
+            return
+        if generation == self.latest:
+            self.results.emit(generation, rows)
+
+
+if __name__ == "__main__":
+    exit("Invalid entry point")
@@ -1,8 +1,92 @@
 from PyQt6.QtWidgets import QWidget, QVBoxLayout, QGridLayout, QLabel, QHBoxLayout
-from qfluentwidgets import PushButton, LineEdit, InfoBar, InfoBarPosition, TitleLabel, CardWidget
-from PyQt6.QtCore import Qt
+from qfluentwidgets import PushButton, LineEdit, InfoBar, InfoBarPosition, TitleLabel, CardWidget, ComboBox, ProgressBar, ListWidget
+from PyQt6.QtCore import Qt, QObject, QThread, pyqtSignal
 from .audit import AuditLogCard
 from src.backend.auth import User
+from src.backend.health import Health
+from src.backend.rekey import Rekey
+from src.backend.user import Storage
+from src.modules.storage import PROFILES, DESCRIPTIONS
+
+
+class RekeyWorker(QObject):
+    progress = pyqtSignal(int, int)
+    finished = pyqtSignal(dict)
+    failed = pyqtSignal(str)
+
+    def __init__(self, db_path):
+        super().__init__()
+        self.db_path = db_path
+        self._cancelled = False
+
+    def run(self):
+        try:
+            result = Rekey(self.db_path).run(
+                progress=self.progress.emit, cancelled=lambda: self._cancelled
+            )
+            self.finished.emit(result)
+        except Exception as e:
+            self.failed.emit(str(e))
+
+    def cancel(self):
+        self._cancelled = True
+
+
+class StorageWorker(QObject):
+    finished = pyqtSignal(str)
+    failed = pyqtSignal(str)
+
+    def __init__(self, db_path, name):
+        super().__init__()
+        self.db_path = db_path
+        self.name = name
+
+    def run(self):
+        try:
+            Storage(self.db_path).set_profile(self.name)
+            self.finished.emit(self.name)
+        except Exception as e:
+            self.failed.emit(str(e))
+
+
+class HealthWorker(QObject):
+    progress = pyqtSignal(int, int)
+    finished = pyqtSignal(object)
+    failed = pyqtSignal(str)
+
+    def __init__(self, db_path):
+        super().__init__()
+        self.db_path = db_path
+        self._cancelled = False
+
+    def run(self):
+        try:
+            report = Health(self.db_path).run(
+                progress=self.progress.emit, cancelled=lambda: self._cancelled
+            )
+            self.finished.emit(report)
+        except Exception as e:
+            self.failed.emit(str(e))
+
+    def cancel(self):
+        self._cancelled = True
+
+
+class PasswordChangeWorker(QObject):
+    finished = pyqtSignal(bool)
+    failed = pyqtSignal(str)
+
+    def __init__(self, user, current_pw, new_pw):
+        super().__init__()
+        self.user = user
+        self.current_pw = current_pw
+        self.new_pw = new_pw
+
+    def run(self):
+        try:
+            self.finished.emit(self.user.change_password(self.current_pw, self.new_pw))
+        except Exception as e:
+            self.failed.emit(str(e))
 
 
 class PasswordChangeCard(CardWidget):
@@ -11,6 +95,10 @@ class PasswordChangeCard(CardWidget):
         self.db_path = db_path
         self.username = username
         self.user = User(db_path, username, None)
+        self.thread = None
+        self.worker = None
+        self.change_thread = None
+        self.change_worker = None
         self.setFixedWidth(350)
         self.setup_ui()
         self.setFixedWidth(350)
@@ -55,6 +143,16 @@ class PasswordChangeCard(CardWidget):
         self.save_button.clicked.connect(self.change_password)
         layout.addWidget(self.save_button, 4, 0, 1, 2)
 
+        # Re-encryption progress, shown while secrets move to the new key
+        self.rekey_progress = ProgressBar()
+        self.rekey_progress.setRange(0, 1000)
+        self.rekey_progress.hide()
+        layout.addWidget(self.rekey_progress, 5, 0, 1, 2)
+        self.rekey_status = QLabel()
+        self.rekey_status.setStyleSheet("color: #666666; font-size: 13px;")
+        self.rekey_status.hide()
+        layout.addWidget(self.rekey_status, 6, 0, 1, 2)
+
     def change_password(self):
         current_pw = self.current_pw_input.text()
         new_pw = self.new_pw_input.text()
@@ -68,12 +166,120 @@ class PasswordChangeCard(CardWidget):
             self.show_error("New passwords do not match")
             return
 
-        if self.user.change_password(current_pw, new_pw):
+        if self.thread:
+            self.show_error("Wait until the vault is re-encrypted")
+            return
+
+        if self.change_thread:
+            return
+
+        # Unwrapping, calibrating and deriving the new key take a second or more
+        self.set_inputs_enabled(False)
+        self.change_thread = QThread(self)
+        self.change_worker = PasswordChangeWorker(self.user, current_pw, new_pw)
+        self.change_worker.moveToThread(self.change_thread)
+        self.change_thread.started.connect(self.change_worker.run)
+        self.change_worker.finished.connect(self.password_changed)
+        self.change_worker.failed.connect(self.password_change_failed)
+        self.change_worker.finished.connect(self.change_thread.quit)
+        self.change_worker.failed.connect(self.change_thread.quit)
+        self.change_thread.finished.connect(self.change_cleanup)
+        self.change_thread.start()
+
+    def password_changed(self, changed):
+        if changed:
             self.show_success("Password changed successfully!")
             self.clear_fields()
         else:
             self.show_error("Current password is incorrect.")
 
+    def password_change_failed(self, message):
+        self.show_error(f"Failed to change password: {message}")
+
+    def change_cleanup(self, resume=True):
+        self.change_worker.deleteLater()
+        self.change_thread.deleteLater()
+        self.change_worker = None
+        self.change_thread = None
+        self.set_inputs_enabled(True)
+        # A successful change adds a new key, the secrets move to it in the background
+        if resume:
+            self.resume_rekey()
+
+    def stop_password_change(self):
+        """Wait for a running password change, key derivation cannot be interrupted"""
+        if not self.change_thread:
+            return
+        # The vault closes next, so no re-encryption is started afterwards
+        self.change_thread.finished.disconnect(self.change_cleanup)
+        self.change_thread.quit()
+        self.change_thread.wait()
+        self.change_cleanup(resume=False)
+
+    def set_inputs_enabled(self, enabled):
+        for widget in (self.current_pw_input, self.new_pw_input, self.confirm_pw_input, self.save_button):
+            widget.setEnabled(enabled)
+
+    def resume_rekey(self):
+        """Re-encrypt the vault under its newest key in the background, if a pass is pending"""
+        if self.thread:
+            return
+        try:
+            if Rekey(self.db_path).pending() is None:
+                return
+        except Exception as e:
+            print(f"Error checking vault re-encryption: {e}")
+            return
+
+        self.save_button.setEnabled(False)
+        self.rekey_progress.setValue(0)
+        self.rekey_progress.show()
+        self.rekey_status.setText("Re-encrypting vault...")
+        self.rekey_status.show()
+
+        self.thread = QThread(self)
+        self.worker = RekeyWorker(self.db_path)
+        self.worker.moveToThread(self.thread)
+        self.thread.started.connect(self.worker.run)
+        self.worker.progress.connect(self.update_rekey_progress)
+        self.worker.finished.connect(self.rekey_finished)
+        self.worker.failed.connect(self.rekey_failed)
+        self.worker.finished.connect(self.thread.quit)
+        self.worker.failed.connect(self.thread.quit)
+        self.thread.finished.connect(self.cleanup)
+        self.thread.start()
+
+    def update_rekey_progress(self, done, total):
+        if total:
+            self.rekey_progress.setValue(int(done * 1000 / total))
+        self.rekey_status.setText(f"Re-encrypting vault: {done} of {total} entries")
+
+    def rekey_finished(self, result):
+        if result["done"]:
+            self.rekey_progress.hide()
+            self.rekey_status.hide()
+        else:
+            self.rekey_status.setText("Re-encryption paused, it continues after the next login")
+
+    def rekey_failed(self, message):
+        print(f"Error re-encrypting vault: {message}")
+        self.rekey_status.setText("Re-encryption stopped, it continues after the next login")
+
+    def cleanup(self):
+        self.worker.deleteLater()
+        self.thread.deleteLater()
+        self.worker = None
+        self.thread = None
+        self.save_button.setEnabled(True)
+
+    def stop_rekey(self):
+        """Stop a running pass after its current chunk, the checkpoint keeps its progress"""
+        if not self.thread:
+            return
+        self.worker.cancel()
+        self.thread.quit()
+        self.thread.wait()
+
     def show_error(self, message):
         InfoBar.error(
             title="Error",
@@ -102,11 +308,256 @@ class PasswordChangeCard(CardWidget):
         self.confirm_pw_input.clear()
 
 
+class StorageSettingsCard(CardWidget):
+    def __init__(self, db_path, parent=None):
+        super().__init__(parent)
+        self.db_path = db_path
+        self.storage = Storage(db_path)
+        self.thread = None
+        self.worker = None
+        self.setup_ui()
+        self.setStyleSheet(
+            """
+            StorageSettingsCard {
+                background-color: white;
+                border: 1px solid #e0e0e0;
+                border-radius: 8px;
+            }
+        """
+        )
+
+    def setup_ui(self):
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(20, 20, 20, 20)
+        layout.setSpacing(12)
+
+        title = TitleLabel("Storage")
+        layout.addWidget(title)
+
+        self.profile_combo = ComboBox()
+        for name in PROFILES:
+            self.profile_combo.addItem(name.capitalize(), userData=name)
+        self.profile_combo.currentIndexChanged.connect(self.update_description)
+        layout.addWidget(self.profile_combo)
+
+        self.description = QLabel()
+        self.description.setWordWrap(True)
+        self.description.setStyleSheet("color: #666666; font-size: 13px;")
+        layout.addWidget(self.description)
+
+        self.apply_button = PushButton("Apply Profile")
+        self.apply_button.clicked.connect(self.apply_profile)
+        layout.addWidget(self.apply_button)
+
+        self.load_profile()
+
+    def load_profile(self):
+        try:
+            current = self.storage.get_profile()
+        except Exception as e:
+            print(f"Error loading storage profile: {e}")
+            return
+        index = self.profile_combo.findData(current)
+        if index >= 0:
+            self.profile_combo.setCurrentIndex(index)
+        self.update_description()
+
+    def update_description(self):
+        self.description.setText(DESCRIPTIONS.get(self.profile_combo.currentData(), ""))
+
+    def apply_profile(self):
+        """Switch the vault to the selected profile in the background, rewriting it if the page size changes"""
+        if self.thread:
+            return
+        self.apply_button.setEnabled(False)
+        self.profile_combo.setEnabled(False)
+        self.description.setText("Applying storage profile...")
+
+        self.thread = QThread(self)
+        self.worker = StorageWorker(self.db_path, self.profile_combo.currentData())
+        self.worker.moveToThread(self.thread)
+        self.thread.started.connect(self.worker.run)
+        self.worker.finished.connect(self.profile_applied)
+        self.worker.failed.connect(self.profile_failed)
+        self.worker.finished.connect(self.thread.quit)
+        self.worker.failed.connect(self.thread.quit)
+        self.thread.finished.connect(self.cleanup)
+        self.thread.start()
+
+    def profile_applied(self, name):
+        self.update_description()
+        InfoBar.success(
+            title="Success",
+            content=f"Storage profile set to {name}",
+            orient=Qt.Orientation.Horizontal,
+            isClosable=True,
+            position=InfoBarPosition.TOP,
+            duration=3000,
+            parent=self,
+        )
+
+    def profile_failed(self, message):
+        # Back to the profile the vault still uses
+        self.load_profile()
+        InfoBar.error(
+            title="Error",
+            content=f"Failed to apply storage profile: {message}",
+            orient=Qt.Orientation.Horizontal,
+            isClosable=True,
+            position=InfoBarPosition.TOP,
+            duration=3000,
+            parent=self,
+        )
+
+    def cleanup(self):
+        self.worker.deleteLater()
+        self.thread.deleteLater()
+        self.worker = None
+        self.thread = None
+        self.apply_button.setEnabled(True)
+        self.profile_combo.setEnabled(True)
+
+    def stop_storage(self):
+        """Wait for a profile switch to finish, it cannot be interrupted"""
+        if not self.thread:
+            return
+        self.thread.quit()
+        self.thread.wait()
+
+
+class VaultHealthCard(CardWidget):
+    def __init__(self, db_path, parent=None):
+        super().__init__(parent)
+        self.db_path = db_path
+        self.health = Health(db_path)
+        self.thread = None
+        self.worker = None
+        self.setup_ui()
+        self.setStyleSheet(
+            """
+            VaultHealthCard {
+                background-color: white;
+                border: 1px solid #e0e0e0;
+                border-radius: 8px;
+            }
+        """
+        )
+
+    def setup_ui(self):
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(20, 20, 20, 20)
+        layout.setSpacing(12)
+
+        title = TitleLabel("Vault Health")
+        layout.addWidget(title)
+
+        self.summary = QLabel()
+        self.summary.setWordWrap(True)
+        self.summary.setStyleSheet("color: #666666; font-size: 13px;")
+        layout.addWidget(self.summary)
+
+        self.results = ListWidget()
+        self.results.setWordWrap(True)
+        self.results.setFixedHeight(160)
+        self.results.hide()
+        layout.addWidget(self.results)
+
+        self.progress = ProgressBar()
+        self.progress.setRange(0, 1000)
+        self.progress.hide()
+        layout.addWidget(self.progress)
+
+        self.check_button = PushButton("Check Passwords")
+        self.check_button.clicked.connect(self.check)
+        layout.addWidget(self.check_button)
+
+        self.load_report()
+
+    def load_report(self):
+        """Show the result of the last check"""
+        try:
+            self.show_report(self.health.report())
+        except Exception as e:
+            print(f"Error loading vault health: {e}")
+
+    def show_report(self, report):
+        self.results.clear()
+        if report is None:
+            self.summary.setText("Find entries that share the same or nearly the same password.")
+            self.results.hide()
+            return
+
+        for group in report["reused"]:
+            self.results.addItem("Same password: " + ", ".join(title for _, title in group))
+        for group in report["similar"]:
+            self.results.addItem("Similar passwords: " + ", ".join(title for _, title in group))
+        reused = sum(len(group) for group in report["reused"])
+        similar = sum(len(group) for group in report["similar"])
+        if reused or similar:
+            self.summary.setText(f"{reused} entries reuse a password, {similar} have similar passwords.")
+        else:
+            self.summary.setText("No reused or similar passwords found.")
+        self.results.setVisible(bool(reused or similar))
+
+    def check(self):
+        """Update the report in the background, only changed entries are checked again"""
+        if self.thread:
+            return
+        self.check_button.setEnabled(False)
+        self.progress.setValue(0)
+        self.progress.show()
+        self.summary.setText("Checking passwords...")
+
+        self.thread = QThread(self)
+        self.worker = HealthWorker(self.db_path)
+        self.worker.moveToThread(self.thread)
+        self.thread.started.connect(self.worker.run)
+        self.worker.progress.connect(self.update_progress)
+        self.worker.finished.connect(self.check_finished)
+        self.worker.failed.connect(self.check_failed)
+        self.worker.finished.connect(self.thread.quit)
+        self.worker.failed.connect(self.thread.quit)
+        self.thread.finished.connect(self.cleanup)
+        self.thread.start()
+
+    def update_progress(self, done, total):
+        if total:
+            self.progress.setValue(int(done * 1000 / total))
+        self.summary.setText(f"Checking passwords: {done} of {total} entries")
+
+    def check_finished(self, report):
+        self.progress.hide()
+        if report is None:
+            self.load_report()
+            return
+        self.show_report(report)
+
+    def check_failed(self, message):
+        self.progress.hide()
+        self.summary.setText(f"Check failed: {message}")
+
+    def cleanup(self):
+        self.worker.deleteLater()
+        self.thread.deleteLater()
+        self.worker = None
+        self.thread = None
+        self.check_button.setEnabled(True)
+
+    def stop_health(self):
+        """Stop a running check after its current chunk, the next check redoes only what is left"""
+        if not self.thread:
+            return
+        self.worker.cancel()
+        self.thread.quit()
+        self.thread.wait()
+
+
 class SettingsView(QWidget):
-    def __init__(self, db_path, username, parent=None):
+    def __init__(self, db_path, username, jobs, parent=None):
         super().__init__(parent)
         self.db_path = db_path
         self.username = username
+        self.jobs = jobs
         self.setup_ui()
 
     def setup_ui(self):
@@ -116,11 +567,24 @@ class SettingsView(QWidget):
         cards_layout = QHBoxLayout()
         cards_layout.setSpacing(20)
 
+        left_column = QVBoxLayout()
+        left_column.setSpacing(20)
+
         self.pw_change_card = PasswordChangeCard(self.db_path, self.username)
         self.pw_change_card.setFixedWidth(300)
-        cards_layout.addWidget(self.pw_change_card, 1)
+        left_column.addWidget(self.pw_change_card)
+
+        self.storage_card = StorageSettingsCard(self.db_path)
+        self.storage_card.setFixedWidth(300)
+        left_column.addWidget(self.storage_card)
+
+        self.health_card = VaultHealthCard(self.db_path)
+        self.health_card.setFixedWidth(300)
+        left_column.addWidget(self.health_card)
+        left_column.addStretch()
+        cards_layout.addLayout(left_column, 1)
 
-        self.audit_log_card = AuditLogCard(db_path=self.db_path)
+        self.audit_log_card = AuditLogCard(self.db_path, self.jobs)
         self.audit_log_card.setFixedWidth(600)
         cards_layout.addWidget(self.audit_log_card, 2)
 
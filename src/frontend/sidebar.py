@@ -3,7 +3,6 @@ from PyQt6.QtWidgets import QFrame, QVBoxLayout, QWidget, QScrollArea, QHBoxLayo
 from PyQt6.QtCore import pyqtSignal, Qt
 from PyQt6.QtGui import QIcon
 from qfluentwidgets import PushButton, SubtitleLabel, TransparentToolButton, SubtitleLabel
-from src.modules.contextmanager import db_connect
 from src.backend.user import Groups
 
 
@@ -102,9 +101,10 @@ class GroupButton(PushButton):
 class GroupSidebar(QFrame):
     groupSelected = pyqtSignal(int)
 
-    def __init__(self, parent=None, db_path=None):
+    def __init__(self, parent=None, db_path=None, jobs=None):
         super().__init__(parent)
         self.db_path = db_path
+        self.jobs = jobs
         self.setObjectName("sidebar")
         self.setStyleSheet(StyleSheet.SIDEBAR_STYLE)
         self.setFixedWidth(250)
@@ -157,9 +157,11 @@ class GroupSidebar(QFrame):
 
         layout.addWidget(scroll)
         self.group_buttons = {}
+        self.group_titles = {}
+        self.group_counts = {}
         self.add_group("All", -1)  # -1 represents all groups
 
-        if db_path:
+        if db_path and jobs:
             self.load_groups()
 
     def create_group(self):
@@ -171,88 +173,97 @@ class GroupSidebar(QFrame):
         )
 
         if ok and title:
-            try:
-                with db_connect(self.db_path) as cur:
-                    cur.execute("SELECT title FROM groups WHERE title = ?", (title,))
-                    if cur.fetchone():
-                        QMessageBox.warning(
-                            self, "Error", f"Group '{title}' already exists"
-                        )
-                        return
-
-                    cur.execute("INSERT INTO groups (title) VALUES (?)", (title,))
-                    group_id = cur.lastrowid
-                    self.add_group(title, group_id)
-
-            except Exception as e:
-                QMessageBox.critical(self, "Error", f"Failed to create group: {str(e)}")
+            groups = Groups(self.db_path)
+
+            def create():
+                # Writes run one at a time, so the title cannot be taken in between
+                if groups.get_gid(title):
+                    return None
+                return groups.add_group(title)
+
+            self.jobs.write(
+                create,
+                on_result=lambda group_id: self._group_created(title, group_id),
+                on_error=lambda message: QMessageBox.critical(
+                    self, "Error", f"Failed to create group: {message}"
+                ),
+            )
+
+    def _group_created(self, title, group_id):
+        if group_id is None:
+            QMessageBox.warning(self, "Error", f"Group '{title}' already exists")
+            return
+        self.add_group(title, group_id)
 
     def delete_group(self):
         """Delete selected group"""
         # Find currently selected button
-        selected_button = None
-        selected_title = None
-
-        for title, button in self.group_buttons.items():
-            if button.isChecked() and title != "All":  # Explicitly check it's not "All"
-                selected_button = button
-                selected_title = title
-                break
+        group_id = self.selected_group()
 
-        if not selected_button:
+        if group_id is None or group_id == -1:
             QMessageBox.warning(self, "Warning", "Please select a group to delete.")
             return
 
-        try:
-            # Get group ID and confirm deletion
-            groups = Groups(self.db_path)
-            group_id = groups.get_gid(selected_title)
-
-            if not group_id:
-                QMessageBox.warning(
-                    self, "Error", f"Group '{selected_title}' not found."
-                )
-                return
+        selected_title = self.group_titles[group_id]
+        confirmation = QMessageBox.question(
+            self,
+            "Delete Group",
+            f"Are you sure you want to delete the group '{selected_title}'?",
+            QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
+        )
 
-            confirmation = QMessageBox.question(
-                self,
-                "Delete Group",
-                f"Are you sure you want to delete the group '{selected_title}'?",
-                QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
+        if confirmation == QMessageBox.StandardButton.Yes:
+            self.jobs.write(
+                Groups(self.db_path).delete_group,
+                group_id,
+                on_result=lambda _: self._group_deleted(group_id),
+                on_error=lambda message: QMessageBox.critical(
+                    self, "Error", f"Failed to delete group: {message}"
+                ),
             )
 
-            if confirmation == QMessageBox.StandardButton.Yes:
-                # Delete group and update UI
-                groups.delete_group(group_id)
-                self.groups_layout.removeWidget(selected_button)
-                selected_button.deleteLater()
-                del self.group_buttons[selected_title]
-
-                # Select "All" group after deletion
-                all_button = self.group_buttons.get("All")
-                if all_button:
-                    all_button.setChecked(True)
-                    self._handle_group_click(-1)
-
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"Failed to delete group: {str(e)}")
+    def _group_deleted(self, group_id):
+        if group_id not in self.group_buttons:
+            return
+        # Delete group and update UI
+        self.adjust_count(group_id, -self.group_counts[group_id])
+        button = self.group_buttons.pop(group_id)
+        self.groups_layout.removeWidget(button)
+        button.deleteLater()
+        del self.group_titles[group_id]
+        del self.group_counts[group_id]
+
+        # Select "All" group after deletion
+        all_button = self.group_buttons.get(-1)
+        if all_button:
+            all_button.setChecked(True)
+            self._handle_group_click(-1)
+
+    def selected_group(self):
+        """Return the id of the checked group button, or None"""
+        for group_id, button in self.group_buttons.items():
+            if button.isChecked():
+                return group_id
+        return None
 
     def load_groups(self):
         """Load groups from database"""
         if not self.db_path:
             return
+        self.jobs.read(Groups(self.db_path).get_groups, on_result=self._show_groups)
 
+    def _show_groups(self, groups):
         # Clear existing groups except "All"
         for gid, button in list(self.group_buttons.items()):
             if gid != -1:  # Don't remove "All" group
                 button.deleteLater()
                 del self.group_buttons[gid]
-
-        group_manager = Groups(self.db_path)
-        groups = group_manager.get_groups()
+                del self.group_titles[gid]
+                del self.group_counts[gid]
 
         # Update "All" group count
         total_count = sum(count for _, _, count in groups)
+        self.group_counts[-1] = total_count
         self.group_buttons[-1].setText(f"All ({total_count})")
 
         # Add groups with counts
@@ -264,9 +275,21 @@ class GroupSidebar(QFrame):
         button = GroupButton(text, count)
         button.clicked.connect(lambda: self.groupSelected.emit(group_id))
         self.group_buttons[group_id] = button
+        self.group_titles[group_id] = text
+        self.group_counts[group_id] = count
         self.groups_layout.addWidget(button)
         return button
 
+    def adjust_count(self, group_id, delta):
+        """Apply a credential count change to a group and to "All" """
+        if group_id is None or group_id not in self.group_counts or not delta:
+            return
+        for gid in (group_id, -1):
+            self.group_counts[gid] += delta
+            self.group_buttons[gid].setText(
+                f"{self.group_titles[gid]} ({self.group_counts[gid]})"
+            )
+
     def _handle_group_click(self, group_id):
         """Handle group selection"""
         for button in self.group_buttons.values():
@@ -283,16 +306,17 @@ class GroupSidebar(QFrame):
         """Refresh group counts"""
         if not self.db_path:
             return
-            
-        group_manager = Groups(self.db_path)
-        groups = group_manager.get_groups()
-        
+        self.jobs.read(Groups(self.db_path).get_groups, on_result=self._update_counts)
+
+    def _update_counts(self, groups):
         # Update counts in existing buttons
         total_count = 0
         for group_id, title, count in groups:
             total_count += count
             if group_id in self.group_buttons:
+                self.group_counts[group_id] = count
                 self.group_buttons[group_id].setText(f"{title} ({count})")
-                
+
         # Update "All" count
+        self.group_counts[-1] = total_count
         self.group_buttons[-1].setText(f"All ({total_count})")
@@ -0,0 +1,53 @@
+from PyQt6.QtWidgets import QWidget, QVBoxLayout, QLabel
+from PyQt6.QtGui import QColor
+from qfluentwidgets import ProgressBar
+from src.modules.strength import Estimator
+
+SCORE_LABELS = ("Very weak", "Weak", "Fair", "Strong", "Very strong")
+SCORE_COLORS = ("#d13438", "#ca5010", "#c19c00", "#498205", "#107c10")
+
+
+class StrengthMeter(QWidget):
+    def __init__(self, parent=None):
+        """
+        Strength bar and hint for a password being typed.
+
+        The estimator keeps its work between calls, so show_strength() can be
+        connected straight to textChanged.
+        """
+        super().__init__(parent)
+        self.estimator = Estimator()
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.setSpacing(4)
+
+        self.bar = ProgressBar()
+        self.bar.setRange(0, len(SCORE_LABELS))
+        self.bar.setValue(0)
+        layout.addWidget(self.bar)
+
+        self.label = QLabel()
+        self.label.setWordWrap(True)
+        self.label.setStyleSheet("color: #666666; font-size: 13px;")
+        layout.addWidget(self.label)
+
+    def set_user_words(self, words):
+        """Words from the credential that make a password weaker when it contains them"""
+        self.estimator.set_user_words(words)
+
+    def show_strength(self, password):
+        if not password:
+            self.bar.setValue(0)
+            self.label.clear()
+            return
+        result = self.estimator.estimate(password)
+        color = QColor(SCORE_COLORS[result.score])
+        self.bar.setCustomBarColor(color, color)
+        self.bar.setValue(result.score + 1)
+        text = SCORE_LABELS[result.score]
+        self.label.setText(f"{text}: {result.warning}" if result.warning else text)
+
+
+if __name__ == "__main__":
+    exit("Invalid entry point")
@@ -3,8 +3,6 @@ from PyQt6.QtWidgets import (
     QToolButton,
     QWidget,
     QHBoxLayout,
-    QLineEdit,
-    QSpacerItem,
 )
 from PyQt6.QtGui import QIcon
 from PyQt6.QtCore import Qt, QSize, pyqtSignal
@@ -65,10 +63,6 @@ class TopToolBar(QToolBar):
         self.generator_btn = self._create_tab_button("Generator", 1)
         self.settings_btn = self._create_tab_button("Settings", 2)
 
-        # Center section - Search
-        self.search_box = QLineEdit()
-        self.search_box.setPlaceholderText("Search credentials...")
-
         # Right section - Settings & Logout
         self.settings_btn = self._create_tab_button("Settings", 2)
         self.logout_btn = self._create_tool_button("Logout", "assets/logout.svg")
@@ -77,9 +71,7 @@ class TopToolBar(QToolBar):
         # Add to layout
         layout.addWidget(self.passwords_btn)
         layout.addWidget(self.generator_btn)
-        layout.addSpacerItem(QSpacerItem(20, 20))
-        layout.addWidget(self.search_box)
-        layout.addSpacerItem(QSpacerItem(20, 20))
+        layout.addStretch()
         layout.addWidget(self.settings_btn)
         layout.addWidget(self.logout_btn)
 
@@ -1,18 +1,192 @@
+import time
+import threading
 import sqlite3 as sql
 from contextlib import contextmanager
+from src.modules import storage, crypto
+
+_pools = {}
+_pools_lock = threading.Lock()
+# Seconds a storage profile switch waits for readers in use to be returned
+QUIESCE_TIMEOUT = 10
+
+
+def connect(database):
+    """Open a new connection to a user database
+
+    Args:
+        database (str): Path to SQLite database file
+
+    Returns:
+        sqlite3.Connection: Database connection object, configured with the
+        vault's storage profile
+    """
+    connection = sql.connect(database, check_same_thread=False, cached_statements=32)
+    storage.apply_profile(connection)
+    return connection
+
+
+class VaultPool:
+    def __init__(self, database, readers=4):
+        """
+        Session-scoped connections for a single user database.
+
+        Args:
+            database (str): Path to SQLite database file.
+            readers (int): Maximum number of reader connections.
+        """
+        self.database = database
+        self.size = max(1, readers)
+        self.writer = connect(database)
+        self.write_lock = threading.RLock()
+        self.idle = []
+        self.opened = 0
+        self.paused = False
+        self.closed = False
+        self._changed = threading.Condition()
+
+    def acquire_reader(self):
+        """Take an idle reader, opening a new one while under the pool size"""
+        with self._changed:
+            while self.paused or (not self.idle and self.opened >= self.size):
+                self._changed.wait()
+            if self.idle:
+                return self.idle.pop()
+            self.opened += 1
+        try:
+            return connect(self.database)
+        except Exception:
+            self._discard(1)
+            raise
+
+    def release_reader(self, connection):
+        """Return a reader to the pool, or close it if the pool is gone"""
+        with self._changed:
+            if not self.closed:
+                self.idle.append(connection)
+                self._changed.notify_all()
+                return
+        connection.close()
+        self._discard(1)
+
+    def _discard(self, count):
+        with self._changed:
+            self.opened -= count
+            self._changed.notify_all()
+
+    def _close_idle(self):
+        with self._changed:
+            idle, self.idle = self.idle, []
+        for connection in idle:
+            connection.close()
+        self._discard(len(idle))
+
+    def reconfigure(self, name, timeout=QUIESCE_TIMEOUT):
+        """
+        Switch every connection of the pool to a storage profile.
+
+        Writes wait for the switch, new reads wait for it as well and every
+        reader is closed first, so a page size change can rewrite the file.
+
+        Raises:
+            TimeoutError: If readers are still in use after timeout seconds
+        """
+        with self.write_lock:
+            with self._changed:
+                self.paused = True
+                deadline = time.monotonic() + timeout
+                while len(self.idle) < self.opened:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self.paused = False
+                        self._changed.notify_all()
+                        raise TimeoutError("The vault is busy, try again when searches, exports and checks have finished")
+                    self._changed.wait(remaining)
+            try:
+                self._close_idle()
+                storage.rebuild(self.writer, name)
+            finally:
+                with self._changed:
+                    self.paused = False
+                    self._changed.notify_all()
+
+    def close(self):
+        """Commit pending writes and close every connection"""
+        with self._changed:
+            self.closed = True
+        with self.write_lock:
+            self.writer.commit()
+            self.writer.close()
+        self._close_idle()
+
+
+def open_vault(database, readers=4):
+    """Open (or reuse) the session pool for a user database
+
+    Args:
+        database (str): Path to SQLite database file
+        readers (int): Maximum number of reader connections
+
+    Returns:
+        VaultPool: Pool serving all db_connect/db_read calls for the database
+    """
+    with _pools_lock:
+        pool = _pools.get(database)
+        if pool is None:
+            pool = VaultPool(database, readers)
+            _pools[database] = pool
+        return pool
+
+
+def close_vault(database):
+    """Tear down the session pool for a user database, if one is open, and drop its keys"""
+    crypto.forget(database)
+    with _pools_lock:
+        pool = _pools.pop(database, None)
+    if pool:
+        pool.close()
+
+
+def close_all():
+    """Tear down every open session pool and drop all keys"""
+    crypto.forget()
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.close()
+
+
+def get_pool(database):
+    """Return the open session pool for a database, or None"""
+    return _pools.get(database)
+
 
 @contextmanager
 def db_connect(database):
     """Reusable database connection context manager
-    
+
+    Uses the session writer connection when the vault is open, otherwise
+    falls back to a one-off connection.
+
     Args:
         database (str): Path to SQLite database file
-        
+
     Yields:
         sqlite3.Cursor: Database cursor object
     """
-    connection = sql.connect(database, check_same_thread=False, cached_statements=32)
-    cursor = connection.cursor() 
+    pool = _pools.get(database)
+    if pool is not None:
+        with pool.write_lock:
+            cursor = pool.writer.cursor()
+            try:
+                yield cursor
+            finally:
+                pool.writer.commit()
+                cursor.close()
+        return
+
+    connection = connect(database)
+    cursor = connection.cursor()
     try:
         yield cursor
     finally:
@@ -20,5 +194,41 @@ def db_connect(database):
         cursor.close()
         connection.close()
 
+
+@contextmanager
+def db_read(database):
+    """Read-only database connection context manager
+
+    Borrows a reader from the session pool when the vault is open, otherwise
+    falls back to a one-off connection.
+
+    Args:
+        database (str): Path to SQLite database file
+
+    Yields:
+        sqlite3.Cursor: Database cursor object
+    """
+    pool = _pools.get(database)
+    if pool is None:
+        connection = connect(database)
+        cursor = connection.cursor()
+        try:
+            yield cursor
+        finally:
+            cursor.close()
+            connection.close()
+        return
+
+    connection = pool.acquire_reader()
+    cursor = connection.cursor()
+    try:
+        yield cursor
+    finally:
+        cursor.close()
+        if connection.in_transaction:
+            connection.rollback()
+        pool.release_reader(connection)
+
+
 if __name__ == "__main__":
-    exit("Invalid entry point")
\ No newline at end of file
+    exit("Invalid entry point")
@@ -0,0 +1,216 @@
+import os
+import time
+import struct
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+
+KEY_SIZE = 32
+SALT_SIZE = 16
+NONCE_SIZE = 12
+
+# scrypt cost used when nothing has been calibrated
+DEFAULT_SCRYPT = {"n": 2**15, "r": 8, "p": 1}
+
+# Unlock time, in seconds, the scrypt cost of a vault is calibrated to
+KDF_TARGET = 0.5
+# Memory cap for calibration: 128 * r * n bytes, 256 MiB at r = 8
+KDF_MAX_N = 2**18
+KDF_MIN_N = 2**14
+
+# Unwrapped data keys of unlocked vaults: {db: {version: key}}
+_keys = {}
+_keys_lock = threading.Lock()
+
+# Sealed field: format byte and key version, then nonce + ciphertext
+FIELD_FORMAT = 1
+FIELD_HEADER = struct.Struct(">BI")
+
+# Batches smaller than this are processed on the calling thread
+PARALLEL_MIN = 512
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def new_salt():
+    """Return a random salt for key derivation"""
+    return os.urandom(SALT_SIZE)
+
+
+def derive_key(password, salt, n=DEFAULT_SCRYPT["n"], r=DEFAULT_SCRYPT["r"], p=DEFAULT_SCRYPT["p"]):
+    """Derive a 256-bit key from a password with scrypt
+
+    Args:
+        password (str): Password or passphrase
+        salt (bytes): Random salt
+        n (int): CPU/memory cost, a power of two
+        r (int): Block size
+        p (int): Parallelization
+
+    Returns:
+        bytes: Derived key
+    """
+    return hashlib.scrypt(
+        password.encode("utf-8"),
+        salt=salt,
+        n=n,
+        r=r,
+        p=p,
+        maxmem=256 * r * (n + p + 2),
+        dklen=KEY_SIZE,
+    )
+
+
+def calibrate(target=KDF_TARGET, r=DEFAULT_SCRYPT["r"]):
+    """Pick a scrypt cost that takes about target seconds on this machine
+
+    n is doubled while the measured cost stays within the target, up to
+    KDF_MAX_N. Beyond that p is raised, which costs time but no memory.
+
+    Returns:
+        dict: n, r and p for derive_key
+    """
+    def measure(n, p=1):
+        start = time.perf_counter()
+        derive_key("calibration", bytes(SALT_SIZE), n, r, p)
+        return max(time.perf_counter() - start, 1e-6)
+
+    # Double n while the doubled cost still fits the target
+    n = KDF_MIN_N
+    elapsed = measure(n)
+    while n * 2 <= KDF_MAX_N and elapsed * 2 <= target:
+        n *= 2
+        elapsed = measure(n)
+    p = max(1, int(target // elapsed))
+    return {"n": n, "r": r, "p": p}
+
+
+def new_key():
+    """Return a random data key"""
+    return os.urandom(KEY_SIZE)
+
+
+def remember(db, keys):
+    """Keep the data keys of an unlocked vault for this session
+
+    Args:
+        db (str): Database path
+        keys (dict): Key version to data key
+    """
+    with _keys_lock:
+        _keys[db] = dict(keys)
+
+
+def get_key(db, version=None):
+    """Return a data key of an unlocked vault, the newest if version is None
+
+    Raises:
+        KeyError: If the vault is locked or the version is unknown
+    """
+    with _keys_lock:
+        keys = _keys[db]
+        return keys[max(keys) if version is None else version]
+
+
+def get_keys(db):
+    """Return a copy of every data key of an unlocked vault
+
+    Raises:
+        KeyError: If the vault is locked
+    """
+    with _keys_lock:
+        return dict(_keys[db])
+
+
+def key_versions(db):
+    """Return the key versions held for a vault, empty if it is locked"""
+    with _keys_lock:
+        return sorted(_keys.get(db, ()))
+
+
+def forget(db=None):
+    """Drop the data keys of a vault, or of every vault if db is None"""
+    with _keys_lock:
+        if db is None:
+            _keys.clear()
+        else:
+            _keys.pop(db, None)
+
+
+def encrypt(key, plaintext, aad=None, nonce=None):
+    """Encrypt bytes with AES-256-GCM, returning nonce + ciphertext"""
+    nonce = nonce or os.urandom(NONCE_SIZE)
+    return nonce + AESGCM(key).encrypt(nonce, plaintext, aad)
+
+
+def decrypt(key, blob, aad=None):
+    """Decrypt a nonce + ciphertext blob produced by encrypt
+
+    Raises:
+        cryptography.exceptions.InvalidTag: If the key, data or aad do not match
+    """
+    return AESGCM(key).decrypt(blob[:NONCE_SIZE], blob[NONCE_SIZE:], aad)
+
+
+def seal(key, version, text, aad):
+    """Encrypt a text field, tagging it with the version of the key used
+
+    Args:
+        key (bytes): Data key
+        version (int): Version of the data key
+        text (str): Field value
+        aad (bytes): Associated data the field is bound to
+
+    Returns:
+        bytes: Header + nonce + ciphertext
+    """
+    header = FIELD_HEADER.pack(FIELD_FORMAT, version)
+    return header + encrypt(key, text.encode("utf-8"), aad + header)
+
+
+def sealed_version(value):
+    """Return the key version of a sealed field, None for a plaintext value"""
+    if isinstance(value, bytes) and len(value) > FIELD_HEADER.size + NONCE_SIZE and value[0] == FIELD_FORMAT:
+        return FIELD_HEADER.unpack_from(value)[1]
+    return None
+
+
+def unseal(key, value, aad):
+    """Decrypt a field produced by seal
+
+    Raises:
+        cryptography.exceptions.InvalidTag: If the key, field or aad do not match
+    """
+    header = value[: FIELD_HEADER.size]
+    return decrypt(key, value[FIELD_HEADER.size :], aad + header).decode("utf-8")
+
+
+def map_batch(func, items):
+    """Apply func to consecutive slices of items across a thread pool
+
+    Args:
+        func (callable): Takes a list of items and returns a list of results
+        items (list): Items to process
+
+    Returns:
+        list: Results in the order of items
+    """
+    workers = os.cpu_count() or 1
+    if workers == 1 or len(items) < PARALLEL_MIN:
+        return func(items)
+
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="crypto")
+    size = -(-len(items) // workers)
+    slices = [items[i : i + size] for i in range(0, len(items), size)]
+    results = []
+    for part in _executor.map(func, slices):
+        results.extend(part)
+    return results
+
+
+if __name__ == "__main__":
+    exit("Invalid entry point")
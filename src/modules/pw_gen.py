@@ -1,42 +1,269 @@
+import os
 import string
-import secrets
-import random
+from src.modules.wordlist import open_wordlist
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+SYMBOLS = "!@#$%^&*()_+-=[]{}|;:,.<>?"
+
+CHAR_CLASSES = {
+    "lower": string.ascii_lowercase,
+    "upper": string.ascii_uppercase,
+    "digits": string.digits,
+    "symbols": SYMBOLS,
+}
+
+# Characters easily mistaken for one another when read or typed
+AMBIGUOUS = "Il1|O0o"
+
+# Batches smaller than this are generated in pure Python even when NumPy is available
+NUMPY_MIN = 64
+
+
+class Policy:
+    def __init__(
+        self,
+        classes=tuple(CHAR_CLASSES),
+        min_counts=None,
+        exclude="",
+        avoid_ambiguous=False,
+        length=20,
+        mode="password",
+        words=6,
+        separator="-",
+        capitalize=False,
+        wordlist=None,
+    ):
+        """
+        Rules for generated passwords and passphrases.
+
+        Args:
+            classes: Names of the CHAR_CLASSES to draw from
+            min_counts: Minimum characters per class, one of each if omitted
+            exclude: Characters never used
+            avoid_ambiguous: Also exclude the AMBIGUOUS characters
+            length: Password length
+            mode: "password" or "passphrase"
+            words: Words per passphrase
+            separator: Text between passphrase words
+            capitalize: Capitalize every passphrase word
+            wordlist: Path of the passphrase wordlist
+        """
+        self.exclude = exclude
+        self.avoid_ambiguous = avoid_ambiguous
+        removed = set(exclude) | (set(AMBIGUOUS) if avoid_ambiguous else set())
+        self.classes = {name: "".join(c for c in CHAR_CLASSES[name] if c not in removed) for name in classes}
+        counts = min_counts if min_counts is not None else {name: 1 for name in self.classes}
+        self.min_counts = {name: count for name, count in counts.items() if name in self.classes}
+        self.length = length
+        self.mode = mode
+        self.words = words
+        self.separator = separator
+        self.capitalize = capitalize
+        self.wordlist = wordlist
+
+    def to_dict(self):
+        """Rules as plain values, for storing in the vault"""
+        return {
+            "classes": list(self.classes),
+            "min_counts": self.min_counts,
+            "exclude": self.exclude,
+            "avoid_ambiguous": self.avoid_ambiguous,
+            "length": self.length,
+            "mode": self.mode,
+            "words": self.words,
+            "separator": self.separator,
+            "capitalize": self.capitalize,
+            "wordlist": self.wordlist,
+        }
+
+    @classmethod
+    def from_dict(cls, rules):
+        """Inverse of to_dict, unknown keys are ignored"""
+        fields = cls().to_dict()
+        return cls(**{key: rules[key] for key in fields if key in rules})
+
+    def alphabet(self):
+        """All characters a password may contain"""
+        return "".join(dict.fromkeys("".join(self.classes.values())))
+
+    def slots(self, length):
+        """
+        Alphabet of each position before shuffling: the required characters
+        of every class first, then the full alphabet.
+
+        Raises:
+            ValueError: If length cannot hold the minimum counts, or a class
+            needed by the policy has no characters left after exclusions
+        """
+        for name, alphabet in self.classes.items():
+            if not alphabet and self.min_counts.get(name):
+                raise ValueError(f"Every {name} character is excluded")
+        if not self.alphabet() and length > 0:
+            raise ValueError("Every character is excluded")
+        required = [self.classes[name] for name, count in self.min_counts.items() for _ in range(count)]
+        if length < len(required):
+            raise ValueError(f"Length {length} is shorter than the {len(required)} required characters")
+        return required + [self.alphabet()] * (length - len(required))
+
+
+class Entropy:
+    def __init__(self, size=65536):
+        """Uniform integers from os.urandom, read in bulk and drawn by rejection sampling"""
+        self.size = size
+        self.buffer = b""
+        self.pos = 0
+
+    def _take(self, count):
+        if self.pos + count > len(self.buffer):
+            self.buffer = self.buffer[self.pos:] + os.urandom(max(self.size, count))
+            self.pos = 0
+        chunk = self.buffer[self.pos : self.pos + count]
+        self.pos += count
+        return chunk
+
+    def below(self, bound):
+        """Return an integer in [0, bound) without modulo bias"""
+        width = 1 if bound <= 1 << 8 else 2 if bound <= 1 << 16 else 4
+        space = 1 << (8 * width)
+        limit = space - space % bound
+        while True:
+            value = int.from_bytes(self._take(width), "big")
+            if value < limit:
+                return value % bound
+
+    def shuffle(self, items):
+        """Fisher-Yates shuffle in place"""
+        for i in range(len(items) - 1, 0, -1):
+            j = self.below(i + 1)
+            items[i], items[j] = items[j], items[i]
+
+
+def _np_below(bound, count):
+    """count integers in [0, bound) from os.urandom, by vectorized rejection sampling"""
+    dtype = np.uint8 if bound <= 1 << 8 else np.uint16 if bound <= 1 << 16 else np.uint32
+    space = 1 << (8 * np.dtype(dtype).itemsize)
+    limit = space - space % bound
+    out = np.empty(count, dtype=np.int64)
+    filled = 0
+    while filled < count:
+        need = count - filled
+        # Draw a little extra so one round is almost always enough
+        raw = np.frombuffer(os.urandom(np.dtype(dtype).itemsize * (need + need // 4 + 16)), dtype=dtype)
+        raw = raw[raw < limit][:need]
+        out[filled : filled + len(raw)] = raw % bound
+        filled += len(raw)
+    return out
+
+
+def _generate_numpy(n, slots):
+    length = len(slots)
+    codes = np.empty((n, length), dtype=np.uint32)
+    for column, alphabet in enumerate(slots):
+        table = np.frombuffer(alphabet.encode("utf-32-le"), dtype=np.uint32)
+        codes[:, column] = table[_np_below(len(table), n)]
+
+    # Fisher-Yates on every row at once
+    rows = np.arange(n)
+    for i in range(length - 1, 0, -1):
+        j = _np_below(i + 1, n)
+        swapped = codes[rows, j]
+        codes[rows, j] = codes[:, i]
+        codes[:, i] = swapped
+    return codes.view(f"<U{length}").ravel().tolist()
+
+
+def _generate_python(n, slots):
+    entropy = Entropy()
+    passwords = []
+    for _ in range(n):
+        chars = [alphabet[entropy.below(len(alphabet))] for alphabet in slots]
+        entropy.shuffle(chars)
+        passwords.append("".join(chars))
+    return passwords
+
+
+def generate_many(n: int, length: int = None, policy: Policy = None) -> list:
+    """Generate many passwords at once.
+
+    Entropy is read from os.urandom in bulk and mapped to characters by
+    rejection sampling, so every character of an alphabet is equally likely.
+    Each password is then shuffled with the same source. Uses NumPy when it
+    is installed.
+
+    Args:
+        n: Number of passwords
+        length: Length of each password, the policy length if omitted
+        policy: Character rules, every class with at least one character if omitted
+
+    Returns:
+        List of n password strings
+    """
+    policy = policy or Policy()
+    length = policy.length if length is None else length
+    slots = policy.slots(length)
+    if n <= 0 or length <= 0:
+        return [""] * max(n, 0)
+    if np is not None and n >= NUMPY_MIN:
+        return _generate_numpy(n, slots)
+    return _generate_python(n, slots)
+
+
+def generate_passphrases(n: int, policy: Policy) -> list:
+    """Generate diceware style passphrases from the policy's wordlist.
+
+    Words are drawn uniformly with the same rejection sampling as passwords
+    and read straight from the memory-mapped list.
+
+    Args:
+        n: Number of passphrases
+        policy: Passphrase rules, wordlist must be set
+
+    Returns:
+        List of n passphrase strings
+
+    Raises:
+        ValueError: If the policy has no usable wordlist
+    """
+    if not policy.wordlist:
+        raise ValueError("No wordlist selected")
+    words = open_wordlist(policy.wordlist)
+    if not len(words):
+        raise ValueError(f"No words in {policy.wordlist}")
+
+    entropy = Entropy()
+    phrases = []
+    for _ in range(n):
+        chosen = [words[entropy.below(len(words))] for _ in range(policy.words)]
+        if policy.capitalize:
+            chosen = [word.capitalize() for word in chosen]
+        phrases.append(policy.separator.join(chosen))
+    return phrases
+
+
+def generate(policy: Policy, n: int = 1) -> list:
+    """Generate n passwords or passphrases, following the policy's mode"""
+    if policy.mode == "passphrase":
+        return generate_passphrases(n, policy)
+    return generate_many(n, policy=policy)
+
 
 def generate_strong_password(length: int) -> str:
     """Generate a strong password with required character types.
-    
+
     Args:
         length: Desired password length (minimum 8)
-        
+
     Returns:
         Generated password string with at least one of each char type
     """
     # Ensure minimum length
     if length < 8:
         length = 8
-        
-    # Required characters
-    required_chars = [
-        secrets.choice(string.ascii_lowercase),
-        secrets.choice(string.ascii_uppercase),
-        secrets.choice(string.digits),
-        secrets.choice("!@#$%^&*()_+-=[]{}|;:,.<>?")
-    ]
-    
-    # Character pool for remaining chars
-    char_pool = (string.ascii_lowercase + 
-                 string.ascii_uppercase + 
-                 string.digits + 
-                 "!@#$%^&*()_+-=[]{}|;:,.<>?")
-    
-    # Generate remaining characters
-    remaining_length = length - len(required_chars)
-    password_chars = required_chars + [secrets.choice(char_pool) 
-                                     for _ in range(remaining_length)]
-    
-    # Shuffle password
-    random.shuffle(password_chars)
-    return ''.join(password_chars)
+    return generate_many(1, length)[0]
 
 if __name__ == "__main__":
-    exit("Invalid entry point")
\ No newline at end of file
+    exit("Invalid entry point")
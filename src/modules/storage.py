@@ -0,0 +1,125 @@
+import sqlite3 as sql
+
+DEFAULT_PROFILE = "balanced"
+
+# Named storage presets, selectable per vault
+PROFILES = {
+    "durable": {
+        "journal_mode": "WAL",
+        "synchronous": "FULL",
+        "cache_size": -8000,
+        "mmap_size": 0,
+        "page_size": 4096,
+        "temp_store": "DEFAULT",
+    },
+    "balanced": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "cache_size": -16000,
+        "mmap_size": 64 * 1024 * 1024,
+        "page_size": 4096,
+        "temp_store": "MEMORY",
+    },
+    "fast": {
+        "journal_mode": "WAL",
+        "synchronous": "OFF",
+        "cache_size": -65536,
+        "mmap_size": 256 * 1024 * 1024,
+        "page_size": 8192,
+        "temp_store": "MEMORY",
+    },
+}
+
+DESCRIPTIONS = {
+    "durable": "Every commit is synced to disk. Safest, slowest writes.",
+    "balanced": "Write-ahead log with periodic syncs. Recommended.",
+    "fast": "No syncs and large caches. A power loss may lose recent changes.",
+}
+
+
+def get_settings(name):
+    """Return the pragma values of a named profile
+
+    Args:
+        name (str): Profile name, falls back to the default if unknown
+
+    Returns:
+        dict: Pragma name to value
+    """
+    return PROFILES.get(name, PROFILES[DEFAULT_PROFILE])
+
+
+def read_profile(connection):
+    """Read the profile name stored in a vault's settings table"""
+    try:
+        row = connection.execute(
+            "SELECT value FROM settings WHERE key = 'storage_profile'"
+        ).fetchone()
+    except sql.OperationalError:
+        return DEFAULT_PROFILE
+    return row[0] if row and row[0] in PROFILES else DEFAULT_PROFILE
+
+
+def apply_profile(connection, name=None):
+    """Apply a profile's pragmas to an open connection
+
+    journal_mode is persistent in the database file, the others only last for
+    the lifetime of the connection, so this runs on every new connection.
+    journal_mode is left alone on an empty database so that init_profile can
+    still set its page size.
+
+    Args:
+        connection (sqlite3.Connection): Connection to configure
+        name (str): Profile name, read from the vault when omitted
+    """
+    settings = get_settings(name or read_profile(connection))
+    if connection.execute("PRAGMA page_count").fetchone()[0]:
+        connection.execute(f"PRAGMA journal_mode = {settings['journal_mode']}")
+    connection.execute(f"PRAGMA synchronous = {settings['synchronous']}")
+    connection.execute(f"PRAGMA cache_size = {int(settings['cache_size'])}")
+    connection.execute(f"PRAGMA mmap_size = {int(settings['mmap_size'])}")
+    connection.execute(f"PRAGMA temp_store = {settings['temp_store']}")
+
+
+def init_profile(connection, name):
+    """Set up a freshly created, still empty database for a profile"""
+    settings = get_settings(name)
+    connection.execute(f"PRAGMA page_size = {int(settings['page_size'])}")
+    connection.execute(f"PRAGMA journal_mode = {settings['journal_mode']}")
+    apply_profile(connection, name)
+
+
+def rebuild(connection, name):
+    """Switch an existing database to a profile, rewriting it if the page size differs
+
+    The profile is stored in the vault once the switch has succeeded, before
+    the caller lets other connections open. The caller must ensure no other
+    connection is using the database. If the rewrite fails the connection is
+    put back on the profile stored in the vault.
+
+    Raises:
+        TimeoutError: If another connection keeps the database locked
+    """
+    settings = get_settings(name)
+    page_size = connection.execute("PRAGMA page_size").fetchone()[0]
+    if page_size != settings["page_size"]:
+        connection.commit()
+        try:
+            connection.execute("PRAGMA journal_mode = DELETE")
+            connection.execute(f"PRAGMA page_size = {int(settings['page_size'])}")
+            connection.execute("VACUUM")
+        except sql.Error as e:
+            if connection.in_transaction:
+                connection.rollback()
+            connection.execute(f"PRAGMA page_size = {page_size}")
+            apply_profile(connection)
+            if getattr(e, "sqlite_errorcode", None) == sql.SQLITE_BUSY:
+                raise TimeoutError("The vault is in use by another program, close it and try again") from e
+            raise
+    connection.execute("INSERT OR REPLACE INTO settings (key, value) VALUES ('storage_profile', ?)", (name,))
+    connection.commit()
+    apply_profile(connection, name)
+
+
+if __name__ == "__main__":
+    exit("Invalid entry point")
@@ -0,0 +1,455 @@
+import os
+import mmap
+import math
+import time
+import array
+import struct
+import threading
+from collections import OrderedDict, namedtuple
+from itertools import product
+
+# Frequency-ordered word lists, one per .txt file, most common first
+DICTIONARY_DIR = os.path.join("assets", "dictionaries")
+RANK_MAGIC = b"KRYPTRK1"
+# Magic, size and modification time of the source list
+RANK_STAMP = struct.Struct("=8sQQ")
+# Word count and longest word, followed by the offsets, ranks and words in sorted order
+RANK_COUNTS = struct.Struct("=II")
+RANK_SUFFIX = ".rank"
+# Word lists whose matches are reported as names
+NAME_DICTIONARIES = ("surnames", "female_names", "male_names")
+
+BRUTEFORCE_CARDINALITY = 10
+MIN_GUESSES_SINGLE_CHAR = 10
+MIN_GUESSES_MULTI_CHAR = 50
+# Penalty added per match, so fewer and longer matches win ties, as log10
+MATCH_PENALTY = 4
+# Characters past this are scored at the average rate of the ones before them
+MAX_LENGTH = 128
+REFERENCE_YEAR = time.localtime().tm_year
+# Score is the number of these log10 guess counts a password is above
+SCORE_THRESHOLDS = (3, 6, 8, 10)
+
+L33T = {
+    "4": "a", "@": "a", "8": "b", "(": "c", "{": "c", "3": "e", "6": "g", "9": "g",
+    "1": "il", "!": "i", "|": "il", "0": "o", "$": "s", "5": "s", "7": "lt", "+": "t", "2": "z",
+}
+# Substitution combinations tried per token
+MAX_L33T_VARIANTS = 8
+
+KEYBOARD_ROWS = ("`1234567890-=", "qwertyuiop[]\\", "asdfghjkl;'", "zxcvbnm,./")
+SHIFTED_ROWS = ("~!@#$%^&*()_+", "QWERTYUIOP{}|", 'ASDFGHJKL:"', "ZXCVBNM<>?")
+# Column of each row's first key under the row above
+ROW_OFFSETS = (0, 1, 0, 0)
+
+Match = namedtuple("Match", "i j pattern token guesses detail")
+Strength = namedtuple("Strength", "score guesses_log10 warning sequence")
+
+
+def _keyboard():
+    """Adjacency of the unshifted qwerty keys and the unshifted key of every shifted one"""
+    positions = {key: (r, c) for r, row in enumerate(KEYBOARD_ROWS) for c, key in enumerate(row)}
+    keys = {pos: key for key, pos in positions.items()}
+    graph = {key: {} for key in positions}
+    for key, (r, c) in positions.items():
+        neighbours = [(r, c - 1), (r, c + 1)]
+        if r > 0:
+            neighbours += [(r - 1, c + ROW_OFFSETS[r]), (r - 1, c + ROW_OFFSETS[r] + 1)]
+        if r + 1 < len(KEYBOARD_ROWS):
+            neighbours += [(r + 1, c - ROW_OFFSETS[r + 1]), (r + 1, c - ROW_OFFSETS[r + 1] - 1)]
+        for pos in neighbours:
+            if pos in keys:
+                graph[key][keys[pos]] = (pos[0] - r, pos[1] - c)
+    unshift = {s: k for shifted, row in zip(SHIFTED_ROWS, KEYBOARD_ROWS) for s, k in zip(shifted, row)}
+    return graph, unshift
+
+
+KEYBOARD, UNSHIFT = _keyboard()
+KEYBOARD_DEGREE = sum(len(n) for n in KEYBOARD.values()) / len(KEYBOARD)
+
+
+class RankIndex:
+    def __init__(self, path):
+        """
+        Frequency rank lookup for one word list, backed by mmap.
+
+        The list is compiled once into a sorted index next to it (in memory
+        if that is not writable) and searched by bisection, so opening it
+        costs two system calls and no Python objects per word.
+
+        Args:
+            path: Word list, most common word first
+        """
+        self.path = path
+        self.name = os.path.splitext(os.path.basename(path))[0]
+        self._map = None
+        data = self._load()
+        self.count, self.max_len = RANK_COUNTS.unpack_from(data, RANK_STAMP.size)
+        view = memoryview(data)
+        start = RANK_STAMP.size + RANK_COUNTS.size
+        self.offsets = view[start : start + 4 * (self.count + 1)].cast("I")
+        start += 4 * (self.count + 1)
+        self.ranks = view[start : start + 4 * self.count].cast("I")
+        self.words = start + 4 * self.count
+        self.data = data
+
+    def _stamp(self):
+        stat = os.stat(self.path)
+        return RANK_STAMP.pack(RANK_MAGIC, stat.st_size, stat.st_mtime_ns)
+
+    def _compile(self):
+        ranks = {}
+        with open(self.path, encoding="utf-8", errors="ignore") as f:
+            for line in f:
+                word = line.strip().lower()
+                if word and word not in ranks:
+                    ranks[word] = len(ranks) + 1
+        entries = sorted((word.encode("utf-8"), rank) for word, rank in ranks.items())
+        offsets = array.array("I", [0])
+        for word, _ in entries:
+            offsets.append(offsets[-1] + len(word))
+        header = self._stamp() + RANK_COUNTS.pack(len(entries), max((len(w) for w in ranks), default=0))
+        return b"".join(
+            [header, offsets.tobytes(), array.array("I", [r for _, r in entries]).tobytes()]
+            + [word for word, _ in entries]
+        )
+
+    def _load(self):
+        stamp = self._stamp()
+        index_path = self.path + RANK_SUFFIX
+        try:
+            with open(index_path, "rb") as f:
+                if f.read(RANK_STAMP.size) == stamp:
+                    self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                    return self._map
+        except (OSError, ValueError):
+            pass
+
+        data = self._compile()
+        try:
+            with open(index_path, "wb") as f:
+                f.write(data)
+        except OSError:
+            pass
+        return data
+
+    def rank(self, word):
+        """Frequency rank of a lowercase word, 1 for the most common, None if absent"""
+        key = word.encode("utf-8")
+        lo, hi = 0, self.count
+        offsets, base, data = self.offsets, self.words, self.data
+        while lo < hi:
+            mid = (lo + hi) // 2
+            found = data[base + offsets[mid] : base + offsets[mid + 1]]
+            if found < key:
+                lo = mid + 1
+            elif found > key:
+                hi = mid
+            else:
+                return self.ranks[mid]
+        return None
+
+
+_dictionaries = {}
+_dictionaries_lock = threading.Lock()
+
+
+def open_dictionaries(directory=DICTIONARY_DIR):
+    """Return the shared RankIndex of every word list in a directory, reopened when one changes"""
+    try:
+        names = sorted(n for n in os.listdir(directory) if n.endswith(".txt"))
+    except OSError:
+        return []
+    paths = [os.path.join(directory, n) for n in names]
+    key = tuple((p, os.stat(p).st_mtime_ns) for p in paths)
+    with _dictionaries_lock:
+        cached = _dictionaries.get(directory)
+        if cached is None or cached[0] != key:
+            cached = (key, [RankIndex(p) for p in paths])
+            _dictionaries[directory] = cached
+        return cached[1]
+
+
+def _case_variations(token):
+    """Guess multiplier for the capitalization of a dictionary word"""
+    upper = sum(c.isupper() for c in token)
+    lower = sum(c.islower() for c in token)
+    if not upper or token.islower():
+        return 1
+    if not lower or (upper == 1 and (token[0].isupper() or token[-1].isupper())):
+        return 2
+    return sum(math.comb(upper + lower, i) for i in range(1, min(upper, lower) + 1))
+
+
+def _l33t_variations(token, word):
+    """Guess multiplier for the substituted characters of a dictionary word"""
+    variations = 1
+    for letter in set(word):
+        subbed = sum(1 for t, w in zip(token.lower(), word) if w == letter and t != w)
+        if not subbed:
+            continue
+        plain = sum(1 for t, w in zip(token.lower(), word) if w == letter and t == w)
+        variations *= max(sum(math.comb(subbed + plain, i) for i in range(1, min(subbed, plain) + 1)), 2)
+    return variations
+
+
+def _unsubstituted(token):
+    """Spellings of a token with its l33t characters replaced by letters"""
+    options = [L33T.get(c, c) for c in token]
+    if all(len(o) == 1 and o == c for o, c in zip(options, token)):
+        return []
+    variants = []
+    for chars in product(*options):
+        variants.append("".join(chars))
+        if len(variants) == MAX_L33T_VARIANTS:
+            break
+    return variants
+
+
+def _walk_guesses(length, turns, shifted):
+    starts = len(KEYBOARD)
+    guesses = 0
+    for i in range(2, length + 1):
+        for j in range(1, min(turns, i - 1) + 1):
+            guesses += math.comb(i - 1, j - 1) * starts * KEYBOARD_DEGREE**j
+    unshifted = length - shifted
+    if shifted and unshifted:
+        guesses *= sum(math.comb(length, i) for i in range(1, min(shifted, unshifted) + 1))
+    elif shifted:
+        guesses *= 2
+    return guesses
+
+
+def _char_class(c):
+    return "lower" if c.islower() else "upper" if c.isupper() else "digit" if c.isdigit() else None
+
+
+def _log_add(a, b):
+    """log10(10**a + 10**b) without leaving log space"""
+    high, low = max(a, b), min(a, b)
+    return high + math.log10(1 + 10 ** (low - high))
+
+
+class Estimator:
+    def __init__(self, directory=DICTIONARY_DIR, user_words=()):
+        """
+        zxcvbn style password strength estimation, one keystroke at a time.
+
+        A password is split into the sequence of dictionary words, keyboard
+        walks, repeats, sequences, years and brute-forced characters that
+        needs the fewest guesses. Matches and the optimal sequence are kept
+        per end position, so after an edit only positions past the unchanged
+        prefix are redone, and dictionary lookups are cached across calls.
+        Dictionaries are opened on the first estimate, not before.
+
+        Args:
+            directory: Directory of frequency-ordered word lists
+            user_words: Words to rank first, such as the credential's title and username
+        """
+        self.directory = directory
+        self.dictionaries = None
+        self.user_words = {}
+        self.max_len = 0
+        self._lookups = OrderedDict()
+        self._password = ""
+        self._matches = []
+        self._optimal = []
+        self.set_user_words(user_words)
+
+    def set_user_words(self, words):
+        """Replace the user words, starting the next estimate from scratch"""
+        ranks = {}
+        for word in words:
+            word = (word or "").strip().lower()
+            if len(word) > 2 and word not in ranks:
+                ranks[word] = len(ranks) + 1
+        self.user_words = ranks
+        self._lookups.clear()
+        self._password = ""
+        self._matches = []
+        self._optimal = []
+
+    def _open(self):
+        if self.dictionaries is None:
+            self.dictionaries = open_dictionaries(self.directory)
+            self.max_len = max([d.max_len for d in self.dictionaries] + [len(w) for w in self.user_words])
+
+    def _lookup(self, word):
+        """Best (rank, dictionary name) of a lowercase word, cached"""
+        found = self._lookups.get(word)
+        if found is not None or word in self._lookups:
+            self._lookups.move_to_end(word)
+            return found
+        found = None
+        rank = self.user_words.get(word)
+        if rank:
+            found = (rank, "user")
+        for dictionary in self.dictionaries:
+            rank = dictionary.rank(word)
+            if rank and (found is None or rank < found[0]):
+                found = (rank, dictionary.name)
+        self._lookups[word] = found
+        if len(self._lookups) > 4096:
+            self._lookups.popitem(last=False)
+        return found
+
+    def _dictionary_matches(self, password, j):
+        matches = []
+        for i in range(max(0, j - self.max_len + 1), j + 1):
+            token = password[i : j + 1]
+            if len(token) < 2:
+                continue
+            lower = token.lower()
+            found = self._lookup(lower)
+            if found:
+                guesses = found[0] * _case_variations(token)
+                matches.append(Match(i, j, "dictionary", token, guesses, found[1]))
+                continue
+            for word in _unsubstituted(lower):
+                found = self._lookup(word)
+                if found:
+                    guesses = found[0] * _case_variations(token) * _l33t_variations(token, word)
+                    matches.append(Match(i, j, "l33t", token, guesses, found[1]))
+                    break
+        return matches
+
+    def _pattern_matches(self, password, j):
+        """Longest walk, repeat and sequence ending at j, and a year"""
+        matches = []
+        c = password[j]
+
+        i = j
+        while i > 0 and password[i - 1] == c:
+            i -= 1
+        if j - i >= 2:
+            matches.append(Match(i, j, "repeat", password[i : j + 1], BRUTEFORCE_CARDINALITY * (j - i + 1), None))
+
+        i, delta, kind = j, None, _char_class(c)
+        while i > 0 and kind is not None and _char_class(password[i - 1]) == kind:
+            step = ord(password[i]) - ord(password[i - 1])
+            if step == 0 or abs(step) > 5 or (delta is not None and step != delta):
+                break
+            delta = step
+            i -= 1
+        if j - i >= 2:
+            first = password[i]
+            base = 4 if first in "aAzZ019" else 10 if first.isdigit() else 26
+            guesses = base * (j - i + 1) * (2 if delta < 0 else 1)
+            matches.append(Match(i, j, "sequence", password[i : j + 1], guesses, None))
+
+        i, direction, turns = j, None, 0
+        while i > 0:
+            prev, key = UNSHIFT.get(password[i - 1], password[i - 1]), UNSHIFT.get(password[i], password[i])
+            step = KEYBOARD.get(prev, {}).get(key)
+            if step is None:
+                break
+            if step != direction:
+                turns += 1
+                direction = step
+            i -= 1
+        if j - i >= 2:
+            token = password[i : j + 1]
+            shifted = sum(ch in UNSHIFT for ch in token)
+            matches.append(Match(i, j, "spatial", token, _walk_guesses(len(token), turns, shifted), None))
+
+        if j >= 3 and password[j - 3 : j + 1].isdigit() and password[j - 3 : j - 1] in ("19", "20"):
+            year = int(password[j - 3 : j + 1])
+            matches.append(Match(j - 3, j, "year", password[j - 3 : j + 1], max(abs(year - REFERENCE_YEAR), 20), None))
+        return matches
+
+    def _update(self, optimal, length, match, guesses, prev):
+        """Keep a sequence of length matches, with guesses as log10, unless a shorter one scores better"""
+        score = _log_add(math.lgamma(length + 1) / math.log(10) + guesses, MATCH_PENALTY * (length - 1))
+        for other, entry in optimal.items():
+            if other <= length and entry[0] <= score:
+                return
+        optimal[length] = (score, guesses, match, prev)
+
+    def _extend(self, password, j):
+        """Matches and optimal sequences of every length ending at j"""
+        matches = self._dictionary_matches(password, j) + self._pattern_matches(password, j)
+        optimal = {}
+        for m in matches:
+            guesses = math.log10(max(m.guesses, MIN_GUESSES_MULTI_CHAR))
+            if m.i == 0:
+                self._update(optimal, 1, m, guesses, None)
+            else:
+                for length, entry in self._optimal[m.i - 1].items():
+                    self._update(optimal, length + 1, m, entry[1] + guesses, length)
+        # Brute force from the start, or after an optimal sequence not ending in brute force
+        per_char = math.log10(BRUTEFORCE_CARDINALITY)
+        bruteforce = Match(0, j, "bruteforce", password[: j + 1], None, None)
+        self._update(optimal, 1, bruteforce, per_char * (j + 1), None)
+        for i in range(1, j + 1):
+            guesses = max(per_char * (j - i + 1), math.log10(MIN_GUESSES_SINGLE_CHAR))
+            for length, entry in self._optimal[i - 1].items():
+                if entry[2].pattern != "bruteforce":
+                    bruteforce = Match(i, j, "bruteforce", password[i : j + 1], None, None)
+                    self._update(optimal, length + 1, bruteforce, entry[1] + guesses, length)
+        self._matches.append(matches)
+        self._optimal.append(optimal)
+
+    def estimate(self, password):
+        """
+        Estimate how many guesses a password takes.
+
+        Returns:
+            Strength: score from 0 (too guessable) to 4, log10 of the
+            guesses, a warning for the weakest part or None, and the optimal
+            match sequence.
+        """
+        self._open()
+        scored = password[:MAX_LENGTH]
+        prefix = 0
+        for a, b in zip(scored, self._password):
+            if a != b:
+                break
+            prefix += 1
+        del self._matches[prefix:]
+        del self._optimal[prefix:]
+        self._password = scored
+        for j in range(prefix, len(scored)):
+            self._extend(scored, j)
+
+        if not scored:
+            return Strength(0, 0.0, None, [])
+        length = min(self._optimal[-1], key=lambda l: self._optimal[-1][l][0])
+        guesses = self._optimal[-1][length][0]
+        # A long tail is as guessable as the analysed part, "x" * 200 is no stronger per character than "x" * 128
+        guesses *= len(password) / len(scored)
+
+        sequence, j = [], len(scored) - 1
+        while j >= 0:
+            _, _, match, prev = self._optimal[j][length]
+            sequence.append(match)
+            j, length = match.i - 1, prev
+        sequence.reverse()
+
+        score = sum(guesses > t for t in SCORE_THRESHOLDS)
+        return Strength(score, guesses, _warning(sequence) if score < 3 else None, sequence)
+
+
+def _warning(sequence):
+    patterns = {m.pattern: m for m in sequence}
+    if "dictionary" in patterns or "l33t" in patterns:
+        m = patterns.get("dictionary") or patterns["l33t"]
+        if m.detail == "user":
+            return "Contains the title, username or URL"
+        if m.detail == "passwords":
+            return "Contains a common password"
+        if m.detail in NAME_DICTIONARIES:
+            return "Names and surnames are easy to guess"
+        return "Contains a common word"
+    if "spatial" in patterns:
+        return "Keyboard patterns are easy to guess"
+    if "repeat" in patterns:
+        return "Repeated characters are easy to guess"
+    if "sequence" in patterns:
+        return "Sequences like abc or 6543 are easy to guess"
+    if "year" in patterns:
+        return "Recent years are easy to guess"
+    return "Add more characters"
+
+
+if __name__ == "__main__":
+    exit("Invalid entry point")
@@ -0,0 +1,99 @@
+import os
+import mmap
+import array
+import struct
+import threading
+
+INDEX_MAGIC = b"KRYPTWL1"
+# Magic, size and modification time of the wordlist the index was built from
+INDEX_HEADER = struct.Struct("=8sQQ")
+INDEX_SUFFIX = ".idx"
+
+_open = {}
+_open_lock = threading.Lock()
+
+
+class Wordlist:
+    def __init__(self, path):
+        """
+        Read-only wordlist backed by mmap.
+
+        A line offset index is built on first use and cached next to the list
+        (in memory if that is not writable), so opening a list of any size only
+        maps two files and words become Python objects only when drawn.
+        Lines may be plain words or diceware style "11111<TAB>word".
+
+        Args:
+            path: Wordlist file, one word per line
+        """
+        self.path = path
+        with open(path, "rb") as f:
+            self._data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if os.fstat(f.fileno()).st_size else b""
+        self._index_map = None
+        self.offsets = self._load_index()
+
+    def _stamp(self):
+        stat = os.stat(self.path)
+        return INDEX_HEADER.pack(INDEX_MAGIC, stat.st_size, stat.st_mtime_ns)
+
+    def _build_offsets(self):
+        """Start and end offset of every non-empty line, as consecutive pairs"""
+        offsets = array.array("I")
+        data = self._data
+        size = len(data)
+        pos = 0
+        while pos < size:
+            end = data.find(b"\n", pos)
+            if end < 0:
+                end = size
+            if data[pos:end].strip():
+                offsets.append(pos)
+                offsets.append(end)
+            pos = end + 1
+        return offsets
+
+    def _load_index(self):
+        stamp = self._stamp()
+        index_path = self.path + INDEX_SUFFIX
+        try:
+            with open(index_path, "rb") as f:
+                if f.read(INDEX_HEADER.size) == stamp:
+                    self._index_map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                    return memoryview(self._index_map)[INDEX_HEADER.size :].cast("I")
+        except (OSError, ValueError):
+            pass
+
+        offsets = self._build_offsets()
+        try:
+            with open(index_path, "wb") as f:
+                f.write(stamp)
+                offsets.tofile(f)
+        except OSError:
+            pass
+        return memoryview(offsets.tobytes()).cast("I")
+
+    def __len__(self):
+        return len(self.offsets) // 2
+
+    def __getitem__(self, i):
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+        line = self._data[self.offsets[2 * i] : self.offsets[2 * i + 1]]
+        return line.split()[-1].decode("utf-8")
+
+
+def open_wordlist(path):
+    """Return a shared Wordlist for a path, reopened when the file changes"""
+    stat = os.stat(path)
+    key = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+    with _open_lock:
+        wordlist = _open.get(key[0])
+        if wordlist is None or wordlist.key != key:
+            wordlist = Wordlist(path)
+            wordlist.key = key
+            _open[key[0]] = wordlist
+        return wordlist
+
+
+if __name__ == "__main__":
+    exit("Invalid entry point")
@@ -0,0 +1,94 @@
+import os
+import sqlite3
+import sys
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.backend.auth import User
+from src.modules import crypto
+from src.modules.contextmanager import close_vault, open_vault
+
+PASSWORD = "correct master password"
+
+# Schema of a vault created before migrations existed, with its plaintext password
+BASELINE_SCHEMA = """
+CREATE TABLE user (pwd TEXT NOT NULL);
+CREATE TABLE groups (
+    group_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    title TEXT UNIQUE
+);
+CREATE TABLE credentials (
+    cred_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    title TEXT UNIQUE,
+    username TEXT NOT NULL,
+    password TEXT NOT NULL,
+    url TEXT DEFAULT 'None',
+    notes TEXT DEFAULT 'None',
+    group_id INTEGER,
+    FOREIGN KEY (group_id) REFERENCES groups(group_id)
+);
+CREATE TABLE auditlog (
+    log_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    action_type TEXT DEFAULT 'None',
+    action_time TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    details TEXT DEFAULT 'None'
+);
+CREATE TRIGGER after_cred_insert AFTER INSERT ON credentials
+BEGIN
+    INSERT INTO auditlog (action_type, action_time, details)
+    VALUES ('INSERT', DATETIME('now'), 'Inserted credential: ' || NEW.title);
+END;
+CREATE TRIGGER after_cred_update AFTER UPDATE ON credentials
+BEGIN
+    INSERT INTO auditlog (action_type, action_time, details)
+    VALUES ('UPDATE', DATETIME('now'), 'Updated credential: ' || OLD.title);
+END;
+CREATE TRIGGER after_group_insert AFTER INSERT ON groups
+BEGIN
+    INSERT INTO auditlog (action_type, action_time, details)
+    VALUES ('INSERT', DATETIME('now'), 'Inserted group: ' || NEW.title);
+END;
+"""
+
+
+@pytest.fixture(autouse=True)
+def fast_kdf(monkeypatch):
+    """Skip scrypt calibration, which is tuned to take half a second per derivation"""
+    monkeypatch.setattr(crypto, "calibrate", lambda *args, **kwargs: {"n": 2**14, "r": 8, "p": 1})
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "vault.db")
+
+
+@pytest.fixture
+def vault(db_path):
+    """A new, unlocked vault with its session pool open"""
+    assert User(db_path, "alice", PASSWORD).create(PASSWORD)
+    assert User(db_path, "alice", PASSWORD).login()
+    open_vault(db_path)
+    yield db_path
+    close_vault(db_path)
+
+
+@pytest.fixture
+def baseline_vault(db_path):
+    """A vault in the original schema, holding two groups and three plaintext credentials"""
+    connection = sqlite3.connect(db_path)
+    connection.executescript(BASELINE_SCHEMA)
+    connection.execute("INSERT INTO user (pwd) VALUES (?)", (PASSWORD,))
+    connection.executemany("INSERT INTO groups (title) VALUES (?)", [("work",), ("home",)])
+    connection.executemany(
+        "INSERT INTO credentials (title, username, password, url, notes, group_id) VALUES (?, ?, ?, ?, ?, ?)",
+        [
+            ("mail", "alice", "hunter2", "mail.example", "old note", 1),
+            ("bank", "alice", "s3cret", "bank.example", "None", 1),
+            ("forum", "al", "pa55", "None", "None", None),
+        ],
+    )
+    connection.commit()
+    connection.close()
+    yield db_path
+    close_vault(db_path)
@@ -0,0 +1,100 @@
+import pytest
+from cryptography.exceptions import InvalidTag
+from src.backend.auth import User
+from src.backend.rekey import Rekey
+from src.backend.user import Credentials, open_fields, seal_fields
+from src.modules import crypto
+from src.modules.contextmanager import db_connect, db_read
+from conftest import PASSWORD
+
+
+def _versions(db):
+    with db_read(db) as cur:
+        cur.execute("SELECT password, notes FROM credentials ORDER BY cred_id")
+        return {crypto.sealed_version(value) for row in cur.fetchall() for value in row}
+
+
+def _audit_count(db):
+    with db_read(db) as cur:
+        cur.execute("SELECT COUNT(*) FROM auditlog")
+        return cur.fetchone()[0]
+
+
+def test_seal_round_trip(vault):
+    items = [(1, "password", "hunter2"), (1, "notes", None), (2, "notes", "ünïcode ✓")]
+    sealed = seal_fields(vault, items)
+    assert sealed[1] is None
+    assert crypto.sealed_version(sealed[0]) == 1
+    assert open_fields(vault, [(cred_id, column, value) for (cred_id, column, _), value in zip(items, sealed)]) == [
+        "hunter2",
+        None,
+        "ünïcode ✓",
+    ]
+    # Plaintext from before encryption passes through
+    assert open_fields(vault, [(3, "password", "legacy")]) == ["legacy"]
+
+
+def test_sealed_field_is_bound_to_its_row(vault):
+    (sealed,) = seal_fields(vault, [(1, "password", "hunter2")])
+    with pytest.raises(InvalidTag):
+        open_fields(vault, [(2, "password", sealed)])
+    with pytest.raises(InvalidTag):
+        open_fields(vault, [(1, "notes", sealed)])
+
+
+def test_rekey_resumes_after_cancel(vault):
+    creds = Credentials(vault)
+    ids = [creds.add_cred(f"site{i}", "me", f"pw{i}", "url", f"note{i}", None) for i in range(25)]
+    assert User(vault, "alice", PASSWORD).change_password(PASSWORD, "new password")
+    assert Rekey(vault).pending() == (2, 0)
+    audited = _audit_count(vault)
+
+    chunks = []
+    result = Rekey(vault, chunk_size=10).run(progress=lambda done, total: chunks.append(done), cancelled=lambda: bool(chunks))
+    assert result == {"fields": 20, "done": False}
+    assert Rekey(vault).pending() == (2, ids[9])
+    assert _versions(vault) == {1, 2}
+
+    assert Rekey(vault, chunk_size=10).run() == {"fields": 30, "done": True}
+    assert Rekey(vault).pending() is None
+    assert _versions(vault) == {2}
+    assert crypto.key_versions(vault) == [2]
+    assert creds.get_details(ids[17]) == ("site17", "me", "pw17", "url", "note17", None)
+    # Re-encryption is not an edit
+    assert _audit_count(vault) == audited
+
+
+def test_rekey_restarts_for_rows_written_behind_checkpoint(vault):
+    creds = Credentials(vault)
+    ids = [creds.add_cred(f"site{i}", "me", f"pw{i}", "url", "note", None) for i in range(20)]
+    assert User(vault, "alice", PASSWORD).change_password(PASSWORD, "new password")
+    Rekey(vault, chunk_size=10).run(cancelled=lambda: Rekey(vault).pending()[1] > 0)
+
+    # A row sealed under the old key after the pass went past it
+    old = crypto.seal(crypto.get_key(vault, 1), 1, "late", b"credentials:%d:password" % ids[0])
+    with db_connect(vault) as cur:
+        cur.execute("UPDATE credentials SET password = ? WHERE cred_id = ?", (old, ids[0]))
+
+    assert Rekey(vault, chunk_size=10).run()["done"]
+    assert _versions(vault) == {2}
+    assert creds.get_secret(ids[0], "password") == "late"
+
+
+def test_failed_rekey_chunk_keeps_auditing(vault, monkeypatch):
+    creds = Credentials(vault)
+    creds.add_cred("site", "me", "pw", "url", "note", None)
+    assert User(vault, "alice", PASSWORD).change_password(PASSWORD, "new password")
+
+    def fail(*args):
+        raise InvalidTag()
+
+    monkeypatch.setattr(Rekey, "_rewrite", fail)
+    with pytest.raises(InvalidTag):
+        Rekey(vault).run()
+    with db_read(vault) as cur:
+        cur.execute("SELECT 1 FROM settings WHERE key = 'audit_suspended'")
+        assert cur.fetchone() is None
+
+    audited = _audit_count(vault)
+    creds.modify_cred("site", "you", "pw", "url", "note", None, "site")
+    assert _audit_count(vault) == audited + 1
@@ -0,0 +1,64 @@
+from src.backend.user import Credentials, Groups
+from src.modules.contextmanager import db_connect
+
+
+def _counts(groups):
+    return {title: count for _, title, count in groups.get_groups()}
+
+
+def test_counts_follow_credential_changes(vault):
+    groups = Groups(vault)
+    work, home = groups.add_group("work"), groups.add_group("home")
+    creds = Credentials(vault)
+
+    creds.add_cred("mail", "me", "pw", "url", "note", work)
+    creds.add_cred("bank", "me", "pw", "url", "note", work)
+    creds.add_cred("forum", "me", "pw", "url", "note", None)
+    assert _counts(groups) == {"work": 2, "home": 0}
+
+    creds.modify_cred("mail", "me", "pw", "url", "note", home, "mail")
+    assert _counts(groups) == {"work": 1, "home": 1}
+    creds.modify_cred("forum", "me", "pw", "url", "note", home, "forum")
+    creds.modify_cred("bank", "me", "pw", "url", "note", None, "bank")
+    assert _counts(groups) == {"work": 0, "home": 2}
+    # Edits that keep the group leave the count alone
+    creds.modify_cred("email", "you", "pw2", "url", "note", home, "mail")
+    assert _counts(groups) == {"work": 0, "home": 2}
+
+    creds.remove_cred("email")
+    assert _counts(groups) == {"work": 0, "home": 1}
+    assert groups.verify_counts() == []
+
+
+def test_counts_follow_bulk_insert_and_group_delete(vault):
+    groups = Groups(vault)
+    work = groups.add_group("work")
+    creds = Credentials(vault)
+
+    rows = [(f"site{i}", "me", "pw", "url", "note", work if i % 2 else None) for i in range(9)]
+    result = creds.add_creds(rows + [("site1", "me", "pw", "url", "note", work)], chunk_size=4)
+    assert len(result["inserted"]) == 9
+    assert _counts(groups) == {"work": 4}
+
+    creds.remove_creds(["site1", "site2"], chunk_size=1)
+    assert _counts(groups) == {"work": 3}
+
+    groups.delete_group(work)
+    assert groups.get_groups() == []
+    assert all(row[3] is None for row in creds.list_page(limit=100))
+    assert groups.verify_counts() == []
+
+
+def test_repair_counts(vault):
+    groups = Groups(vault)
+    work, home = groups.add_group("work"), groups.add_group("home")
+    creds = Credentials(vault)
+    creds.add_cred("mail", "me", "pw", "url", "note", work)
+
+    with db_connect(vault) as cur:
+        cur.execute("UPDATE groups SET cred_count = 7")
+    assert sorted(groups.verify_counts()) == [(work, 7, 1), (home, 7, 0)]
+
+    assert groups.repair_counts() == 2
+    assert groups.verify_counts() == []
+    assert _counts(groups) == {"work": 1, "home": 0}
@@ -0,0 +1,60 @@
+from src.backend.auth import User
+from src.backend.init import Migrations
+from src.backend.user import Audit, Credentials, Groups
+from src.modules import crypto
+from src.modules.contextmanager import db_connect, db_read
+from conftest import PASSWORD
+
+
+def test_wrong_password_leaves_baseline_untouched(baseline_vault):
+    assert not User(baseline_vault, "alice", "wrong").login()
+    assert Migrations(baseline_vault).version() == 0
+    with db_read(baseline_vault) as cur:
+        cur.execute("SELECT pwd FROM user")
+        assert cur.fetchone()[0] == PASSWORD
+
+
+def test_baseline_vault_migrates_on_login(baseline_vault):
+    assert User(baseline_vault, "alice", PASSWORD).login()
+    migrations = Migrations(baseline_vault)
+    assert migrations.version() == len(migrations.steps)
+
+    with db_read(baseline_vault) as cur:
+        # The plaintext master password is gone, the secrets are sealed
+        cur.execute("SELECT pwd FROM user")
+        assert cur.fetchone()[0] == ""
+        cur.execute("SELECT password, notes FROM credentials")
+        for password, notes in cur.fetchall():
+            assert crypto.sealed_version(password) == 1
+            assert crypto.sealed_version(notes) == 1
+        cur.execute("SELECT 1 FROM settings WHERE key IN ('seal_pending', 'audit_suspended')")
+        assert cur.fetchall() == []
+
+    creds = Credentials(baseline_vault)
+    mail = creds.get_cred("mail")
+    assert mail[2:6] == ("alice", "hunter2", "mail.example", "old note")
+    assert [row[1] for row in creds.search("bank")] == ["bank"]
+    assert {title: count for _, title, count in Groups(baseline_vault).get_groups()} == {"work": 2, "home": 0}
+
+
+def test_migrated_vault_audits_with_entities(baseline_vault):
+    assert User(baseline_vault, "alice", PASSWORD).login()
+    creds = Credentials(baseline_vault)
+    cred_id = creds.modify_cred("mail", "alice", "hunter3", "mail.example", "old note", 1, "mail")
+
+    history = Audit(baseline_vault).history("credential", cred_id)
+    assert history[0][1] == "UPDATE"
+    with db_read(baseline_vault) as cur:
+        cur.execute("SELECT changed FROM auditlog WHERE entity_id = ? ORDER BY log_id DESC LIMIT 1", (cred_id,))
+        assert cur.fetchone()[0] != 0
+
+
+def test_migrate_is_idempotent(vault):
+    migrations = Migrations(vault)
+    version = migrations.version()
+    migrations.migrate()
+    assert migrations.version() == version
+    with db_connect(vault) as cur:
+        cur.execute("PRAGMA user_version = 0")
+    migrations.migrate()
+    assert migrations.version() == version
@@ -0,0 +1,53 @@
+from src.backend.user import Audit, Credentials, Groups
+from src.modules.contextmanager import db_connect
+
+
+def _walk(fetch, key, limit):
+    rows, cursor = [], None
+    while True:
+        page = fetch(cursor, limit)
+        assert len(page) <= limit
+        if not page:
+            return rows
+        rows.extend(page)
+        cursor = key(page[-1])
+
+
+def test_list_page_walks_every_credential(vault):
+    groups = Groups(vault)
+    groups.add_group("work")
+    work = groups.get_gid("work")
+    creds = Credentials(vault)
+    ids = [creds.add_cred(f"site{i}", "me", "pw", "url", "note", work if i % 3 == 0 else None) for i in range(23)]
+
+    rows = _walk(lambda after, limit: creds.list_page(after=after or 0, limit=limit), lambda row: row[0], 5)
+    assert [row[0] for row in rows] == ids
+    assert rows[4] == (ids[4], "site4", "me", None)
+
+    rows = _walk(lambda after, limit: creds.list_page(work, after or 0, limit), lambda row: row[0], 3)
+    assert [row[0] for row in rows] == ids[::3]
+    assert creds.list_page(-1, limit=100) == creds.list_page(limit=100)
+
+
+def test_list_page_skips_deleted_rows(vault):
+    creds = Credentials(vault)
+    ids = [creds.add_cred(f"site{i}", "me", "pw", "url", "note", None) for i in range(6)]
+    first = creds.list_page(limit=3)
+    creds.remove_cred("site3")
+    rest = creds.list_page(after=first[-1][0], limit=3)
+    assert [row[0] for row in rest] == [ids[4], ids[5]]
+
+
+def test_audit_page_orders_tied_timestamps(vault):
+    with db_connect(vault) as cur:
+        cur.execute("DELETE FROM auditlog")
+        cur.executemany(
+            "INSERT INTO auditlog (action_type, action_time, details) VALUES (?, ?, ?)",
+            [("INSERT", "2024-01-0%d 10:00:00" % (1 + i // 4), f"entry {i}") for i in range(10)],
+        )
+    audit = Audit(vault)
+
+    rows = _walk(audit.page, lambda row: (row[2], row[0]), 3)
+    assert [row[3] for row in rows] == [f"entry {i}" for i in reversed(range(10))]
+    assert len({row[0] for row in rows}) == 10
+    assert audit.page(before=(rows[-1][2], rows[-1][0])) == []
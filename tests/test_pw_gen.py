@@ -0,0 +1,28 @@
+import pytest
+from src.modules import pw_gen
+from src.modules.pw_gen import CHAR_CLASSES, Policy, generate_many
+
+
+def _check(passwords, policy, n):
+    assert len(passwords) == n
+    assert len(set(passwords)) == n
+    for password in passwords:
+        assert len(password) == policy.length
+        assert set(password) <= set(policy.alphabet()) - set(pw_gen.AMBIGUOUS)
+        for name, count in policy.min_counts.items():
+            assert sum(char in CHAR_CLASSES[name] for char in password) >= count
+
+
+@pytest.mark.parametrize("numpy", [True, False], ids=["numpy", "python"])
+def test_generate_many_follows_policy(numpy, monkeypatch):
+    if numpy:
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr(pw_gen, "np", None)
+    policy = Policy(min_counts={"digits": 3, "symbols": 2}, length=16, avoid_ambiguous=True)
+    _check(generate_many(pw_gen.NUMPY_MIN * 4, policy=policy), policy, pw_gen.NUMPY_MIN * 4)
+
+
+def test_generate_many_rejects_impossible_policy():
+    with pytest.raises(ValueError):
+        generate_many(10, length=2, policy=Policy(min_counts={"digits": 3}))
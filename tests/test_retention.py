@@ -0,0 +1,101 @@
+import os
+import pytest
+from src.backend.retention import SEGMENT_MAGIC, Retention, iter_frames
+from src.modules.contextmanager import db_connect, db_read
+
+
+@pytest.fixture
+def audited(vault):
+    """A vault whose audit log holds 30 entries, three per day"""
+    with db_connect(vault) as cur:
+        cur.execute("DELETE FROM auditlog")
+        cur.executemany(
+            "INSERT INTO auditlog (action_type, action_time, details) VALUES (?, ?, ?)",
+            [
+                ("UPDATE" if i % 3 else "INSERT", "2024-01-%02d 0%d:00:00" % (1 + i // 3, i % 3), f"entry {i}")
+                for i in range(30)
+            ],
+        )
+    return vault
+
+
+def _live(db):
+    with db_read(db) as cur:
+        cur.execute("SELECT details FROM auditlog ORDER BY log_id")
+        return [row[0] for row in cur.fetchall()]
+
+
+def _expired(db, count):
+    with db_read(db) as cur:
+        cur.execute(
+            "SELECT log_id, action_type, action_time, details, entity_type, entity_id, changed "
+            "FROM auditlog ORDER BY log_id LIMIT ?",
+            (count,),
+        )
+        return cur.fetchall()
+
+
+def test_run_archives_beyond_row_limit(audited):
+    retention = Retention(audited, batch_size=4, segment_size=200)
+    retention.set_policy(rows=10)
+    assert retention.run() == 20
+    assert _live(audited) == [f"entry {i}" for i in range(20, 30)]
+    assert len(retention.segments()) > 1
+
+    archived = list(retention.search())
+    assert [record["details"] for record in archived] == [f"entry {i}" for i in range(20)]
+    assert [r["details"] for r in retention.search(since="2024-01-03", until="2024-01-04")] == [
+        "entry 6",
+        "entry 7",
+        "entry 8",
+    ]
+    assert len(list(retention.search(action_type="INSERT"))) == 7
+    # Nothing left to expire
+    assert retention.run() == 0
+
+
+def test_recover_commits_frame_left_by_interrupted_run(audited):
+    retention = Retention(audited)
+    retention._append(_expired(audited, 5))
+    assert len(_live(audited)) == 30
+
+    retention.set_policy(rows=25)
+    assert retention.run() == 0
+    assert _live(audited) == [f"entry {i}" for i in range(5, 30)]
+    # The rows are archived once, not again by the run
+    assert [record["details"] for record in retention.search()] == [f"entry {i}" for i in range(5)]
+
+
+def test_recover_drops_partial_frame(audited):
+    retention = Retention(audited)
+    retention._append(_expired(audited, 3))
+    retention._commit([row[0] for row in _expired(audited, 3)])
+    (path,) = retention.segments()
+    complete = os.path.getsize(path)
+
+    retention._append(_expired(audited, 4))
+    with open(path, "r+b") as f:
+        f.truncate(complete + 10)
+
+    retention._recover()
+    assert os.path.getsize(path) == complete
+    assert len(list(iter_frames(path))) == 1
+    assert len(_live(audited)) == 27
+
+    # The truncated rows are archived again by the next run
+    retention.set_policy(rows=23)
+    assert retention.run() == 4
+    assert [record["details"] for record in retention.search()] == [f"entry {i}" for i in range(7)]
+
+
+def test_recover_rewrites_torn_segment_header(audited):
+    retention = Retention(audited)
+    os.makedirs(retention.directory)
+    path = os.path.join(retention.directory, "000001.seg")
+    with open(path, "wb") as f:
+        f.write(SEGMENT_MAGIC[:4])
+
+    retention._recover()
+    with open(path, "rb") as f:
+        assert f.read() == SEGMENT_MAGIC
+    assert len(_live(audited)) == 30